@@ -0,0 +1,564 @@
+#!/usr/bin/env python3
+"""
+SafeSound Benchmark
+Measure latency, real-time factor, throughput, memory use and model load
+time of the transcription service
+
+Targets:
+  service    WhisperService through the inference executor, on decoded PCM
+  http       POST /api/upload_audio with WAV uploads (includes decoding)
+  websocket  /api/transcribe_stream, streaming 16-bit PCM in 250 ms
+             frames under the server's flow control
+
+Everything runs in process and offline. Use --backend stub to measure the
+service without model inference, or --model small on CPU for real
+numbers. Results are printed and optionally written as JSON so runs can
+be compared between commits. Time per pipeline stage (decode, front-end,
+inference) is taken from the service metrics:
+
+  python benchmark.py --backend stub --output results.json
+  python benchmark.py --model small --lengths 5 30 --concurrency 1 4
+
+Word error rate is reported against <clip>.txt transcripts next to the
+--corpus files, or against the output of --reference-model, e.g. to judge
+an int8 variant by its full-precision model:
+
+  python benchmark.py --model small-int8 --reference-model small \
+      --corpus clips/
+
+On CPU, compare --slots/--threads settings at rising concurrency to
+check aggregate throughput grows instead of collapsing:
+
+  python benchmark.py --model small --targets service --concurrency 1 2 4
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+TARGETS = ("service", "http", "websocket")
+
+
+def synthetic_clip(seconds, seed=0):
+    """Speech-like test signal: harmonic bursts separated by short pauses"""
+    rng = np.random.default_rng(seed)
+    samples = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    position = 0
+    while position < len(samples):
+        burst = int(rng.uniform(0.3, 1.5) * SAMPLE_RATE)
+        pause = int(rng.uniform(0.2, 0.6) * SAMPLE_RATE)
+        t = np.arange(min(burst, len(samples) - position)) / SAMPLE_RATE
+        pitch = rng.uniform(100, 250)
+        tone = sum(
+            np.sin(2 * np.pi * pitch * harmonic * t) / harmonic
+            for harmonic in range(1, 5)
+        )
+        envelope = np.sin(np.pi * t / max(t[-1], 1e-3)) if len(t) else t
+        samples[position : position + len(t)] = 0.3 * tone * envelope
+        position += burst + pause
+    return samples
+
+
+def load_corpus(directory):
+    """Decode every audio file in a directory, with its transcript if any"""
+    from src.services.audio_decoder import decode_audio
+
+    clips = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        stem, extension = os.path.splitext(path)
+        if not os.path.isfile(path) or extension == ".txt":
+            continue
+        reference = None
+        if os.path.exists(f"{stem}.txt"):
+            with open(f"{stem}.txt", encoding="utf-8") as f:
+                reference = f.read()
+        clips.append((name, decode_audio(path, SAMPLE_RATE), reference))
+    return clips
+
+
+def normalize_words(text):
+    """Lower-cased words without punctuation"""
+    return re.findall(r"\w+(?:'\w+)?", text.lower())
+
+
+def word_errors(reference, hypothesis):
+    """(substitutions + deletions + insertions, reference word count)"""
+    reference = normalize_words(reference)
+    hypothesis = normalize_words(hypothesis)
+    # Levenshtein distance over words, one row at a time
+    previous = list(range(len(hypothesis) + 1))
+    for index, word in enumerate(reference, start=1):
+        current = [index]
+        for position, other in enumerate(hypothesis, start=1):
+            current.append(
+                min(
+                    previous[position] + 1,
+                    current[position - 1] + 1,
+                    previous[position - 1] + (word != other),
+                )
+            )
+        previous = current
+    return previous[-1], len(reference)
+
+
+def measure_accuracy(service, clips, model, action, reference_model=None):
+    """Word error rate of a model over clips with a reference transcript"""
+    from src.schemas.transcribe_schemas import TranscriptionAction
+
+    def transcribe(samples, whisper_model):
+        return service.transcribe(
+            samples, whisper_model, TranscriptionAction(action)
+        )["text"]
+
+    errors = 0
+    words = 0
+    scored = []
+    for clip in clips:
+        reference = clip["reference"]
+        if reference is None and reference_model is not None:
+            reference = transcribe(clip["samples"], reference_model)
+        if reference is None:
+            continue
+        clip_errors, clip_words = word_errors(
+            reference, transcribe(clip["samples"], model)
+        )
+        errors += clip_errors
+        words += clip_words
+        scored.append(clip["name"])
+    if not scored:
+        return None
+    return {
+        "wer": errors / words if words else 0.0,
+        "words": words,
+        "clips": scored,
+        "reference": (
+            reference_model.value if reference_model else "transcripts"
+        ),
+    }
+
+
+def to_pcm(samples):
+    """Encode float32 PCM as raw 16-bit little-endian bytes"""
+    pcm = np.clip(samples, -1.0, 1.0) * 32767
+    return pcm.astype("<i2").tobytes()
+
+
+def to_wav(samples):
+    """Encode float32 PCM as 16-bit mono WAV bytes"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(to_pcm(samples))
+    return buffer.getvalue()
+
+
+def percentiles(values):
+    """p50/p95/p99, mean and max of a list of numbers"""
+    if not values:
+        return None
+    values = np.asarray(values, dtype=np.float64)
+    return {
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+        "mean": float(values.mean()),
+        "max": float(values.max()),
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure_model_load(service, model):
+    """Cold load from disk, then a warm lookup of the loaded model"""
+    service.models.unload(model.value)
+    start = time.perf_counter()
+    service.load_model(model.value)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    service.load_model(model.value)
+    warm = time.perf_counter() - start
+    return {"cold_seconds": cold, "warm_seconds": warm}
+
+
+def stage_timings():
+    """Seconds spent in each pipeline stage, as recorded by the metrics"""
+    from src.core import metrics
+
+    stages = {}
+    for metric in metrics.STAGE_SECONDS.collect():
+        for sample in metric.samples:
+            stage = stages.setdefault(sample.labels["stage"], {})
+            if sample.name.endswith("_sum"):
+                stage["seconds"] = sample.value
+            elif sample.name.endswith("_count"):
+                stage["count"] = int(sample.value)
+    for stage in stages.values():
+        stage["mean"] = (
+            stage["seconds"] / stage["count"] if stage.get("count") else 0.0
+        )
+    return stages
+
+
+def make_request(target, service, client, model, action):
+    """Callable running one request against a target"""
+    from src.schemas.transcribe_schemas import TranscriptionAction
+
+    if target == "service":
+
+        def run(clip):
+            future = service.executor.submit_sync(
+                service.transcribe,
+                clip["samples"],
+                model,
+                TranscriptionAction(action),
+            )
+            future.result()
+
+        return run
+
+    if target == "http":
+
+        def run(clip):
+            response = client.post(
+                "/api/upload_audio",
+                files={"file": ("clip.wav", clip["wav"], "audio/wav")},
+                data={"model": model.value, "action": action},
+            )
+            response.raise_for_status()
+
+        return run
+
+    def run(clip):
+        pcm = clip["pcm"]
+        chunk_size = SAMPLE_RATE // 2  # 250 ms of 16-bit PCM
+        with client.websocket_connect("/api/transcribe_stream") as ws:
+            ws.send_text(
+                json.dumps(
+                    {
+                        "model": model.value,
+                        "action": action,
+                        "format": "pcm_s16le",
+                        "sample_rate": SAMPLE_RATE,
+                    }
+                )
+            )
+            credit = 0
+            final = False
+
+            def handle(message):
+                nonlocal credit, final
+                if message["type"] == "error":
+                    raise RuntimeError(message["message"])
+                if message["type"] == "ready":
+                    credit += message["credit"]
+                elif message["type"] == "credit":
+                    credit += message["n"]
+                elif message["type"] == "transcription":
+                    final = message["final"]
+
+            for offset in range(0, len(pcm), chunk_size):
+                while credit == 0:
+                    handle(json.loads(ws.receive_text()))
+                ws.send_bytes(pcm[offset : offset + chunk_size])
+                credit -= 1
+            ws.send_text(json.dumps({"type": "stop"}))
+            while not final:
+                handle(json.loads(ws.receive_text()))
+
+    return run
+
+
+def run_scenario(run, clips, concurrency, requests):
+    """Run ``requests`` requests with ``concurrency`` in flight"""
+    items = [clips[index % len(clips)] for index in range(requests)]
+    latencies = []
+    rtfs = []
+    errors = []
+
+    def timed(clip):
+        start = time.perf_counter()
+        try:
+            run(clip)
+        except Exception as e:
+            errors.append(str(e))
+            return
+        latency = time.perf_counter() - start
+        latencies.append(latency)
+        rtfs.append(latency / clip["seconds"])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, items))
+    wall = time.perf_counter() - start
+
+    audio_seconds = sum(clip["seconds"] for clip in items)
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "wall_seconds": wall,
+        "latency": percentiles(latencies),
+        "rtf": percentiles(rtfs),
+        "throughput": audio_seconds / wall if wall else 0.0,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--backend", default=None, help="inference backend")
+    parser.add_argument("--compute-type", default=None)
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--action", default="transcribe")
+    parser.add_argument(
+        "--targets", nargs="+", choices=TARGETS, default=list(TARGETS)
+    )
+    parser.add_argument(
+        "--lengths",
+        nargs="+",
+        type=float,
+        default=[5, 30, 120],
+        help="synthetic clip lengths in seconds",
+    )
+    parser.add_argument(
+        "--corpus",
+        help="directory of recorded clips used instead, with optional "
+        "<clip>.txt transcripts for word error rate",
+    )
+    parser.add_argument(
+        "--reference-model",
+        help="model whose output is the reference for clips without "
+        "transcripts",
+    )
+    parser.add_argument(
+        "--concurrency", nargs="+", type=int, default=[1, 4]
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=8,
+        help="requests per scenario (at least the concurrency)",
+    )
+    parser.add_argument(
+        "--slots", type=int, help="concurrent CPU inference slots"
+    )
+    parser.add_argument(
+        "--threads", type=int, help="torch threads per inference slot"
+    )
+    parser.add_argument(
+        "--pin-cores", action="store_true", help="pin each slot to its cores"
+    )
+    parser.add_argument(
+        "--stub-rtf",
+        type=float,
+        default=None,
+        help="seconds the stub backend sleeps per audio second",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="keep the result cache enabled (repeated clips will hit it)",
+    )
+    parser.add_argument("--output", help="write results to this JSON file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # Settings are read from the environment when the service is imported
+    if args.backend:
+        os.environ["INFERENCE_BACKEND"] = args.backend
+    if args.compute_type:
+        os.environ["COMPUTE_TYPE"] = args.compute_type
+    if args.slots is not None:
+        os.environ["INFERENCE_SLOTS"] = str(args.slots)
+    if args.threads is not None:
+        os.environ["INFERENCE_THREADS"] = str(args.threads)
+    if args.pin_cores:
+        os.environ["INFERENCE_PIN_CORES"] = "true"
+    if not args.cache:
+        os.environ["CACHE_ENABLED"] = "false"
+
+    from fastapi.testclient import TestClient
+    from main import app
+    from src.core.config import settings
+    from src.services.whisper_service import whisper_service
+    from src.schemas.transcribe_schemas import WhisperModel
+
+    # Per-request service logs would drown the results
+    logging.getLogger().setLevel(logging.WARNING)
+
+    model = WhisperModel(args.model)
+    reference_model = (
+        WhisperModel(args.reference_model) if args.reference_model else None
+    )
+    if args.stub_rtf is not None and whisper_service.backend.name == "stub":
+        whisper_service.backend.realtime_factor = args.stub_rtf
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus = [
+            (
+                f"synthetic-{seconds:g}s",
+                synthetic_clip(seconds, seed=index),
+                None,
+            )
+            for index, seconds in enumerate(args.lengths)
+        ]
+    clips = [
+        {
+            "name": name,
+            "samples": samples,
+            "wav": to_wav(samples),
+            "pcm": to_pcm(samples),
+            "seconds": len(samples) / SAMPLE_RATE,
+            "reference": reference,
+        }
+        for name, samples, reference in corpus
+    ]
+
+    slots = whisper_service.slots.stats() if whisper_service.slots else None
+    print(
+        f"Backend: {whisper_service.backend.name} "
+        f"({whisper_service.backend.compute_type}), "
+        f"device: {whisper_service.device}, model: {model.value}"
+    )
+    if slots:
+        print(
+            f"Inference slots: {slots['slots']} x "
+            f"{slots['threads_per_slot']} threads"
+            f"{', pinned' if slots['pinned'] else ''}"
+        )
+    load = measure_model_load(whisper_service, model)
+    print(
+        f"Model load: cold {load['cold_seconds']:.2f}s, "
+        f"warm {load['warm_seconds'] * 1000:.3f}ms"
+    )
+
+    client = TestClient(app)
+    scenarios = []
+    for target in args.targets:
+        run = make_request(target, whisper_service, client, model, args.action)
+        for clip in clips:
+            # One untimed request so first-use costs are not counted
+            try:
+                run(clip)
+            except Exception as e:
+                print(f"{target} {clip['name']}: skipped ({e})")
+                continue
+            for concurrency in args.concurrency:
+                result = run_scenario(
+                    run,
+                    [clip],
+                    concurrency,
+                    max(args.requests, concurrency),
+                )
+                result.update(
+                    target=target,
+                    clip=clip["name"],
+                    clip_seconds=clip["seconds"],
+                )
+                scenarios.append(result)
+                latency = result["latency"] or {}
+                print(
+                    f"{target:9} {clip['name']:>20} c={concurrency:<3} "
+                    f"p50={latency.get('p50', 0):7.3f}s "
+                    f"p95={latency.get('p95', 0):7.3f}s "
+                    f"p99={latency.get('p99', 0):7.3f}s "
+                    f"rtf={(result['rtf'] or {}).get('mean', 0):6.3f} "
+                    f"throughput={result['throughput']:7.1f}x "
+                    f"errors={result['errors']}"
+                )
+
+    accuracy = measure_accuracy(
+        whisper_service, clips, model, args.action, reference_model
+    )
+    if accuracy:
+        print(
+            f"WER vs {accuracy['reference']}: {accuracy['wer']:.3f} "
+            f"over {accuracy['words']} words"
+        )
+    loaded = whisper_service.models.stats()["loaded"]
+    model_memory = loaded.get(model.value, {}).get("bytes", 0)
+    print(f"Model memory: {model_memory / (1024 * 1024):.0f}MB")
+    # Front-end (resampling, log-mel) time is reported apart from inference
+    stages = stage_timings()
+    print(
+        "Stages: "
+        + ", ".join(
+            f"{name} {stage['seconds']:.3f}s/{stage['count']}"
+            for name, stage in sorted(stages.items())
+        )
+    )
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "backend": whisper_service.backend.name,
+        "compute_type": whisper_service.backend.compute_type,
+        "device": whisper_service.device,
+        "model": model.value,
+        "settings": {
+            "INFERENCE_WORKERS": settings.INFERENCE_WORKERS,
+            "BATCH_ENABLED": settings.BATCH_ENABLED,
+            "VAD_ENABLED": settings.VAD_ENABLED,
+            "LONG_FORM_WORKERS": settings.LONG_FORM_WORKERS,
+            "CACHE_ENABLED": settings.CACHE_ENABLED,
+        },
+        "inference_slots": slots,
+        "model_load": load,
+        "model_memory_bytes": model_memory,
+        "stages": stages,
+        "scenarios": scenarios,
+        "accuracy": accuracy,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(f"Peak RSS: {report['peak_rss_mb']:.0f}MB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
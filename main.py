@@ -1,17 +1,47 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.templating import _TemplateResponse
 from src.routes import transcribe
 from src.core.config import settings
+from src.core.middleware import MaxBodySizeMiddleware
+from src.core import metrics
+from src.core.metrics import MetricsMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST
+from contextlib import asynccontextmanager
+import asyncio
+import os
 import uvicorn
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prepare storage and models before serving, stop jobs on shutdown"""
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    # Readiness stays false until the configured models are warm
+    await asyncio.to_thread(transcribe.whisper_service.start)
+    await asyncio.to_thread(transcribe.job_manager.start)
+    yield
+    await asyncio.to_thread(transcribe.job_manager.stop, 5.0)
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="SafeSound - Audio Transcription App",
     description="A complete audio transcription application using OpenAI Whisper",
     version="1.0.0",
 )
 
+# Refuse oversized uploads before their body is read
+app.add_middleware(
+    MaxBodySizeMiddleware,
+    max_size=settings.MAX_FILE_SIZE,
+    paths=["/api/upload_audio", "/api/jobs", "/api/detect_language"],
+)
+
+# Request latency by endpoint for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="src/static"), name="static")
 
@@ -22,6 +52,12 @@ templates = Jinja2Templates(directory="src/templates")
 app.include_router(transcribe.router, prefix="/api")
 
 
+@app.get("/metrics")
+async def prometheus_metrics() -> Response:
+    """Prometheus metrics"""
+    return Response(metrics.render(), media_type=CONTENT_TYPE_LATEST)
+
+
 # Root endpoint to serve the main page
 @app.get("/")
 async def root(request: Request) -> _TemplateResponse:
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+SafeSound multi-process server
+Serve the app from several worker processes that share one copy of the
+preloaded models
+
+The configured PRELOAD_MODELS are loaded once before the workers are
+forked, so adding workers adds HTTP capacity without multiplying model
+memory. Backends that cannot be shared across fork (CUDA, faster-whisper)
+fall back to one copy per worker. Metrics are aggregated across workers
+through PROMETHEUS_MULTIPROC_DIR, which defaults to a temporary
+directory.
+
+  PRELOAD_MODELS='["small"]' python serve.py --workers 4
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+
+def parse_args():
+    from src.core.config import settings
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # prometheus_client picks its storage when it is first imported
+    metrics_dir = None
+    if args.workers > 1 and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        metrics_dir = tempfile.mkdtemp(prefix="safesound-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+
+    import uvicorn
+    from prometheus_client import multiprocess
+    from main import app
+    from src.core.prefork import PreforkServer
+    from src.services import cpu_slots
+    from src.routes.transcribe import job_manager, whisper_service
+
+    if args.workers <= 1:
+        uvicorn.run(app, host=args.host, port=args.port)
+        return
+
+    def prepare():
+        whisper_service.preload_shared()
+        # Requeue interrupted jobs once, not once per worker, and leave
+        # no open database connection for the workers to inherit
+        job_manager.recover()
+        job_manager.close()
+        # The parent serves no requests; drop its empty gauge samples
+        multiprocess.mark_process_dead(os.getpid())
+
+    def init_worker(index):
+        # Size (and pin) inference slots within this worker's cores
+        cpu_slots.assign_worker(index, args.workers)
+
+    server = PreforkServer(
+        uvicorn.Config(app, host=args.host, port=args.port),
+        workers=args.workers,
+        prepare=prepare,
+        init_worker=init_worker,
+        on_exit=multiprocess.mark_process_dead,
+    )
+    try:
+        server.run()
+    finally:
+        if metrics_dir:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 from pydantic_settings import BaseSettings
 from typing import List
-import os
 
 
 class Settings(BaseSettings):
@@ -9,10 +8,30 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     HOST: str = "localhost"
     PORT: int = 8000
+    # Processes started by serve.py; they share the preloaded models
+    WORKERS: int = 1
 
     # Whisper settings
     DEFAULT_WHISPER_MODEL: str = "turbo"
-    AVAILABLE_MODELS: List[str] = ["small", "medium", "turbo"]
+    AVAILABLE_MODELS: List[str] = [
+        "small",
+        "medium",
+        "turbo",
+        "small-int8",
+        "medium-int8",
+        "turbo-int8",
+    ]
+    INFERENCE_BACKEND: str = "openai-whisper"  # "faster-whisper", "stub"
+    # "default" picks the backend's natural precision for the device;
+    # faster-whisper also accepts int8, int8_float16, float16, float32...
+    COMPUTE_TYPE: str = "default"
+    PRELOAD_MODELS: List[str] = []  # loaded at startup
+    WARMUP_ENABLED: bool = True  # run preloaded models once before ready
+    WARMUP_SECONDS: float = 1.0  # length of the silent warm-up buffer
+    MODEL_MEMORY_BUDGET: int = 0  # bytes of loaded models, 0 = unlimited
+    # "-int8" variants are quantized on first use and kept here
+    QUANTIZED_MODEL_DIR: str = "~/.cache/safesound"
+    LANGUAGE_DETECT_SECONDS: float = 30.0  # audio decoded to detect language
 
     # File upload settings
     MAX_FILE_SIZE: int = 100 * 1024 * 1024  # 100MB
@@ -29,13 +48,81 @@ class Settings(BaseSettings):
     # Audio processing settings
     CHUNK_DURATION: int = 5  # seconds for real-time processing
     SAMPLE_RATE: int = 16000
+    # Spare ffmpeg processes kept started per decode command, 0 = spawn on
+    # demand; WAV (and FLAC with soundfile) never needs ffmpeg
+    DECODER_POOL_SIZE: int = 2
+
+    # Micro-batching of short clips across concurrent requests; only
+    # effective with INFERENCE_WORKERS >= BATCH_MAX_SIZE
+    BATCH_ENABLED: bool = True
+    BATCH_MAX_SIZE: int = 8
+    BATCH_MAX_WAIT_MS: int = 20
+
+    # Transcription result cache
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 1024  # in-process LRU tier
+    CACHE_TTL: int = 24 * 3600  # seconds
+    CACHE_DISK_ENABLED: bool = False  # JSON files under UPLOAD_DIR/cache
+    CACHE_DISK_MAX_BYTES: int = 512 * 1024 * 1024
+
+    # Voice activity detection settings
+    VAD_ENABLED: bool = True
+    VAD_THRESHOLD_DB: float = -45.0  # frames quieter than this are silence
+    VAD_NOISE_MARGIN_DB: float = 6.0  # speech must clear the noise floor by
+    VAD_FRAME_MS: int = 30
+    VAD_MIN_SPEECH_MS: int = 250  # shorter bursts are dropped
+    VAD_MIN_SILENCE_MS: int = 500  # shorter pauses are kept as speech
+    VAD_SPEECH_PAD_MS: int = 200
+    VAD_MAX_BATCH_SECONDS: float = 30.0  # speech packed per inference call
+
+    # Long-form transcription: audio is cut into windows of at most
+    # VAD_MAX_BATCH_SECONDS at pauses and the windows run concurrently
+    LONG_FORM_WORKERS: int = 4  # windows in flight per request, 1 = serial
+    CHUNK_OVERLAP_SECONDS: float = 2.0  # shared audio where speech is cut
+    CHUNK_SEARCH_SECONDS: float = 5.0  # how far back to look for a soft cut
+
+    # Real-time streaming settings
+    STREAM_WINDOW_SECONDS: float = 15.0  # max audio per inference pass
+    STREAM_STEP_SECONDS: float = 1.0  # new audio needed before a pass
+    STREAM_BUFFER_SECONDS: float = 30.0  # ring buffer capacity per session
+    STREAM_CONTEXT_WORDS: int = 50  # committed words used as prompt, 0 = off
+    STREAM_CONTEXT_RESET_SECONDS: float = 2.0  # pause that clears the prompt
+    # Flow control: clients may send STREAM_CREDITS binary frames ahead of
+    # the server. Credit is held back while more than half of
+    # STREAM_MAX_LAG_SECONDS awaits a pass, and audio beyond the full lag
+    # is dropped, so frames should be short (20-250 ms)
+    STREAM_CREDITS: int = 8
+    STREAM_MAX_LAG_SECONDS: float = 10.0
+
+    # Background jobs; uploads and the job database live in UPLOAD_DIR/jobs
+    JOB_WORKERS: int = 1  # jobs handed to the inference executor at once
+    JOB_RETENTION: int = 7 * 24 * 3600  # seconds finished jobs are kept
+
+    # Inference executor settings
+    INFERENCE_WORKERS: int = 2
+    INFERENCE_QUEUE_SIZE: int = 8  # requests waiting for a free worker
+    INFERENCE_TIMEOUT: float = 600.0  # seconds, queue wait included
+    INFERENCE_RETRY_AFTER: int = 5  # seconds, sent when the queue is full
+    # Workers reserved for streaming passes, which also use idle general
+    # workers when these are busy
+    INFERENCE_LIVE_WORKERS: int = 1
+
+    # Scheduling of model calls: streaming passes (latency class) go
+    # first, earliest deadline first; uploads (throughput class) take turns
+    # per client, one window of at most VAD_MAX_BATCH_SECONDS at a time
+    SCHEDULER_CAPACITY: int = 0  # concurrent model calls, 0 = slots/workers
+    STREAM_PASS_DEADLINE: float = 1.0  # seconds a streaming pass is due in
+
+    # CPU inference parallelism: model calls run in a fixed number of
+    # slots with their own thread count, so concurrent requests divide the
+    # cores instead of oversubscribing them. 0 derives the value from the
+    # cores available to the process (its share under serve.py)
+    INFERENCE_SLOTS: int = 0  # concurrent model calls, 0 = cores / 4
+    INFERENCE_THREADS: int = 0  # threads per slot, 0 = cores / slots
+    INFERENCE_PIN_CORES: bool = False  # pin each slot to its own cores
 
     class Config:
         env_file = ".env"
 
 
-# Create uploads directory if it doesn't exist
-if not os.path.exists("uploads"):
-    os.makedirs("uploads")
-
 settings = Settings()
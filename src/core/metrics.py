@@ -0,0 +1,162 @@
+# Prometheus metrics
+import os
+import time
+from typing import Callable, List, Tuple
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Latency buckets from a fast cache hit up to a long-form transcription
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+    600.0,
+)
+
+REQUEST_SECONDS = Histogram(
+    "safesound_http_request_seconds",
+    "HTTP request latency",
+    ["endpoint", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "safesound_stage_seconds",
+    "Time spent in each processing stage",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+AUDIO_SECONDS = Counter(
+    "safesound_audio_seconds_total",
+    "Seconds of audio run through the model",
+    ["model", "action"],
+)
+REALTIME_FACTOR = Histogram(
+    "safesound_realtime_factor",
+    "Transcription time per second of audio",
+    ["model"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0),
+)
+# The multiprocess modes decide how a pre-fork server's workers combine:
+# queues add up, while model gauges are reported per worker process
+QUEUE_DEPTH = Gauge(
+    "safesound_inference_queue_depth",
+    "Requests waiting for an inference worker",
+    multiprocess_mode="livesum",
+)
+INFERENCE_RUNNING = Gauge(
+    "safesound_inference_running",
+    "Requests running on an inference worker",
+    multiprocess_mode="livesum",
+)
+WEBSOCKET_SESSIONS = Gauge(
+    "safesound_websocket_sessions",
+    "Open real-time transcription sessions",
+    multiprocess_mode="livesum",
+)
+MODEL_MEMORY = Gauge(
+    "safesound_model_memory_bytes",
+    "Resident size of the loaded models",
+    multiprocess_mode="liveall",
+)
+MODELS_LOADED = Gauge(
+    "safesound_models_loaded",
+    "Number of loaded models",
+    multiprocess_mode="liveall",
+)
+
+# Gauges read from a function; in multiprocess mode they are copied into
+# the shared files by refresh() instead
+_TRACKED: List[Tuple[Gauge, Callable[[], float]]] = []
+
+
+def multiprocess_mode() -> bool:
+    """Whether metrics are shared between pre-forked worker processes"""
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def track(gauge: Gauge, function: Callable[[], float]) -> None:
+    """Report the value of ``function`` as ``gauge``"""
+    if multiprocess_mode():
+        _TRACKED.append((gauge, function))
+    else:
+        gauge.set_function(function)
+
+
+def refresh() -> None:
+    """Write the current value of every tracked gauge"""
+    for gauge, function in _TRACKED:
+        gauge.set(function())
+
+
+def render() -> bytes:
+    """Metrics in the Prometheus text format, across all workers"""
+    if not multiprocess_mode():
+        return generate_latest(REGISTRY)
+    refresh()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+class MetricsMiddleware:
+    """
+    Records the latency and status of every HTTP request
+
+    Requests are labelled with the name of the endpoint function that
+    handled them rather than the raw path, which keeps job ids out of the
+    label values.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Keep this worker's gauges current for scrapes served by
+            # the other workers
+            refresh()
+            endpoint = scope.get("endpoint")
+            if endpoint is None:
+                name = "unmatched"
+            else:
+                name = getattr(endpoint, "__name__", type(endpoint).__name__)
+            REQUEST_SECONDS.labels(
+                endpoint=name,
+                method=scope["method"],
+                status=str(status),
+            ).observe(time.perf_counter() - start)
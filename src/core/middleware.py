@@ -0,0 +1,79 @@
+# ASGI middleware
+from typing import Iterable
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Allowance for multipart boundaries and the non-file form fields
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class BodyTooLargeError(HTTPException):
+    """Raised while streaming a request body that exceeds the limit"""
+
+    def __init__(self, detail: str):
+        super().__init__(status_code=413, detail=detail)
+
+
+class MaxBodySizeMiddleware:
+    """
+    Reject request bodies larger than ``max_size`` before they are buffered
+
+    Requests that declare a too-large Content-Length are refused without
+    reading the body. Bodies without a declared length are counted as
+    they stream in and aborted as soon as they cross the limit.
+    """
+
+    def __init__(self, app: ASGIApp, max_size: int, paths: Iterable[str]):
+        self.app = app
+        self.max_size = max_size + MULTIPART_OVERHEAD
+        self.paths = tuple(paths)
+
+    @property
+    def detail(self) -> str:
+        limit_mb = (self.max_size - MULTIPART_OVERHEAD) // (1024 * 1024)
+        return f"File too large. Maximum size: {limit_mb}MB"
+
+    def _too_large(self) -> JSONResponse:
+        return JSONResponse(status_code=413, content={"detail": self.detail})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None:
+            try:
+                declared = int(content_length)
+            except ValueError:
+                declared = 0
+            if declared > self.max_size:
+                await self._too_large()(scope, receive, send)
+                return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size:
+                    raise BodyTooLargeError(self.detail)
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except BodyTooLargeError:
+            if response_started:
+                raise
+            await self._too_large()(scope, receive, send)
@@ -0,0 +1,118 @@
+# Pre-fork multi-process server
+import gc
+import os
+import signal
+import socket
+import time
+from typing import Callable, Dict, Optional
+import uvicorn
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Pause before replacing a worker that exited, so a crash loop stays slow
+RESPAWN_DELAY = 1.0
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """Listening socket shared by every worker"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """
+    Serves one app from several worker processes forked after setup
+
+    ``prepare`` runs once in the parent before any worker exists, so
+    whatever it loads sits in memory the workers share copy-on-write.
+    ``gc.freeze()`` then moves every object allocated so far out of the
+    collector's reach, so collections in the workers do not touch, and
+    therefore copy, those pages. ``init_worker`` runs in each new worker
+    with its index. Workers that exit are replaced until the server
+    receives SIGINT or SIGTERM.
+    """
+
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        workers: int,
+        prepare: Optional[Callable[[], None]] = None,
+        init_worker: Optional[Callable[[int], None]] = None,
+        on_exit: Optional[Callable[[int], None]] = None,
+    ):
+        self.config = config
+        self.workers = workers
+        self.prepare = prepare
+        self.init_worker = init_worker
+        self.on_exit = on_exit  # called with the pid of each exited worker
+        self.children: Dict[int, int] = {}  # pid -> worker index
+        self._stopping = False
+
+    def run(self) -> None:
+        if self.prepare:
+            self.prepare()
+        sock = bind_socket(self.config.host, self.config.port)
+        gc.collect()
+        gc.freeze()
+
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        logger.info(
+            f"Serving on {self.config.host}:{self.config.port} "
+            f"with {self.workers} worker processes"
+        )
+        for index in range(self.workers):
+            self._spawn(sock, index)
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            index = self.children.pop(pid, None)
+            if self.on_exit:
+                self.on_exit(pid)
+            if self._stopping:
+                continue
+            logger.error(
+                f"Worker {pid} exited with status "
+                f"{os.waitstatus_to_exitcode(status)}; starting a new one"
+            )
+            time.sleep(RESPAWN_DELAY)
+            if not self._stopping and index is not None:
+                self._spawn(sock, index)
+        sock.close()
+
+    def _spawn(self, sock: socket.socket, index: int) -> None:
+        pid = os.fork()
+        if pid:
+            self.children[pid] = index
+            return
+
+        # Worker: uvicorn installs its own handlers for a graceful exit
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        code = 0
+        try:
+            if self.init_worker:
+                self.init_worker(index)
+            uvicorn.Server(self.config).run(sockets=[sock])
+        except BaseException as e:
+            logger.error(f"Worker {os.getpid()} failed: {str(e)}")
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
@@ -1,5 +1,6 @@
 from fastapi import (
     APIRouter,
+    Request,
     UploadFile,
     File,
     Form,
@@ -7,37 +8,102 @@ from fastapi import (
     WebSocket,
     WebSocketDisconnect,
 )
-from fastapi.responses import JSONResponse
+from fastapi.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    StreamingResponse,
+)
 from src.services.whisper_service import whisper_service
+from src.services.job_manager import job_manager
+from src.services.job_store import COMPLETED, FAILED
+from src.services.formatters import EXPORTERS, EXPORT_MEDIA_TYPES
+from src.services.backends import UnsupportedModelError
+from src.services.audio_decoder import (
+    AudioDecodeError,
+    PCMStreamDecoder,
+    open_stream_decoder,
+)
+from src.services.streaming_session import StreamingSession
+from src.services.scheduler import LATENCY, WorkTicket
+from src.services.inference_executor import (
+    QueueFullError,
+    InferenceTimeoutError,
+)
 from src.schemas.transcribe_schemas import (
     TranscriptionRequest,
     TranscriptionResponse,
     TranscriptionProgress,
+    JobSubmitResponse,
+    LanguageDetectionResponse,
+    Segment,
     WhisperModel,
     TranscriptionAction,
     ErrorResponse,
 )
 from src.core.config import settings
+from src.core import metrics
+from typing import Optional, Tuple, Union
 import os
-import tempfile
 import json
 import asyncio
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Media types of the streaming upload response
+STREAM_FORMATS = {
+    "sse": "text/event-stream",
+    "ndjson": "application/x-ndjson",
+}
 
-@router.post("/upload_audio", response_model=TranscriptionResponse)
-async def upload_audio(
-    file: UploadFile = File(...),
-    model: str = Form(default="turbo"),
-    action: str = Form(default="transcribe"),
-    language: str = Form(default=None),
+
+def _client_id(connection: Union[Request, WebSocket]) -> Optional[str]:
+    """Client that fair scheduling shares the model between"""
+    client = connection.headers.get("x-client-id")
+    if not client and connection.client is not None:
+        client = connection.client.host
+    return client
+
+
+def _check_response_format(response_format: str) -> None:
+    if response_format != "json" and response_format not in EXPORTERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown response format {response_format}. Allowed: {['json', *EXPORTERS]}",
+        )
+
+
+def _build_response(
+    result: dict,
+    model: str,
+    action: str,
+    include_segments: bool = False,
+    response_format: str = "json",
 ):
-    """Upload and transcribe audio file"""
+    """TranscriptionResponse for a result, or a subtitle export of it"""
+    if response_format in EXPORTERS:
+        return PlainTextResponse(
+            EXPORTERS[response_format](result["segments"]),
+            media_type=EXPORT_MEDIA_TYPES[response_format],
+        )
+    return TranscriptionResponse(
+        success=True,
+        text=result["text"],
+        language=result["language"],
+        processing_time=result["processing_time"],
+        model_used=model,
+        action_performed=action,
+        cached=result["cache_hit"],
+        segments=result["segments"] if include_segments else None,
+    )
 
-    # Validate file
+
+async def _validate_upload(
+    file: UploadFile, model: str, action: str
+) -> Tuple[str, WhisperModel, TranscriptionAction]:
+    """Check an uploaded file and the requested model and action"""
     if not file.filename:
         raise HTTPException(status_code=400, detail="No file provided")
 
@@ -48,69 +114,374 @@ async def upload_audio(
             detail=f"File type {file_extension} not supported. Allowed: {settings.ALLOWED_EXTENSIONS}",
         )
 
-    # Check file size
-    file_size = 0
-    temp_path = None
+    # The multipart parser has already spooled the upload to disk past
+    # a small in-memory threshold; never pull the whole body into RAM
+    if file.size is not None and file.size > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE // (1024*1024)}MB",
+        )
+    await file.seek(0)
 
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(
-            suffix=file_extension, delete=False
-        ) as temp_file:
-            temp_path = temp_file.name
-            content = await file.read()
-            file_size = len(content)
-
-            if file_size > settings.MAX_FILE_SIZE:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE // (1024*1024)}MB",
-                )
+        return file_extension, WhisperModel(model), TranscriptionAction(action)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid parameter: {str(e)}"
+        )
 
-            temp_file.write(content)
 
-        # Validate model and action
-        try:
-            whisper_model = WhisperModel(model)
-            transcription_action = TranscriptionAction(action)
-        except ValueError as e:
-            raise HTTPException(
-                status_code=400, detail=f"Invalid parameter: {str(e)}"
+@router.post("/upload_audio", response_model=TranscriptionResponse)
+async def upload_audio(
+    request: Request,
+    file: UploadFile = File(...),
+    model: str = Form(default="turbo"),
+    action: str = Form(default="transcribe"),
+    language: str = Form(default=None),
+    include_segments: bool = Form(default=False),
+    word_timestamps: bool = Form(default=False),
+    response_format: str = Form(default="json"),
+):
+    """
+    Upload and transcribe audio file
+
+    Segments (with word timings when ``word_timestamps`` is set) are
+    included on request, or the transcript can be exported as SRT or VTT
+    subtitles through ``response_format``.
+    """
+    try:
+        _check_response_format(response_format)
+        file_extension, whisper_model, transcription_action = (
+            await _validate_upload(file, model, action)
+        )
+
+        # Repeated uploads are answered from the cache without taking a
+        # slot on the inference workers
+        digest = await asyncio.to_thread(whisper_service.digest, file.file)
+        result = whisper_service.get_cached(
+            whisper_service.cache_key(
+                digest,
+                whisper_model,
+                transcription_action,
+                language,
+                word_timestamps,
             )
+        )
 
-        # Perform transcription
-        text, detected_language, processing_time = (
-            whisper_service.transcribe_audio(
-                temp_path, whisper_model, transcription_action, language
+        if result is None:
+            # Perform transcription on the inference workers
+            result = await whisper_service.executor.submit(
+                whisper_service.transcribe,
+                file.file,
+                whisper_model,
+                transcription_action,
+                language,
+                file_extension,
+                digest=digest,
+                word_timestamps=word_timestamps,
+                ticket=WorkTicket(client=_client_id(request)),
             )
+
+        return _build_response(
+            result, model, action, include_segments, response_format
         )
 
-        return TranscriptionResponse(
+    except HTTPException:
+        raise
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except InferenceTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except (AudioDecodeError, UnsupportedModelError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error processing audio: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Error processing audio: {str(e)}"
+        )
+
+
+@router.post("/detect_language", response_model=LanguageDetectionResponse)
+async def detect_language(
+    request: Request,
+    file: UploadFile = File(...),
+    model: str = Form(default="turbo"),
+    top_k: int = Form(default=5, ge=1),
+):
+    """Identify the spoken language without transcribing"""
+    try:
+        file_extension, whisper_model, _ = await _validate_upload(
+            file, model, TranscriptionAction.TRANSCRIBE.value
+        )
+
+        # A detection cached for this content and model is returned
+        # without taking a slot on the inference workers
+        digest = await asyncio.to_thread(whisper_service.digest, file.file)
+        result = whisper_service.cached_language(digest, whisper_model, top_k)
+
+        if result is None:
+            result = await whisper_service.executor.submit(
+                whisper_service.detect_language,
+                file.file,
+                whisper_model,
+                top_k,
+                file_extension,
+                digest=digest,
+                ticket=WorkTicket(client=_client_id(request)),
+            )
+
+        return LanguageDetectionResponse(
             success=True,
-            text=text,
-            language=detected_language,
-            processing_time=processing_time,
+            language=result["language"],
+            probabilities=result["probabilities"],
+            processing_time=result["processing_time"],
             model_used=model,
-            action_performed=action,
+            cached=result["cache_hit"],
         )
 
     except HTTPException:
         raise
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    except InferenceTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except (AudioDecodeError, UnsupportedModelError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Error processing audio: {str(e)}")
+        logger.error(f"Error detecting language: {str(e)}")
         raise HTTPException(
-            status_code=500, detail=f"Error processing audio: {str(e)}"
+            status_code=500, detail=f"Error detecting language: {str(e)}"
         )
 
-    finally:
-        # Clean up temporary file
-        if temp_path and os.path.exists(temp_path):
-            os.unlink(temp_path)
+
+def _format_event(stream_format: str, event: str, data: dict) -> str:
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": event, "data": data}) + "\n"
+
+
+@router.post("/upload_audio/stream")
+async def upload_audio_stream(
+    request: Request,
+    file: UploadFile = File(...),
+    model: str = Form(default="turbo"),
+    action: str = Form(default="transcribe"),
+    language: str = Form(default=None),
+    word_timestamps: bool = Form(default=False),
+    format: str = Form(default="sse"),
+):
+    """
+    Upload audio and stream segments as they are transcribed
+
+    Each segment is sent as a ``segment`` event in timeline order, as
+    Server-Sent Events or NDJSON. The last event is a ``summary`` with the
+    TranscriptionResponse, or an ``error``.
+    """
+    if format not in STREAM_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format {format}. Allowed: {list(STREAM_FORMATS)}",
+        )
+    file_extension, whisper_model, transcription_action = (
+        await _validate_upload(file, model, action)
+    )
+
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    expired = threading.Event()
+
+    def on_segments(segments: list):
+        loop.call_soon_threadsafe(events.put_nowait, segments)
+
+    def progress(done: int, total: int):
+        # Stops a timed-out transcription before its next window
+        if expired.is_set():
+            raise InferenceTimeoutError("Transcription was cancelled")
+
+    digest = await asyncio.to_thread(whisper_service.digest, file.file)
+    result = whisper_service.get_cached(
+        whisper_service.cache_key(
+            digest,
+            whisper_model,
+            transcription_action,
+            language,
+            word_timestamps,
+        )
+    )
+
+    future = None
+    if result is None:
+        # Admission errors are still reported with a status code
+        try:
+            future = whisper_service.executor.submit_sync(
+                whisper_service.transcribe,
+                file.file,
+                whisper_model,
+                transcription_action,
+                language,
+                file_extension,
+                digest=digest,
+                progress=progress,
+                on_segments=on_segments,
+                word_timestamps=word_timestamps,
+                ticket=WorkTicket(client=_client_id(request)),
+            )
+        except QueueFullError as e:
+            raise HTTPException(
+                status_code=503,
+                detail=str(e),
+                headers={"Retry-After": str(e.retry_after)},
+            )
+        # Segment callbacks always run before the future completes
+        future.add_done_callback(
+            lambda _: loop.call_soon_threadsafe(events.put_nowait, None)
+        )
+
+    async def stream():
+        nonlocal result
+        streamed = False
+        timeout = settings.INFERENCE_TIMEOUT
+        deadline = loop.time() + timeout
+        try:
+            if future is not None:
+                while True:
+                    try:
+                        segments = await asyncio.wait_for(
+                            events.get(), max(0.0, deadline - loop.time())
+                        )
+                    except asyncio.TimeoutError:
+                        expired.set()
+                        raise whisper_service.executor.expire(future, timeout)
+                    if segments is None:
+                        break
+                    for segment in segments:
+                        yield _format_event(
+                            format, "segment", Segment(**segment).model_dump()
+                        )
+                    streamed = True
+                result = future.result()
+
+            if not streamed:
+                for segment in result["segments"]:
+                    yield _format_event(
+                        format, "segment", Segment(**segment).model_dump()
+                    )
+
+            summary = _build_response(result, model, action)
+            yield _format_event(format, "summary", summary.model_dump())
+        except Exception as e:
+            logger.error(f"Error streaming transcription: {str(e)}")
+            yield _format_event(format, "error", {"detail": str(e)})
+
+    return StreamingResponse(
+        stream(),
+        media_type=STREAM_FORMATS[format],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/jobs", response_model=JobSubmitResponse, status_code=202)
+async def submit_job(
+    request: Request,
+    file: UploadFile = File(...),
+    model: str = Form(default="turbo"),
+    action: str = Form(default="transcribe"),
+    language: str = Form(default=None),
+    word_timestamps: bool = Form(default=False),
+):
+    """Queue an audio file for background transcription"""
+    file_extension, whisper_model, transcription_action = (
+        await _validate_upload(file, model, action)
+    )
+
+    try:
+        job_id = await asyncio.to_thread(
+            job_manager.submit,
+            file.file,
+            file_extension,
+            whisper_model,
+            transcription_action,
+            language,
+            word_timestamps,
+            _client_id(request),
+        )
+    except Exception as e:
+        logger.error(f"Error queueing job: {str(e)}")
+        raise HTTPException(
+            status_code=500, detail=f"Error queueing job: {str(e)}"
+        )
+
+    return JobSubmitResponse(job_id=job_id, status="queued")
+
+
+def _get_job(job_id: str) -> dict:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=TranscriptionProgress)
+async def get_job(job_id: str):
+    """Report the progress of a background job"""
+    job = await asyncio.to_thread(_get_job, job_id)
+    return TranscriptionProgress(
+        progress=job["progress"],
+        status=job["status"],
+        message=job["message"],
+    )
+
+
+@router.get("/jobs/{job_id}/result", response_model=TranscriptionResponse)
+async def get_job_result(
+    job_id: str,
+    include_segments: bool = False,
+    response_format: str = "json",
+):
+    """Return the transcript of a finished job"""
+    _check_response_format(response_format)
+    job = await asyncio.to_thread(_get_job, job_id)
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=500, detail=job["message"])
+    if job["status"] != COMPLETED:
+        raise HTTPException(
+            status_code=409, detail=f"Job is {job['status']}"
+        )
+
+    return _build_response(
+        job["result"],
+        job["params"]["model"],
+        job["params"]["action"],
+        include_segments,
+        response_format,
+    )
 
 
 @router.websocket("/transcribe_stream")
 async def transcribe_stream(websocket: WebSocket):
-    """WebSocket endpoint for real-time audio transcription"""
+    """
+    WebSocket endpoint for real-time audio transcription
+
+    The first text message configures the session: ``model``,
+    ``action``, ``language`` and the stream ``format``, either raw mono
+    PCM ("pcm_s16le", "pcm_f32le") at ``sample_rate`` Hz or a compressed
+    container ("webm", "ogg"); without a format the container is probed.
+    The server answers ``{"type": "ready", "credit": n}``. Every binary
+    frame spends one credit and ``{"type": "credit", "n": k}`` returns
+    them; credit is held back while transcription lags behind. Audio
+    sent regardless is dropped past the lag budget, reported as
+    ``{"type": "overload", "dropped": seconds}``. Each pass sends one
+    ``{"type": "transcription", "text", "partial", "final"}`` message.
+    ``{"type": "stop"}`` flushes the session and closes it.
+    """
     await websocket.accept()
 
     try:
@@ -120,76 +491,164 @@ async def transcribe_stream(websocket: WebSocket):
 
         model = WhisperModel(config.get("model", "turbo"))
         action = TranscriptionAction(config.get("action", "transcribe"))
-
-        logger.info(
-            f"Starting real-time transcription with model: {model}, action: {action}"
+        language = config.get("language")
+        stream_format = config.get("format")
+        decoder = open_stream_decoder(
+            stream_format,
+            int(config.get("sample_rate", settings.SAMPLE_RATE)),
+        )
+    except WebSocketDisconnect:
+        logger.info("WebSocket disconnected during setup")
+        return
+    except Exception as e:
+        logger.error(f"WebSocket error: {str(e)}")
+        await websocket.send_text(
+            json.dumps({"type": "error", "message": str(e)})
         )
+        await websocket.close()
+        return
+
+    logger.info(
+        f"Starting real-time transcription with model: {model}, "
+        f"action: {action}, format: {stream_format or 'auto'}"
+    )
+
+    # One decoder and rolling buffer per connection
+    session = StreamingSession(
+        whisper_service,
+        model,
+        action,
+        language,
+        decoder=decoder,
+        client=_client_id(websocket),
+    )
+    metrics.WEBSOCKET_SESSIONS.inc()
+
+    max_lag = int(settings.STREAM_MAX_LAG_SECONDS * settings.SAMPLE_RATE)
+    send_lock = asyncio.Lock()
+    wakeup = asyncio.Event()
+    stopping = asyncio.Event()
+    owed_credit = 0
+
+    async def send(message: dict) -> None:
+        async with send_lock:
+            await websocket.send_text(json.dumps(message))
+
+    async def return_credit() -> None:
+        # Hold credit back while passes lag behind, so clients slow down
+        # before audio has to be dropped
+        nonlocal owed_credit
+        if owed_credit and session.backlog <= max_lag // 2:
+            credit, owed_credit = owed_credit, 0
+            await send({"type": "credit", "n": credit})
+
+    async def send_update(update: dict, final: bool = False) -> None:
+        if update["committed"] or update["partial"] or final:
+            await send(
+                {
+                    "type": "transcription",
+                    "text": update["committed"],
+                    "partial": update["partial"],
+                    "final": final,
+                }
+            )
+
+    async def receive_audio() -> None:
+        nonlocal owed_credit
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
 
-        chunk_counter = 0
+            if message.get("text") is not None:
+                # Control message: {"type": "stop"} flushes the session
+                # and commits the remaining text
+                if json.loads(message["text"]).get("type") == "stop":
+                    stopping.set()
+                    wakeup.set()
+                    return
+                continue
 
+            data = message.get("bytes") or b""
+            owed_credit += 1
+            if data:
+                if isinstance(decoder, PCMStreamDecoder):
+                    session.feed(data)
+                else:
+                    await asyncio.to_thread(session.feed, data)
+            await return_credit()
+            if session.ready():
+                wakeup.set()
+
+    async def run_passes() -> None:
         while True:
+            await wakeup.wait()
+            wakeup.clear()
             try:
-                # Receive audio data
-                data = await websocket.receive_bytes()
-                chunk_counter += 1
-
-                # Process audio chunk
-                if len(data) > 0:
-                    # Send progress update
-                    await websocket.send_text(
-                        json.dumps(
-                            {
-                                "type": "progress",
-                                "chunk_id": chunk_counter,
-                                "status": "processing",
-                            }
-                        )
+                if stopping.is_set():
+                    update = await whisper_service.executor.submit(
+                        session.process, final=True, priority=LATENCY
                     )
+                    await send_update(update, final=True)
+                    return
+                if not session.ready():
+                    continue
 
-                    # Transcribe chunk
-                    text = whisper_service.transcribe_audio_chunk(
-                        data, model, action
+                skipped = session.drop_backlog(max_lag)
+                if skipped:
+                    logger.warning(
+                        f"Session behind by over {max_lag} samples, "
+                        f"dropped {skipped['dropped']:.1f}s of audio"
                     )
-
-                    if text:
-                        # Send transcription result
-                        await websocket.send_text(
-                            json.dumps(
-                                {
-                                    "type": "transcription",
-                                    "chunk_id": chunk_counter,
-                                    "text": text,
-                                    "model": model.value,
-                                    "action": action.value,
-                                }
-                            )
-                        )
-
-                    # Send completion status
-                    await websocket.send_text(
-                        json.dumps(
-                            {
-                                "type": "progress",
-                                "chunk_id": chunk_counter,
-                                "status": "completed",
-                            }
-                        )
+                    await send(
+                        {"type": "overload", "dropped": skipped["dropped"]}
                     )
+                    await send_update(skipped)
 
+                # Audio that arrives during the pass joins the next one
+                with metrics.STAGE_SECONDS.labels("stream_pass").time():
+                    update = await whisper_service.executor.submit(
+                        session.process, priority=LATENCY
+                    )
+                await send_update(update)
+                await return_credit()
+            except QueueFullError as e:
+                await send(
+                    {
+                        "type": "error",
+                        "message": str(e),
+                        "retry_after": e.retry_after,
+                    }
+                )
             except WebSocketDisconnect:
-                logger.info("WebSocket disconnected")
-                break
+                raise
             except Exception as e:
                 logger.error(f"Error in real-time transcription: {str(e)}")
-                await websocket.send_text(
-                    json.dumps({"type": "error", "message": str(e)})
-                )
+                await send({"type": "error", "message": str(e)})
+                if stopping.is_set():
+                    return
 
+    await send({"type": "ready", "credit": settings.STREAM_CREDITS})
+    receiver = asyncio.create_task(receive_audio())
+    passes = asyncio.create_task(run_passes())
+    try:
+        await asyncio.wait(
+            {receiver, passes}, return_when=asyncio.FIRST_EXCEPTION
+        )
+        for task in (receiver, passes):
+            if task.done() and task.exception() is not None:
+                raise task.exception()
+        await websocket.close()
     except WebSocketDisconnect:
-        logger.info("WebSocket disconnected during setup")
+        logger.info("WebSocket disconnected")
     except Exception as e:
         logger.error(f"WebSocket error: {str(e)}")
         await websocket.close()
+    finally:
+        for task in (receiver, passes):
+            task.cancel()
+        metrics.WEBSOCKET_SESSIONS.dec()
+        session.close()
 
 
 @router.get("/models")
@@ -201,7 +660,27 @@ async def get_available_models():
     }
 
 
+@router.get("/stats")
+async def get_stats():
+    """Inference queue depth and wait-time metrics"""
+    stats = whisper_service.get_stats()
+    stats["jobs"] = await asyncio.to_thread(job_manager.stats)
+    return stats
+
+
 @router.get("/health")
+@router.get("/health/live")
 async def health_check():
-    """Health check endpoint"""
+    """Liveness: the process is up and serving requests"""
     return {"status": "healthy", "service": "SafeSound API"}
+
+
+@router.get("/health/ready")
+async def readiness_check():
+    """Readiness: the configured models are loaded and warmed up"""
+    if not whisper_service.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "starting", "service": "SafeSound API"},
+        )
+    return {"status": "ready", "service": "SafeSound API"}
@@ -1,11 +1,15 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from typing import Dict, List, Optional, Literal
 from enum import Enum
 
 class WhisperModel(str, Enum):
     SMALL = "small"
     MEDIUM = "medium"
     TURBO = "turbo"
+    # Linear layers quantized to int8, for CPU deployments
+    SMALL_INT8 = "small-int8"
+    MEDIUM_INT8 = "medium-int8"
+    TURBO_INT8 = "turbo-int8"
 
 class TranscriptionAction(str, Enum):
     TRANSCRIBE = "transcribe"
@@ -16,6 +20,21 @@ class TranscriptionRequest(BaseModel):
     action: TranscriptionAction = TranscriptionAction.TRANSCRIBE
     language: Optional[str] = None
 
+class Word(BaseModel):
+    word: str
+    start: float
+    end: float
+    probability: Optional[float] = None
+
+class Segment(BaseModel):
+    id: int
+    start: float
+    end: float
+    text: str
+    avg_logprob: Optional[float] = None
+    no_speech_prob: Optional[float] = None
+    words: Optional[List[Word]] = None
+
 class TranscriptionResponse(BaseModel):
     model_config = {"protected_namespaces": ()}
     
@@ -25,6 +44,22 @@ class TranscriptionResponse(BaseModel):
     processing_time: float
     model_used: str
     action_performed: str
+    cached: bool = False
+    segments: Optional[List[Segment]] = None
+
+class LanguageDetectionResponse(BaseModel):
+    model_config = {"protected_namespaces": ()}
+    
+    success: bool
+    language: str
+    probabilities: Dict[str, float]
+    processing_time: float
+    model_used: str
+    cached: bool = False
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
 
 class TranscriptionProgress(BaseModel):
     progress: int = Field(..., ge=0, le=100)
@@ -0,0 +1,552 @@
+import atexit
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import wave
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+from src.core.config import settings
+from src.services.audio_frontend import PolyphaseResampler, downmix
+import logging
+
+logger = logging.getLogger(__name__)
+
+AudioSource = Union[str, bytes, bytearray, BinaryIO]
+
+# Bytes copied to the decoder's stdin per write
+DECODE_CHUNK_SIZE = 64 * 1024
+
+# Frames read at a time by the in-process decoders, which resample as
+# they read so only the 16 kHz mono result is held in full
+DECODE_BLOCK_FRAMES = 256 * 1024
+
+# Containers that keep their index at the end of the file and therefore
+# cannot be demuxed from a non-seekable pipe
+SEEKABLE_INPUT_FORMATS = {".m4a", ".mp4"}
+
+# Raw PCM stream encodings and their numpy sample types
+PCM_STREAM_FORMATS = {"pcm_s16le": "<i2", "pcm_f32le": "<f4"}
+
+# Compressed stream containers, decoded by ffmpeg
+CONTAINER_STREAM_FORMATS = {"webm", "ogg"}
+
+
+# File signatures of formats decoded without ffmpeg
+WAV_MAGIC = (b"RIFF", b"WAVE")
+FLAC_MAGIC = b"fLaC"
+
+
+class AudioDecodeError(RuntimeError):
+    """Raised when the input cannot be decoded as audio"""
+
+
+class DecoderPool:
+    """
+    ffmpeg processes started ahead of the requests that need them
+
+    ffmpeg decodes one input per process, so processes cannot be reused
+    across files; instead up to ``size`` spare processes per command wait
+    on their stdin, and each one handed out is replaced in the
+    background. Starting ffmpeg is then off the request path, which is
+    most of the cost for the short clips mobile apps send.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: Dict[Tuple[str, ...], List[subprocess.Popen]] = {}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def spawn(cmd: List[str], stdin: bool = True) -> subprocess.Popen:
+        try:
+            return subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE if stdin else None,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        except FileNotFoundError as e:
+            raise AudioDecodeError("ffmpeg is not installed") from e
+
+    def _refill(self, key: Tuple[str, ...]) -> None:
+        try:
+            process = self.spawn(list(key))
+        except AudioDecodeError:
+            return
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.size:
+                idle.append(process)
+                return
+        process.kill()
+        process.wait()
+
+    def take(self, cmd: List[str]) -> subprocess.Popen:
+        """A running ffmpeg for ``cmd`` that reads its input from stdin"""
+        if self.size <= 0:
+            return self.spawn(cmd)
+        key = tuple(cmd)
+        process = None
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle and process is None:
+                candidate = idle.pop()
+                if candidate.poll() is None:
+                    process = candidate
+            if process is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        if process is None:
+            process = self.spawn(cmd)
+        threading.Thread(target=self._refill, args=(key,), daemon=True).start()
+        return process
+
+    def reset(self) -> None:
+        """Forget spare processes inherited from a parent process"""
+        with self._lock:
+            self._idle = {}
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for processes in idle.values():
+            for process in processes:
+                process.kill()
+                process.wait()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "idle": sum(len(idle) for idle in self._idle.values()),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+# Spare ffmpeg processes for piped decodes
+decoder_pool = DecoderPool(settings.DECODER_POOL_SIZE)
+atexit.register(decoder_pool.close)
+if hasattr(os, "register_at_fork"):
+    # Workers of a pre-fork server start their own spares
+    os.register_at_fork(after_in_child=decoder_pool.reset)
+
+
+def _ffmpeg_command(
+    input_arg: str, sample_rate: int, duration: Optional[float] = None
+) -> List[str]:
+    cmd = ["ffmpeg"]
+    if input_arg != "pipe:0":
+        cmd.append("-nostdin")
+    if duration is not None:
+        cmd += ["-t", str(duration)]
+    return cmd + [
+        "-loglevel",
+        "error",
+        "-threads",
+        "0",
+        "-i",
+        input_arg,
+        "-f",
+        "s16le",
+        "-ac",
+        "1",
+        "-acodec",
+        "pcm_s16le",
+        "-ar",
+        str(sample_rate),
+        "pipe:1",
+    ]
+
+
+def _pump(source: BinaryIO, stdin: BinaryIO) -> None:
+    """Copy a file object into the decoder's stdin in fixed-size chunks"""
+    try:
+        while True:
+            chunk = source.read(DECODE_CHUNK_SIZE)
+            if not chunk:
+                break
+            stdin.write(chunk)
+    except (BrokenPipeError, ValueError):
+        # The decoder exited early; its stderr carries the reason
+        pass
+    finally:
+        try:
+            stdin.close()
+        except OSError:
+            pass
+
+
+def _run_ffmpeg(cmd: List[str], source: Optional[BinaryIO]) -> bytes:
+    if source is not None:
+        process = decoder_pool.take(cmd)
+    else:
+        process = DecoderPool.spawn(cmd, stdin=False)
+
+    stderr: List[bytes] = []
+    threads = [
+        threading.Thread(
+            target=lambda: stderr.append(process.stderr.read()),
+            daemon=True,
+        )
+    ]
+    if source is not None:
+        threads.append(
+            threading.Thread(
+                target=_pump, args=(source, process.stdin), daemon=True
+            )
+        )
+    for thread in threads:
+        thread.start()
+
+    output = process.stdout.read()
+    process.wait()
+    for thread in threads:
+        thread.join()
+
+    if process.returncode != 0:
+        message = b"".join(stderr).decode(errors="replace").strip()
+        raise AudioDecodeError(f"Failed to decode audio: {message}")
+    return output
+
+
+def _pcm_to_float(data: bytes, width: int) -> Optional[np.ndarray]:
+    """Integer PCM of ``width`` bytes per sample as float32 in [-1, 1)"""
+    if width == 1:
+        return (np.frombuffer(data, np.uint8).astype(np.float32) - 128) / 128
+    if width == 2:
+        return np.frombuffer(data, "<i2").astype(np.float32) / 32768.0
+    if width == 3:
+        raw = np.frombuffer(data, np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        samples = np.where(samples >= 1 << 23, samples - (1 << 24), samples)
+        return samples.astype(np.float32) / float(1 << 23)
+    if width == 4:
+        return np.frombuffer(data, "<i4").astype(np.float32) / float(1 << 31)
+    return None
+
+
+def _resample_blocks(
+    blocks: Iterable[np.ndarray], rate: int, sample_rate: int
+) -> np.ndarray:
+    """Downmix and resample blocks shaped (frames, channels) as a stream"""
+    resampler = PolyphaseResampler(rate, sample_rate)
+    parts = [resampler.process(downmix(block)) for block in blocks]
+    parts.append(resampler.flush())
+    return np.concatenate(parts)
+
+
+def _decode_wav(
+    source: BinaryIO, sample_rate: int, duration: Optional[float]
+) -> Optional[np.ndarray]:
+    """Integer PCM WAV through the wave module, None if unsupported"""
+    try:
+        f = wave.open(source, "rb")
+    except (wave.Error, EOFError):
+        # e.g. float or extensible WAV
+        return None
+    with f:
+        channels = f.getnchannels()
+        width = f.getsampwidth()
+        rate = f.getframerate()
+        if _pcm_to_float(b"", width) is None:
+            return None
+        frames = f.getnframes()
+        if duration is not None:
+            frames = min(frames, int(duration * rate))
+
+        def blocks():
+            remaining = frames
+            frame_size = width * channels
+            while remaining > 0:
+                data = f.readframes(min(remaining, DECODE_BLOCK_FRAMES))
+                # A truncated file can end part way through a frame
+                data = data[: len(data) - len(data) % frame_size]
+                if not data:
+                    break
+                remaining -= len(data) // frame_size
+                yield _pcm_to_float(data, width).reshape(-1, channels)
+
+        return _resample_blocks(blocks(), rate, sample_rate)
+
+
+def _decode_soundfile(
+    source: BinaryIO, sample_rate: int, duration: Optional[float]
+) -> Optional[np.ndarray]:
+    """FLAC (or any WAV) through libsndfile, None if it is not installed"""
+    try:
+        import soundfile
+    except ImportError:
+        return None
+    try:
+        with soundfile.SoundFile(source) as f:
+            frames = -1 if duration is None else int(duration * f.samplerate)
+            blocks = f.blocks(
+                DECODE_BLOCK_FRAMES,
+                frames=frames,
+                dtype="float32",
+                always_2d=True,
+            )
+            return _resample_blocks(blocks, f.samplerate, sample_rate)
+    except RuntimeError as e:
+        raise AudioDecodeError(f"Failed to decode audio: {str(e)}") from e
+
+
+def _decode_uncompressed(
+    source: BinaryIO, sample_rate: int, duration: Optional[float]
+) -> Optional[np.ndarray]:
+    """
+    Decode WAV and FLAC in process, recognised by their signature
+
+    Returns None for other formats, and for variants the fast paths do
+    not handle, leaving ``source`` where it was for ffmpeg.
+    """
+    try:
+        position = source.tell()
+        header = source.read(12)
+        source.seek(position)
+    except (AttributeError, OSError):
+        # Pipes cannot be rewound for ffmpeg after peeking
+        return None
+
+    samples = None
+    if header[:4] == WAV_MAGIC[0] and header[8:12] == WAV_MAGIC[1]:
+        samples = _decode_wav(source, sample_rate, duration)
+        if samples is None:
+            source.seek(position)
+            samples = _decode_soundfile(source, sample_rate, duration)
+    elif header[:4] == FLAC_MAGIC:
+        samples = _decode_soundfile(source, sample_rate, duration)
+    source.seek(position)
+    return samples
+
+
+def decode_audio(
+    source: AudioSource,
+    sample_rate: int = settings.SAMPLE_RATE,
+    file_extension: Optional[str] = None,
+    duration: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Decode audio to float32 mono PCM
+
+    ``source`` may be a path, raw bytes or a readable binary file object.
+    PCM WAV (and FLAC when soundfile is installed) is decoded in process;
+    everything else takes a single ffmpeg pass. Bytes and file objects
+    are streamed to ffmpeg over a pipe, so no intermediate file is
+    written. With ``duration`` only the first seconds are decoded.
+    """
+    if isinstance(source, str):
+        if not os.path.exists(source):
+            raise AudioDecodeError(f"Audio file not found: {source}")
+        with open(source, "rb") as f:
+            samples = _decode_uncompressed(f, sample_rate, duration)
+        if samples is not None:
+            return samples
+        output = _run_ffmpeg(
+            _ffmpeg_command(source, sample_rate, duration), None
+        )
+    else:
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+
+        samples = _decode_uncompressed(source, sample_rate, duration)
+        if samples is not None:
+            return samples
+        if file_extension in SEEKABLE_INPUT_FORMATS:
+            # ffmpeg needs to seek in these containers
+            with tempfile.NamedTemporaryFile(suffix=file_extension) as f:
+                shutil.copyfileobj(source, f, DECODE_CHUNK_SIZE)
+                f.flush()
+                output = _run_ffmpeg(
+                    _ffmpeg_command(f.name, sample_rate, duration), None
+                )
+        else:
+            output = _run_ffmpeg(
+                _ffmpeg_command("pipe:0", sample_rate, duration), source
+            )
+
+    return np.frombuffer(output, np.int16).astype(np.float32) / 32768.0
+
+
+class StreamDecoder:
+    """
+    Long-lived ffmpeg process decoding a continuous compressed stream
+
+    Container continuation chunks (e.g. MediaRecorder WebM clusters) carry
+    no header of their own, so they are all written to a single decoder
+    whose PCM output is collected by a reader thread.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = settings.SAMPLE_RATE,
+        input_format: Optional[str] = None,
+    ):
+        self.sample_rate = sample_rate
+        # A known container skips format probing
+        format_args = ["-f", input_format] if input_format else []
+        cmd = [
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-fflags",
+            "nobuffer",
+            "-probesize",
+            "32768",
+            "-analyzeduration",
+            "0",
+            *format_args,
+            "-i",
+            "pipe:0",
+            "-f",
+            "s16le",
+            "-ac",
+            "1",
+            "-acodec",
+            "pcm_s16le",
+            "-ar",
+            str(sample_rate),
+            "-flush_packets",
+            "1",
+            "pipe:1",
+        ]
+        try:
+            self._process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError as e:
+            raise AudioDecodeError("ffmpeg is not installed") from e
+
+        self._lock = threading.Lock()
+        self._pending = bytearray()
+        self._reader = threading.Thread(target=self._read_output, daemon=True)
+        self._reader.start()
+
+    def _read_output(self) -> None:
+        while True:
+            data = self._process.stdout.read1(DECODE_CHUNK_SIZE)
+            if not data:
+                break
+            with self._lock:
+                self._pending.extend(data)
+
+    def feed(self, data: bytes) -> None:
+        """Write the next piece of the compressed stream"""
+        try:
+            self._process.stdin.write(data)
+            self._process.stdin.flush()
+        except (BrokenPipeError, ValueError) as e:
+            raise AudioDecodeError("Stream decoder has stopped") from e
+
+    def read(self) -> np.ndarray:
+        """Return all PCM decoded since the previous call"""
+        with self._lock:
+            # Keep an odd trailing byte until its pair arrives
+            usable = len(self._pending) - len(self._pending) % 2
+            data = bytes(self._pending[:usable])
+            del self._pending[:usable]
+        return np.frombuffer(data, np.int16).astype(np.float32) / 32768.0
+
+    def close(self) -> np.ndarray:
+        """Flush the decoder and return the remaining PCM"""
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        self._reader.join(timeout=5)
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.wait()
+        return self.read()
+
+
+class PCMStreamDecoder:
+    """
+    Decoder for raw little-endian PCM streams
+
+    Drop-in replacement for ``StreamDecoder`` when the client sends
+    uncompressed mono samples: no ffmpeg process is involved, bytes split
+    across messages are reassembled, and other sample rates are resampled
+    to ``sample_rate``.
+    """
+
+    def __init__(
+        self,
+        encoding: str,
+        input_rate: int,
+        sample_rate: int = settings.SAMPLE_RATE,
+    ):
+        if encoding not in PCM_STREAM_FORMATS:
+            raise AudioDecodeError(f"Unsupported PCM encoding {encoding}")
+        self.dtype = np.dtype(PCM_STREAM_FORMATS[encoding])
+        self.scale = 32768.0 if self.dtype.kind == "i" else 1.0
+        self.sample_rate = sample_rate
+        self.resampler = None
+        if input_rate != sample_rate:
+            self.resampler = PolyphaseResampler(input_rate, sample_rate)
+
+        self._remainder = b""
+        self._pending: List[np.ndarray] = []
+        self._lock = threading.Lock()
+
+    def feed(self, data: bytes) -> None:
+        data = self._remainder + data
+        usable = len(data) - len(data) % self.dtype.itemsize
+        self._remainder = data[usable:]
+        samples = np.frombuffer(data[:usable], self.dtype).astype(np.float32)
+        if self.scale != 1.0:
+            samples /= self.scale
+        if self.resampler is not None:
+            samples = self.resampler.process(samples)
+        if len(samples):
+            with self._lock:
+                self._pending.append(samples)
+
+    def read(self) -> np.ndarray:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(pending)
+
+    def close(self) -> np.ndarray:
+        if self.resampler is not None:
+            tail = self.resampler.flush()
+            if len(tail):
+                with self._lock:
+                    self._pending.append(tail)
+        return self.read()
+
+
+def open_stream_decoder(
+    stream_format: Optional[str] = None,
+    input_rate: int = settings.SAMPLE_RATE,
+    sample_rate: int = settings.SAMPLE_RATE,
+):
+    """
+    Decoder for a real-time stream in a negotiated format
+
+    ``None`` keeps the original behaviour of probing a compressed stream.
+    """
+    if input_rate <= 0:
+        raise AudioDecodeError(f"Invalid sample rate {input_rate}")
+    if stream_format in PCM_STREAM_FORMATS:
+        return PCMStreamDecoder(stream_format, input_rate, sample_rate)
+    if stream_format is None or stream_format in CONTAINER_STREAM_FORMATS:
+        return StreamDecoder(sample_rate, stream_format)
+    allowed = sorted(PCM_STREAM_FORMATS) + sorted(CONTAINER_STREAM_FORMATS)
+    raise AudioDecodeError(
+        f"Unsupported stream format {stream_format}. Allowed: {allowed}"
+    )
@@ -0,0 +1,213 @@
+# Audio front-end: resampling, downmixing and log-mel features
+import threading
+from functools import lru_cache
+from math import gcd
+from typing import Dict, Sequence, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+from src.core.config import settings
+
+# Whisper's feature layout: 25 ms Hann windows every 10 ms over 30 s
+N_FFT = 400
+HOP_LENGTH = 160
+CHUNK_SAMPLES = 30 * settings.SAMPLE_RATE
+
+# Zero crossings of the anti-aliasing filter on each side of its centre
+RESAMPLE_ZERO_CROSSINGS = 16
+RESAMPLE_ROLLOFF = 0.95  # cutoff as a fraction of the lower Nyquist rate
+RESAMPLE_KAISER_BETA = 8.6
+
+
+def downmix(samples: np.ndarray) -> np.ndarray:
+    """Average interleaved channels, shaped (frames, channels), to mono"""
+    if samples.ndim == 1:
+        return samples.astype(np.float32, copy=False)
+    channels = samples.shape[1]
+    # A matrix-vector product is far faster than a strided mean
+    weights = np.full(channels, 1 / channels, dtype=np.float32)
+    return samples.astype(np.float32, copy=False) @ weights
+
+
+@lru_cache(maxsize=16)
+def _polyphase_filter(up: int, down: int) -> np.ndarray:
+    """
+    Kaiser-windowed sinc low-pass split into ``up`` phases
+
+    Row ``p`` holds the taps applied to consecutive input samples, newest
+    first, for outputs that fall ``p`` steps past an input sample on the
+    upsampled grid.
+    """
+    ratio = max(up, down)
+    half = RESAMPLE_ZERO_CROSSINGS * ratio
+    cutoff = RESAMPLE_ROLLOFF / ratio
+    offsets = np.arange(-half, half + 1)
+    taps = (
+        up
+        * cutoff
+        * np.sinc(cutoff * offsets)
+        * np.kaiser(2 * half + 1, RESAMPLE_KAISER_BETA)
+    )
+    per_phase = -(-len(taps) // up)
+    taps = np.pad(taps, (0, per_phase * up - len(taps)))
+    return np.ascontiguousarray(
+        taps.reshape(per_phase, up).T, dtype=np.float32
+    )
+
+
+class PolyphaseResampler:
+    """
+    Band-limited rational-ratio resampler for a continuous stream
+
+    Output sample ``n`` lies at input position ``n * down / up``; it is
+    the dot product of one filter phase with the input around that
+    position. Outputs ``up`` apart use the same phase on input ``down``
+    samples further on, so each phase is one matrix-vector product over
+    a strided view of the input, with no copies. The input needed by
+    later outputs carries over between calls, so a stream fed in chunks
+    gives the same samples as the whole signal at once.
+    """
+
+    def __init__(self, input_rate: int, output_rate: int):
+        if input_rate <= 0 or output_rate <= 0:
+            raise ValueError(
+                f"Sample rates must be positive, got {input_rate} and "
+                f"{output_rate}"
+            )
+        divisor = gcd(input_rate, output_rate)
+        self.up = output_rate // divisor
+        self.down = input_rate // divisor
+        self.filter = _polyphase_filter(self.up, self.down)
+        self.taps = self.filter.shape[1]
+        # Taps oldest first, to match input views in ascending order
+        self._reversed = np.ascontiguousarray(self.filter[:, ::-1])
+        # Filter centre on the upsampled grid
+        self.delay = RESAMPLE_ZERO_CROSSINGS * max(self.up, self.down)
+
+        # Zeros stand in for the samples before the stream started
+        self._buffer = np.zeros(self.taps, dtype=np.float32)
+        self._offset = -self.taps  # absolute index of _buffer[0]
+        self._received = 0
+        self._produced = 0
+
+    def _newest_input(self, outputs: np.ndarray) -> np.ndarray:
+        return (outputs * self.down + self.delay) // self.up
+
+    def _run(self, end: int) -> np.ndarray:
+        """Compute outputs up to index ``end`` from the buffered input"""
+        start = self._produced
+        output = np.empty(max(0, end - start), dtype=np.float32)
+        step = self.down * self._buffer.itemsize
+        for first in range(start, min(start + self.up, end)):
+            count = len(range(first, end, self.up))
+            phase = (first * self.down + self.delay) % self.up
+            base = self._newest_input(first) - self._offset - self.taps + 1
+            # Row k holds the input under output first + k * up
+            inputs = as_strided(
+                self._buffer[base:],
+                shape=(count, self.taps),
+                strides=(step, self._buffer.itemsize),
+                writeable=False,
+            )
+            output[first - start :: self.up] = np.einsum(
+                "ij,j->i", inputs, self._reversed[phase]
+            )
+        self._produced = max(self._produced, end)
+
+        # Keep the input the next output still reaches back to
+        oldest = int(self._newest_input(np.array(end))) - self.taps + 1
+        drop = min(max(0, oldest - self._offset), len(self._buffer))
+        self._buffer = self._buffer[drop:]
+        self._offset += drop
+        return output
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample the next chunk, returning every output it completes"""
+        if self.up == self.down:
+            self._received += len(samples)
+            self._produced = self._received
+            return samples.astype(np.float32, copy=False)
+        self._buffer = np.concatenate(
+            (self._buffer, samples.astype(np.float32, copy=False))
+        )
+        self._received += len(samples)
+        available = self._offset + len(self._buffer)
+        # Outputs whose newest input sample has arrived
+        end = (available * self.up - self.delay - 1) // self.down + 1
+        return self._run(max(end, self._produced))
+
+    def flush(self) -> np.ndarray:
+        """Finish the stream, treating the samples after it as silence"""
+        if self.up == self.down:
+            return np.zeros(0, dtype=np.float32)
+        total = -(-self._received * self.up // self.down)
+        self._buffer = np.concatenate(
+            (self._buffer, np.zeros(self.taps, dtype=np.float32))
+        )
+        return self._run(total)
+
+
+def resample(
+    samples: np.ndarray, input_rate: int, output_rate: int
+) -> np.ndarray:
+    """Resample a whole mono signal"""
+    if input_rate == output_rate:
+        return samples.astype(np.float32, copy=False)
+    resampler = PolyphaseResampler(input_rate, output_rate)
+    return np.concatenate((resampler.process(samples), resampler.flush()))
+
+
+# (n_mels, device) -> (Hann window, mel filterbank)
+_feature_cache: Dict[Tuple[int, str], tuple] = {}
+_feature_lock = threading.Lock()
+
+
+def _feature_tensors(n_mels: int, device) -> tuple:
+    """Window and filterbank, built once per device"""
+    key = (n_mels, str(device))
+    tensors = _feature_cache.get(key)
+    if tensors is None:
+        import torch
+        from whisper.audio import mel_filters
+
+        with _feature_lock:
+            tensors = _feature_cache.get(key)
+            if tensors is None:
+                tensors = (
+                    torch.hann_window(N_FFT).to(device),
+                    mel_filters(device, n_mels),
+                )
+                _feature_cache[key] = tensors
+    return tensors
+
+
+def log_mel_spectrogram(
+    clips: Sequence[np.ndarray], n_mels: int = 80, device="cpu"
+):
+    """
+    Whisper log-mel features for a batch of 16 kHz clips
+
+    Each clip is padded or trimmed to 30 seconds and the whole batch goes
+    through one STFT. Matches ``whisper.log_mel_spectrogram`` of
+    ``whisper.pad_or_trim`` per clip, including the per-clip dynamic
+    range clamp. Returns a tensor shaped (clips, n_mels, 3000).
+    """
+    import torch
+
+    window, filters = _feature_tensors(n_mels, device)
+    audio = np.zeros((len(clips), CHUNK_SAMPLES), dtype=np.float32)
+    for row, samples in zip(audio, clips):
+        samples = samples[:CHUNK_SAMPLES]
+        row[: len(samples)] = samples
+
+    stft = torch.stft(
+        torch.from_numpy(audio).to(device),
+        N_FFT,
+        HOP_LENGTH,
+        window=window,
+        return_complex=True,
+    )
+    magnitudes = stft[..., :-1].abs() ** 2
+    log_spec = torch.clamp(filters @ magnitudes, min=1e-10).log10()
+    peak = log_spec.amax(dim=(-2, -1), keepdim=True)
+    log_spec = torch.maximum(log_spec, peak - 8.0)
+    return (log_spec + 4.0) / 4.0
@@ -0,0 +1,31 @@
+# Inference backends
+from src.services.backends.base import (
+    InferenceBackend,
+    UnsupportedModelError,
+)
+
+BACKENDS = ("openai-whisper", "faster-whisper", "stub")
+
+
+def get_backend(
+    name: str, device: str, compute_type: str = "default"
+) -> InferenceBackend:
+    """Create the inference backend configured for this deployment"""
+    if name == "openai-whisper":
+        from src.services.backends.openai_backend import OpenAIWhisperBackend
+
+        return OpenAIWhisperBackend(device, compute_type)
+
+    if name == "faster-whisper":
+        from src.services.backends.faster_whisper_backend import (
+            FasterWhisperBackend,
+        )
+
+        return FasterWhisperBackend(device, compute_type)
+
+    if name == "stub":
+        from src.services.backends.stub_backend import StubBackend
+
+        return StubBackend(device, compute_type)
+
+    raise ValueError(f"Unknown inference backend {name}. Allowed: {BACKENDS}")
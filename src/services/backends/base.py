@@ -0,0 +1,106 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Set, Tuple
+import numpy as np
+
+# Approximate parameter counts, used to budget memory before a load
+MODEL_PARAMETERS = {
+    "small": 244_000_000,
+    "medium": 769_000_000,
+    "turbo": 809_000_000,
+}
+
+# Suffix of the int8-quantized model variants, e.g. "small-int8"
+QUANTIZED_SUFFIX = "-int8"
+
+
+class UnsupportedModelError(ValueError):
+    """Raised when a model cannot run on this deployment's device"""
+
+
+def split_variant(model_name: str) -> Tuple[str, bool]:
+    """(base model name, whether the int8 variant was requested)"""
+    if model_name.endswith(QUANTIZED_SUFFIX):
+        return model_name[: -len(QUANTIZED_SUFFIX)], True
+    return model_name, False
+
+
+class InferenceBackend(ABC):
+    """
+    Engine that loads Whisper models and runs them on decoded PCM
+
+    Every backend returns results in openai-whisper's dict layout
+    (``text``, ``segments``, ``language``) so callers do not need to know
+    which engine produced them.
+    """
+
+    name: str = ""
+    compute_types: Set[str] = {"default"}
+    # Whether transcribe_batch runs one batched forward pass
+    supports_batching: bool = False
+    # Whether models loaded before os.fork() keep working in the children
+    fork_safe: bool = False
+
+    def __init__(self, device: str, compute_type: str = "default"):
+        if compute_type not in self.compute_types:
+            raise ValueError(
+                f"Compute type {compute_type} not supported by the "
+                f"{self.name} backend. Allowed: {sorted(self.compute_types)}"
+            )
+        self.device = device
+        self.compute_type = compute_type
+
+    @property
+    def bytes_per_parameter(self) -> int:
+        return 4
+
+    def expected_size(self, model_name: str) -> int:
+        """Estimated resident size of a model before it is loaded"""
+        base, quantized = split_variant(model_name)
+        parameters = MODEL_PARAMETERS.get(base, 0)
+        return parameters * (1 if quantized else self.bytes_per_parameter)
+
+    def model_size(self, model_name: str, model: Any) -> int:
+        """Resident size of a loaded model in bytes"""
+        return self.expected_size(model_name)
+
+    @contextmanager
+    def prefork_loading(self):
+        """Context for loading models that forked workers will share"""
+        yield
+
+    def set_threads(self, threads: int) -> None:
+        """Intra-op threads for inference calls made from this thread"""
+
+    @abstractmethod
+    def load_model(self, model_name: str) -> Any:
+        """Load a model by name"""
+
+    @abstractmethod
+    def transcribe(
+        self, model: Any, samples: np.ndarray, **options
+    ) -> Dict[str, Any]:
+        """Transcribe float32 16 kHz mono PCM with a loaded model"""
+
+    def detect_language(
+        self, model: Any, samples: np.ndarray
+    ) -> Dict[str, float]:
+        """Language probabilities for up to 30 seconds of PCM"""
+        raise NotImplementedError(
+            f"The {self.name} backend does not support language detection"
+        )
+
+    def transcribe_batch(
+        self,
+        model: Any,
+        batch: List[np.ndarray],
+        task: str = "transcribe",
+        language: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Transcribe several clips of at most 30 seconds each"""
+        options = {"task": task}
+        if language:
+            options["language"] = language
+        return [
+            self.transcribe(model, samples, **options) for samples in batch
+        ]
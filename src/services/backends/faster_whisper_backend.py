@@ -0,0 +1,114 @@
+from typing import Any, Dict
+import numpy as np
+from src.services.backends.base import InferenceBackend, split_variant
+from src.services.cpu_slots import inference_plan
+
+# Names accepted by the API that CTranslate2 model hubs spell differently
+MODEL_ALIASES = {"turbo": "large-v3-turbo"}
+
+
+class FasterWhisperBackend(InferenceBackend):
+    """CTranslate2 implementation from the faster-whisper package"""
+
+    name = "faster-whisper"
+    compute_types = {
+        "default",
+        "auto",
+        "int8",
+        "int8_float16",
+        "int8_float32",
+        "int8_bfloat16",
+        "int16",
+        "float16",
+        "bfloat16",
+        "float32",
+    }
+    # CTranslate2 starts its worker threads when a model is loaded, and
+    # threads do not survive fork
+    fork_safe = False
+
+    def __init__(
+        self,
+        device: str,
+        compute_type: str = "default",
+        cpu_threads: int = 0,
+        num_workers: int = 0,
+    ):
+        super().__init__(device, compute_type)
+        self.cpu_threads = cpu_threads
+        self.num_workers = num_workers
+
+    @property
+    def bytes_per_parameter(self) -> int:
+        if self.compute_type.startswith("int8"):
+            return 1
+        if self.compute_type == "float32":
+            return 4
+        return 2
+
+    def load_model(self, model_name: str) -> Any:
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError(
+                "The faster-whisper backend requires the faster-whisper "
+                "package: pip install faster-whisper"
+            ) from e
+
+        # By default one CTranslate2 worker per inference slot, so
+        # concurrent requests are not serialized inside the model
+        slots, threads = inference_plan()
+        # CTranslate2 quantizes the int8 variants itself when loading
+        base, quantized = split_variant(model_name)
+        return WhisperModel(
+            MODEL_ALIASES.get(base, base),
+            device=self.device,
+            compute_type="int8" if quantized else self.compute_type,
+            cpu_threads=self.cpu_threads or threads,
+            num_workers=self.num_workers or slots,
+        )
+
+    def detect_language(
+        self, model: Any, samples: np.ndarray
+    ) -> Dict[str, float]:
+        _, _, probabilities = model.detect_language(
+            samples, language_detection_segments=1
+        )
+        return dict(probabilities)
+
+    def transcribe(
+        self, model: Any, samples: np.ndarray, **options
+    ) -> Dict[str, Any]:
+        segments, info = model.transcribe(samples, **options)
+
+        results = []
+        for segment in segments:
+            result = {
+                "id": segment.id,
+                "seek": segment.seek,
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "tokens": list(segment.tokens),
+                "temperature": segment.temperature,
+                "avg_logprob": segment.avg_logprob,
+                "compression_ratio": segment.compression_ratio,
+                "no_speech_prob": segment.no_speech_prob,
+            }
+            if segment.words:
+                result["words"] = [
+                    {
+                        "word": word.word,
+                        "start": word.start,
+                        "end": word.end,
+                        "probability": word.probability,
+                    }
+                    for word in segment.words
+                ]
+            results.append(result)
+
+        return {
+            "text": "".join(segment["text"] for segment in results),
+            "segments": results,
+            "language": info.language,
+        }
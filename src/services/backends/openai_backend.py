@@ -0,0 +1,244 @@
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+import numpy as np
+import torch
+import whisper
+from torch import nn
+from whisper.audio import SAMPLE_RATE
+from whisper.tokenizer import get_tokenizer
+from src.core.config import settings
+from src.core import metrics
+from src.services.audio_frontend import log_mel_spectrogram
+from src.services.backends.base import (
+    InferenceBackend,
+    UnsupportedModelError,
+    split_variant,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Thresholds whisper.transcribe uses to reject a decode
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+def quantize_int8(model: whisper.Whisper) -> whisper.Whisper:
+    """
+    Dynamically quantize the model's linear layers to int8, in place
+
+    Weights are stored as int8 and activations are quantized on the fly,
+    which roughly quarters the size of the attention and MLP weights and
+    speeds up their matrix products on CPU. Convolutions, embeddings and
+    layer norms stay in float32.
+    """
+    for module in model.modules():
+        # whisper's Linear only adds a dtype cast that float32 CPU
+        # inference does not need, and quantize_dynamic matches exact types
+        if type(module) is whisper.model.Linear:
+            module.__class__ = nn.Linear
+    return torch.ao.quantization.quantize_dynamic(
+        model, {nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+
+
+class OpenAIWhisperBackend(InferenceBackend):
+    """Reference PyTorch implementation from the openai-whisper package"""
+
+    name = "openai-whisper"
+    compute_types = {"default", "float16", "float32"}
+    supports_batching = True
+
+    def __init__(self, device: str, compute_type: str = "default"):
+        super().__init__(device, compute_type)
+        if compute_type == "default":
+            self.fp16 = device == "cuda"
+        else:
+            self.fp16 = compute_type == "float16"
+
+    @property
+    def fork_safe(self) -> bool:
+        # A CUDA context does not survive fork; CPU tensors are plain memory
+        return self.device == "cpu"
+
+    @contextmanager
+    def prefork_loading(self):
+        """
+        Load on a single intra-op thread
+
+        An OpenMP thread pool started in the parent is not recreated in
+        forked children and can hang their first parallel region.
+        """
+        threads = torch.get_num_threads()
+        torch.set_num_threads(1)
+        try:
+            yield
+        finally:
+            torch.set_num_threads(threads)
+
+    def model_size(self, model_name: str, model: whisper.Whisper) -> int:
+        tensors = list(model.parameters()) + list(model.buffers())
+        if split_variant(model_name)[1]:
+            # Quantized linear layers pack their tensors outside parameters
+            for module in model.modules():
+                if isinstance(module, torch.ao.nn.quantized.dynamic.Linear):
+                    tensors.append(module.weight())
+                    if module.bias() is not None:
+                        tensors.append(module.bias())
+        return sum(t.numel() * t.element_size() for t in tensors)
+
+    def set_threads(self, threads: int) -> None:
+        # Also sets the OpenMP team size of the calling thread
+        torch.set_num_threads(threads)
+
+    def load_model(self, model_name: str) -> whisper.Whisper:
+        base, quantized = split_variant(model_name)
+        if not quantized:
+            return whisper.load_model(model_name, device=self.device)
+        if self.device != "cpu":
+            raise UnsupportedModelError(f"Model {model_name} runs on CPU only")
+        return self._load_quantized(base)
+
+    def _load_quantized(self, base: str) -> whisper.Whisper:
+        """Load the int8 variant, converting and caching it on first use"""
+        cache_dir = os.path.expanduser(settings.QUANTIZED_MODEL_DIR)
+        # Packed int8 weights are not portable across torch versions
+        path = os.path.join(cache_dir, f"{base}-int8-{torch.__version__}.pt")
+        if os.path.exists(path):
+            return torch.load(path, map_location="cpu", weights_only=False)
+
+        logger.info(f"Quantizing {base} to int8")
+        model = quantize_int8(whisper.load_model(base, device="cpu"))
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            temp_path = f"{path}.tmp"
+            torch.save(model, temp_path)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not cache quantized model: {str(e)}")
+        return model
+
+    def transcribe(
+        self, model: whisper.Whisper, samples: np.ndarray, **options
+    ) -> Dict[str, Any]:
+        return model.transcribe(samples, fp16=self.fp16, **options)
+
+    def detect_language(
+        self, model: whisper.Whisper, samples: np.ndarray
+    ) -> Dict[str, float]:
+        """Run the encoder and one decoder step on a single mel window"""
+        with metrics.STAGE_SECONDS.labels("frontend").time():
+            mel = log_mel_spectrogram(
+                [samples], model.dims.n_mels, model.device
+            )[0]
+        if self.fp16:
+            mel = mel.half()
+        _, probabilities = model.detect_language(mel)
+        return probabilities
+
+    def _segments(
+        self,
+        model: whisper.Whisper,
+        result: "whisper.DecodingResult",
+        duration: float,
+        task: str,
+    ) -> List[Dict[str, Any]]:
+        """Split a window's tokens into segments at timestamp tokens"""
+        tokenizer = get_tokenizer(
+            model.is_multilingual,
+            num_languages=model.num_languages,
+            language=result.language,
+            task=task,
+        )
+        time_precision = 0.02  # seconds per timestamp token
+
+        segments = []
+        start = 0.0
+        text_tokens: List[int] = []
+        for token in list(result.tokens) + [None]:
+            is_timestamp = token is not None and (
+                token >= tokenizer.timestamp_begin
+            )
+            if token is not None and not is_timestamp:
+                text_tokens.append(token)
+                continue
+            if token is None:
+                end = duration
+            else:
+                end = (token - tokenizer.timestamp_begin) * time_precision
+            if text_tokens:
+                segments.append(
+                    {
+                        "id": len(segments),
+                        "seek": 0,
+                        "start": start,
+                        "end": min(end, duration),
+                        "text": tokenizer.decode(text_tokens),
+                        "tokens": text_tokens,
+                        "temperature": result.temperature,
+                        "avg_logprob": result.avg_logprob,
+                        "compression_ratio": result.compression_ratio,
+                        "no_speech_prob": result.no_speech_prob,
+                    }
+                )
+                text_tokens = []
+            start = end
+        return segments
+
+    def transcribe_batch(
+        self,
+        model: whisper.Whisper,
+        batch: List[np.ndarray],
+        task: str = "transcribe",
+        language: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Transcribe up to 30-second clips in one batched encoder/decoder pass
+
+        Decoding is greedy at temperature 0. Clips whose output trips
+        whisper.transcribe's quality thresholds are re-run on their own
+        with the usual temperature fallback.
+        """
+        # Features for the whole batch in one STFT, straight to the model
+        with metrics.STAGE_SECONDS.labels("frontend").time():
+            mel = log_mel_spectrogram(batch, model.dims.n_mels, model.device)
+        options = whisper.DecodingOptions(
+            task=task, language=language, fp16=self.fp16
+        )
+        results = whisper.decode(model, mel, options)
+
+        outputs = []
+        for samples, result in zip(batch, results):
+            no_speech = (
+                result.no_speech_prob > NO_SPEECH_THRESHOLD
+                and result.avg_logprob < LOGPROB_THRESHOLD
+            )
+            if no_speech:
+                outputs.append(
+                    {"text": "", "segments": [], "language": result.language}
+                )
+                continue
+
+            failed = (
+                result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                or result.avg_logprob < LOGPROB_THRESHOLD
+            )
+            if failed:
+                fallback = {"task": task}
+                if language:
+                    fallback["language"] = language
+                outputs.append(self.transcribe(model, samples, **fallback))
+                continue
+
+            outputs.append(
+                {
+                    "text": result.text,
+                    "segments": self._segments(
+                        model, result, len(samples) / SAMPLE_RATE, task
+                    ),
+                    "language": result.language,
+                }
+            )
+        return outputs
@@ -0,0 +1,90 @@
+import time
+from typing import Any, Dict, List, Optional
+import numpy as np
+from src.core.config import settings
+from src.services.backends.base import InferenceBackend
+
+# Length of the fake segments the stub emits
+SEGMENT_SECONDS = 5.0
+
+
+class StubBackend(InferenceBackend):
+    """
+    Model-free backend for benchmarks and tests
+
+    Instead of running a model it sleeps for ``realtime_factor`` seconds
+    per second of audio and returns placeholder text, so the service's
+    own overhead can be measured offline and without model weights.
+    """
+
+    name = "stub"
+    supports_batching = True
+    fork_safe = True
+
+    def __init__(
+        self,
+        device: str,
+        compute_type: str = "default",
+        realtime_factor: float = 0.01,
+        load_seconds: float = 0.0,
+    ):
+        super().__init__(device, compute_type)
+        self.realtime_factor = realtime_factor
+        self.load_seconds = load_seconds
+
+    def expected_size(self, model_name: str) -> int:
+        return 0
+
+    def load_model(self, model_name: str) -> Any:
+        time.sleep(self.load_seconds)
+        return {"name": model_name}
+
+    def _result(
+        self, samples: np.ndarray, language: Optional[str]
+    ) -> Dict[str, Any]:
+        duration = len(samples) / settings.SAMPLE_RATE
+        segments = []
+        start = 0.0
+        while start < duration:
+            end = min(start + SEGMENT_SECONDS, duration)
+            segments.append(
+                {
+                    "id": len(segments),
+                    "start": start,
+                    "end": end,
+                    "text": f" Segment {len(segments)}.",
+                    "avg_logprob": -0.1,
+                    "no_speech_prob": 0.0,
+                }
+            )
+            start = end
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": language or "en",
+        }
+
+    def transcribe(
+        self, model: Any, samples: np.ndarray, **options
+    ) -> Dict[str, Any]:
+        time.sleep(
+            len(samples) / settings.SAMPLE_RATE * self.realtime_factor
+        )
+        return self._result(samples, options.get("language"))
+
+    def transcribe_batch(
+        self,
+        model: Any,
+        batch: List[np.ndarray],
+        task: str = "transcribe",
+        language: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        # A batched pass costs about as much as its longest clip
+        longest = max(len(samples) for samples in batch)
+        time.sleep(longest / settings.SAMPLE_RATE * self.realtime_factor)
+        return [self._result(samples, language) for samples in batch]
+
+    def detect_language(
+        self, model: Any, samples: np.ndarray
+    ) -> Dict[str, float]:
+        return {"en": 0.9, "pt": 0.1}
@@ -0,0 +1,105 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class _Batch:
+    def __init__(self):
+        self.items: List[Any] = []
+        self.closed = False
+        self.done = threading.Event()
+        self.results: Optional[List[Any]] = None
+        self.error: Optional[BaseException] = None
+
+
+class BatchScheduler:
+    """
+    Collects concurrent requests with the same key into one batched call
+
+    The first caller for a key becomes the batch leader: it waits up to
+    ``max_wait`` seconds (or until ``max_batch_size`` items have joined),
+    runs ``run_batch`` on its own thread and hands every follower its
+    result. No dispatcher thread is needed, and independent keys batch in
+    parallel on the callers' worker threads.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[Hashable, List[Any]], List[Any]],
+        max_batch_size: int,
+        max_wait: float,
+    ):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self._cond = threading.Condition()
+        self._open: Dict[Hashable, _Batch] = {}
+
+        # Metrics
+        self._batches = 0
+        self._items = 0
+        self._max_seen = 0
+
+    def _close(self, key: Hashable, batch: _Batch) -> None:
+        batch.closed = True
+        if self._open.get(key) is batch:
+            del self._open[key]
+
+    def submit(self, key: Hashable, item: Any) -> Any:
+        """Add ``item`` to the open batch for ``key`` and return its result"""
+        with self._cond:
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = _Batch()
+                self._open[key] = batch
+            index = len(batch.items)
+            batch.items.append(item)
+            if len(batch.items) >= self.max_batch_size:
+                self._close(key, batch)
+                self._cond.notify_all()
+
+            if leader:
+                deadline = time.monotonic() + self.max_wait
+                while not batch.closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                self._close(key, batch)
+
+        if not leader:
+            batch.done.wait()
+            if batch.error is not None:
+                raise batch.error
+            return batch.results[index]
+
+        try:
+            batch.results = self.run_batch(key, batch.items)
+        except BaseException as e:
+            batch.error = e
+            raise
+        finally:
+            with self._cond:
+                self._batches += 1
+                self._items += len(batch.items)
+                self._max_seen = max(self._max_seen, len(batch.items))
+            batch.done.set()
+        return batch.results[index]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait": self.max_wait,
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch_size": (
+                    self._items / self._batches if self._batches else 0.0
+                ),
+                "largest_batch": self._max_seen,
+            }
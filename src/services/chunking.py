@@ -0,0 +1,109 @@
+# Long-form chunk planning and stitching
+from typing import Any, Dict, List, Tuple
+import numpy as np
+from src.services.vad import Region, SpeechTimeline
+
+
+def split_long_regions(
+    regions: List[Region],
+    levels: np.ndarray,
+    frame_size: int,
+    max_samples: int,
+    overlap: int,
+    search: int,
+) -> List[Region]:
+    """
+    Split speech regions longer than ``max_samples`` into overlapping pieces
+
+    Each cut is placed at the quietest frame in the last ``search`` samples
+    that still fit the window, so continuous speech is divided at its
+    softest point. Neighbouring pieces share ``overlap`` samples centred
+    on the cut.
+    """
+    half = overlap // 2
+    pieces: List[Region] = []
+    for start, end in regions:
+        while end - start > max_samples:
+            latest = start + max_samples - half
+            earliest = max(start + half + 1, latest - search)
+            cut = latest
+            first_frame = earliest // frame_size
+            last_frame = latest // frame_size
+            if last_frame > first_frame and last_frame <= len(levels):
+                quietest = int(np.argmin(levels[first_frame:last_frame]))
+                cut = (first_frame + quietest) * frame_size
+            pieces.append((start, cut + half))
+            start = cut - half
+        pieces.append((start, end))
+    return pieces
+
+
+def cut_points(batches: List[List[Region]]) -> List[int]:
+    """
+    Boundary between each pair of consecutive batches, in samples
+
+    The boundary is the midpoint between one batch's last sample and the
+    next batch's first: the middle of the pause between them, or the
+    centre of the overlap when a long region was split.
+    """
+    return [
+        (previous[-1][1] + following[0][0]) // 2
+        for previous, following in zip(batches, batches[1:])
+    ]
+
+
+def window_bounds(batches: List[List[Region]], sample_rate: int):
+    """(lower, upper) bounds in seconds of the segments each batch keeps"""
+    cuts = [cut / sample_rate for cut in cut_points(batches)]
+    return list(zip([float("-inf")] + cuts, cuts + [float("inf")]))
+
+
+def window_segments(
+    batch: List[Region],
+    result: Dict[str, Any],
+    bounds: Tuple[float, float],
+    sample_rate: int,
+) -> List[Dict[str, Any]]:
+    """
+    Segments of one batch result on the original timeline
+
+    Only segments whose midpoint falls within ``bounds`` are kept, so
+    text in an overlap is taken from exactly one batch. The bounds depend
+    only on the batch plan, so each result can be trimmed as soon as it
+    is ready.
+    """
+    lower, upper = bounds
+    timeline = SpeechTimeline(batch, sample_rate)
+    return [
+        segment
+        for segment in timeline.remap_segments(result.get("segments", []))
+        if lower <= (segment["start"] + segment["end"]) / 2 < upper
+    ]
+
+
+def stitch_results(
+    batches: List[List[Region]],
+    results: List[Dict[str, Any]],
+    sample_rate: int,
+) -> Dict[str, Any]:
+    """Merge per-batch Whisper results into one transcript"""
+    texts = []
+    segments = []
+    bounds = window_bounds(batches, sample_rate)
+    for batch, result, batch_bounds in zip(batches, results, bounds):
+        if not result.get("segments"):
+            # Backends without segment output cannot be trimmed
+            texts.append(result["text"].strip())
+            continue
+
+        kept = window_segments(batch, result, batch_bounds, sample_rate)
+        segments.extend(kept)
+        texts.append("".join(segment["text"] for segment in kept).strip())
+
+    for index, segment in enumerate(segments):
+        segment["id"] = index
+
+    return {
+        "text": " ".join(text for text in texts if text),
+        "segments": segments,
+    }
@@ -0,0 +1,148 @@
+# CPU budget for concurrent inference
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+from src.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Intra-op threads per slot when the number of slots is derived
+DEFAULT_THREADS_PER_SLOT = 4
+
+# (index, count) of this process among the workers started by serve.py
+_worker: Optional[Tuple[int, int]] = None
+
+
+def assign_worker(index: int, workers: int) -> None:
+    """Give this process its own share of the cores of a pre-fork server"""
+    global _worker
+    _worker = (index, workers)
+
+
+def split_cores(cores: List[int], parts: int) -> List[List[int]]:
+    """Divide cores into ``parts`` contiguous groups of near-equal size"""
+    return [
+        cores[len(cores) * part // parts : len(cores) * (part + 1) // parts]
+        for part in range(parts)
+    ]
+
+
+def process_cores() -> List[int]:
+    """Cores this process may use for inference"""
+    if hasattr(os, "sched_getaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+    else:
+        cores = list(range(os.cpu_count() or 1))
+    if _worker is not None:
+        index, workers = _worker
+        if len(cores) >= workers:
+            cores = split_cores(cores, workers)[index]
+    return cores
+
+
+def inference_plan(cores: Optional[int] = None) -> Tuple[int, int]:
+    """(slots, threads per slot) from the settings and the core count"""
+    if cores is None:
+        cores = len(process_cores())
+    slots = settings.INFERENCE_SLOTS
+    if slots <= 0:
+        slots = max(1, cores // DEFAULT_THREADS_PER_SLOT)
+    threads = settings.INFERENCE_THREADS
+    if threads <= 0:
+        threads = max(1, cores // slots)
+    return slots, threads
+
+
+class InferenceSlots:
+    """
+    Bounds concurrent model calls and gives each a fixed share of the CPU
+
+    Every call runs in one of ``slots`` slots. The first time a thread
+    takes a slot its intra-op thread count is set through ``set_threads``,
+    and with ``core_sets`` it is pinned to its slot's cores, so concurrent
+    requests divide the machine instead of each asking for all of it. A
+    thread takes the slot it used last when that slot is free, keeping the
+    engine's per-thread pools on the same cores.
+    """
+
+    def __init__(
+        self,
+        slots: int,
+        threads: int,
+        set_threads: Callable[[int], None],
+        core_sets: Optional[List[List[int]]] = None,
+    ):
+        self.slots = slots
+        self.threads = threads
+        self.set_threads = set_threads
+        self.core_sets = core_sets
+
+        self._free = list(range(slots))
+        self._condition = threading.Condition()
+        self._local = threading.local()
+
+        # Metrics
+        self._calls = 0
+        self._waits = 0
+
+    @classmethod
+    def from_settings(
+        cls, set_threads: Callable[[int], None]
+    ) -> "InferenceSlots":
+        cores = process_cores()
+        slots, threads = inference_plan(len(cores))
+        core_sets = None
+        if settings.INFERENCE_PIN_CORES:
+            if not hasattr(os, "sched_setaffinity"):
+                logger.warning("Core pinning is not supported on this OS")
+            elif len(cores) < slots:
+                logger.warning(
+                    f"Cannot pin {slots} inference slots to {len(cores)} "
+                    f"cores; running unpinned"
+                )
+            else:
+                core_sets = split_cores(cores, slots)
+        logger.info(
+            f"Inference slots: {slots} x {threads} threads"
+            f"{', pinned' if core_sets else ''}"
+        )
+        return cls(slots, threads, set_threads, core_sets)
+
+    @contextmanager
+    def acquire(self):
+        """Hold a slot, configuring the calling thread for it"""
+        last = getattr(self._local, "slot", None)
+        with self._condition:
+            self._calls += 1
+            if not self._free:
+                self._waits += 1
+                while not self._free:
+                    self._condition.wait()
+            slot = last if last in self._free else self._free[0]
+            self._free.remove(slot)
+
+        try:
+            if last is None:
+                self.set_threads(self.threads)
+            if slot != last and self.core_sets:
+                # On Linux pid 0 is the calling thread
+                os.sched_setaffinity(0, self.core_sets[slot])
+            self._local.slot = slot
+            yield slot
+        finally:
+            with self._condition:
+                self._free.append(slot)
+                self._condition.notify()
+
+    def stats(self) -> Dict[str, object]:
+        with self._condition:
+            return {
+                "slots": self.slots,
+                "threads_per_slot": self.threads,
+                "pinned": self.core_sets is not None,
+                "in_use": self.slots - len(self._free),
+                "calls": self._calls,
+                "waits": self._waits,
+            }
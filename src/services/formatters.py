@@ -0,0 +1,48 @@
+# Subtitle and transcript export formats
+from typing import Any, Dict, List
+
+# Media types of the text export formats
+EXPORT_MEDIA_TYPES = {
+    "srt": "application/x-subrip",
+    "vtt": "text/vtt",
+}
+
+
+def format_timestamp(seconds: float, decimal_marker: str = ".") -> str:
+    """Format seconds as HH:MM:SS.mmm"""
+    milliseconds = max(0, int(round(seconds * 1000)))
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return (
+        f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        f"{decimal_marker}{milliseconds:03d}"
+    )
+
+
+def to_srt(segments: List[Dict[str, Any]]) -> str:
+    """Render segments as SubRip subtitles"""
+    blocks = []
+    for index, segment in enumerate(segments, start=1):
+        start = format_timestamp(segment["start"], ",")
+        end = format_timestamp(segment["end"], ",")
+        text = segment["text"].strip()
+        blocks.append(f"{index}\n{start} --> {end}\n{text}\n")
+    return "\n".join(blocks)
+
+
+def to_vtt(segments: List[Dict[str, Any]]) -> str:
+    """Render segments as WebVTT subtitles"""
+    blocks = ["WEBVTT\n"]
+    for segment in segments:
+        start = format_timestamp(segment["start"])
+        end = format_timestamp(segment["end"])
+        text = segment["text"].strip()
+        blocks.append(f"{start} --> {end}\n{text}\n")
+    return "\n".join(blocks)
+
+
+EXPORTERS = {
+    "srt": to_srt,
+    "vtt": to_vtt,
+}
@@ -0,0 +1,236 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+from src.services.scheduler import LATENCY, THROUGHPUT
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the inference admission queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Inference queue is full, try again later")
+        self.retry_after = retry_after
+
+
+class InferenceTimeoutError(Exception):
+    """Raised when a request exceeds its inference timeout"""
+
+
+class InferenceExecutor:
+    """Bounded worker pool that runs blocking inference off the event loop
+
+    At most ``max_workers`` jobs run at once and at most ``max_queue_size``
+    more wait for a worker. Further submissions are rejected with
+    ``QueueFullError`` instead of piling up. Latency-class jobs (live
+    streaming passes) run on ``live_workers`` workers of their own with
+    their own ``max_queue_size`` waiting places, so uploads can neither
+    delay nor crowd them out. When every live worker is busy they also
+    take idle general workers rather than waiting.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        max_queue_size: int,
+        timeout: Optional[float] = None,
+        retry_after: int = 5,
+        live_workers: int = 0,
+    ):
+        self.max_workers = max_workers
+        self.live_workers = live_workers
+        self.max_queue_size = max_queue_size
+        self.timeout = timeout
+        self.retry_after = retry_after
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._live_executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Admitted and running jobs per pool
+        self._pending = {THROUGHPUT: 0, LATENCY: 0}
+        self._running = {THROUGHPUT: 0, LATENCY: 0}
+
+        # Metrics
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._wait_count = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _pool(self, priority: str) -> str:
+        """
+        Pool a job runs on; called with the lock held
+
+        Without live workers every job shares one pool. Latency-class
+        jobs overflow onto the general pool while it has an idle worker,
+        so concurrent live sessions do not wait on one another.
+        """
+        if priority != LATENCY or self.live_workers <= 0:
+            return THROUGHPUT
+        live_busy = self._pending[LATENCY] >= self.live_workers
+        if live_busy and self._pending[THROUGHPUT] < self.max_workers:
+            return THROUGHPUT
+        return LATENCY
+
+    def capacity(self, pool: str = THROUGHPUT) -> int:
+        """Jobs ``pool`` admits at once, running or waiting"""
+        workers = self.live_workers if pool == LATENCY else self.max_workers
+        return workers + self.max_queue_size
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of admitted upload jobs still waiting for a worker"""
+        with self._lock:
+            return self._pending[THROUGHPUT] - self._running[THROUGHPUT]
+
+    def _get_executor(self, pool: str = THROUGHPUT) -> ThreadPoolExecutor:
+        if pool == LATENCY:
+            if self._live_executor is None:
+                with self._lock:
+                    if self._live_executor is None:
+                        self._live_executor = ThreadPoolExecutor(
+                            max_workers=self.live_workers,
+                            thread_name_prefix="inference-live",
+                        )
+            return self._live_executor
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="inference",
+                    )
+        return self._executor
+
+    def _admit(self, priority: str) -> str:
+        """Admit a job to the pool it should run on and return that pool"""
+        with self._lock:
+            pool = self._pool(priority)
+            if self._pending[pool] >= self.capacity(pool):
+                self._rejected += 1
+                raise QueueFullError(self.retry_after)
+            self._pending[pool] += 1
+            self._submitted += 1
+            return pool
+
+    def _release(self, pool: str, future: Future) -> None:
+        with self._lock:
+            self._pending[pool] -= 1
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
+
+    def submit_sync(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        priority: str = THROUGHPUT,
+        **kwargs,
+    ) -> Future:
+        """Admit a job and schedule it, returning a concurrent Future"""
+        pool = self._admit(priority)
+        enqueued_at = time.monotonic()
+
+        def run():
+            wait_time = time.monotonic() - enqueued_at
+            with self._lock:
+                self._running[pool] += 1
+                self._wait_count += 1
+                self._wait_total += wait_time
+                self._wait_max = max(self._wait_max, wait_time)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running[pool] -= 1
+
+        try:
+            future = self._get_executor(pool).submit(run)
+        except Exception:
+            with self._lock:
+                self._pending[pool] -= 1
+            raise
+        future.add_done_callback(partial(self._release, pool))
+        return future
+
+    async def submit(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        timeout: Optional[float] = None,
+        priority: str = THROUGHPUT,
+        **kwargs,
+    ) -> Any:
+        """Run ``fn`` on a worker and await its result
+
+        Raises:
+            QueueFullError: if the admission queue is full
+            InferenceTimeoutError: if the job does not finish in time
+        """
+        timeout = self.timeout if timeout is None else timeout
+        future = self.submit_sync(fn, *args, priority=priority, **kwargs)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            raise self.expire(future, timeout)
+
+    def expire(self, future: Future, timeout: float) -> InferenceTimeoutError:
+        """Cancel a job that ran out of time and return the error to raise"""
+        # Frees the queue slot if the job never started; a running job
+        # cannot be interrupted and finishes in the background.
+        future.cancel()
+        with self._lock:
+            self._timed_out += 1
+        logger.warning(f"Inference timed out after {timeout}s")
+        return InferenceTimeoutError(
+            f"Inference did not finish within {timeout} seconds"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue and wait-time metrics"""
+        with self._lock:
+            avg_wait = (
+                self._wait_total / self._wait_count
+                if self._wait_count
+                else 0.0
+            )
+            return {
+                "workers": self.max_workers,
+                "live_workers": self.live_workers,
+                "max_queue_size": self.max_queue_size,
+                "running": sum(self._running.values()),
+                "queue_depth": (
+                    self._pending[THROUGHPUT] - self._running[THROUGHPUT]
+                ),
+                "live_queue_depth": (
+                    self._pending[LATENCY] - self._running[LATENCY]
+                ),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "wait_time_avg": avg_wait,
+                "wait_time_max": self._wait_max,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        for executor in (self._executor, self._live_executor):
+            if executor is not None:
+                executor.shutdown(wait=wait)
+        self._executor = None
+        self._live_executor = None
@@ -0,0 +1,247 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+from typing import Any, BinaryIO, Dict, List, Optional
+from src.core.config import settings
+from src.services.inference_executor import QueueFullError
+from src.services.job_store import COMPLETED, FAILED, QUEUED, JobStore
+from src.services.scheduler import WorkTicket
+from src.services.whisper_service import whisper_service
+from src.schemas.transcribe_schemas import WhisperModel, TranscriptionAction
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Share of the progress bar reserved for decoding before the first window
+DECODE_PROGRESS = 5
+
+
+class JobManager:
+    """
+    Runs uploaded files as background transcription jobs
+
+    Uploads are copied under ``data_dir`` and recorded in a ``JobStore``
+    before the request returns. Worker threads claim queued jobs in order
+    and hand them to the service's inference executor, waiting whenever
+    it is full, so intake never has to match inference speed. Jobs left
+    queued or running when the process stops are picked up again on the
+    next start.
+    """
+
+    def __init__(
+        self,
+        service,
+        data_dir: str,
+        workers: int = 1,
+        retention: float = 0,
+        poll_interval: float = 1.0,
+    ):
+        self.service = service
+        self.data_dir = data_dir
+        self.workers = workers
+        self.retention = retention  # seconds, 0 keeps finished jobs
+        self.poll_interval = poll_interval
+
+        self._store: Optional[JobStore] = None
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._recovered = False
+
+    @property
+    def store(self) -> JobStore:
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    os.makedirs(
+                        os.path.join(self.data_dir, "audio"), exist_ok=True
+                    )
+                    self._store = JobStore(
+                        os.path.join(self.data_dir, "jobs.db")
+                    )
+        return self._store
+
+    def recover(self) -> None:
+        """
+        Requeue jobs interrupted by the last shutdown and purge old ones
+
+        Runs once per manager. A pre-fork server calls it in the parent,
+        so workers sharing the database do not requeue each other's
+        running jobs.
+        """
+        with self._lock:
+            if self._recovered:
+                return
+            self._recovered = True
+        resumed = self.store.requeue_running()
+        if resumed:
+            logger.info(f"Requeued {resumed} interrupted jobs")
+        if self.retention:
+            self._purge(time.time() - self.retention)
+
+    def start(self) -> None:
+        """Resume interrupted jobs and start the worker threads"""
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+        self.recover()
+
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f"job-{index}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop claiming jobs
+
+        Jobs already handed to the executor finish in the background; if
+        the process exits first they are requeued on the next start.
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def close(self) -> None:
+        """Stop the workers and close the database connection"""
+        self.stop()
+        with self._lock:
+            store, self._store = self._store, None
+        if store is not None:
+            store.close()
+
+    def submit(
+        self,
+        source: BinaryIO,
+        file_extension: str,
+        model: WhisperModel,
+        action: TranscriptionAction,
+        language: Optional[str] = None,
+        word_timestamps: bool = False,
+        client: Optional[str] = None,
+    ) -> str:
+        """Store an upload as a queued job and return the job id"""
+        audio_path = os.path.join(
+            self.data_dir, "audio", f"{uuid.uuid4().hex}{file_extension}"
+        )
+        # Make sure the audio directory exists before copying
+        store = self.store
+        with open(audio_path, "wb") as f:
+            shutil.copyfileobj(source, f)
+
+        job_id = store.create(
+            {
+                "model": model.value,
+                "action": action.value,
+                "language": language,
+                "file_extension": file_extension,
+                "word_timestamps": word_timestamps,
+                "client": client,
+            },
+            audio_path,
+        )
+        self.start()
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        return self.store.counts()
+
+    def _purge(self, older_than: float) -> None:
+        for job_id in self.store.purge(older_than):
+            logger.info(f"Purged job {job_id}")
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = self.store.claim()
+            except Exception as e:
+                logger.error(f"Error claiming job: {str(e)}")
+                job = None
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._run(job)
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        params = job["params"]
+        store = self.store
+
+        def report(done: int, total: int) -> None:
+            share = (100 - 2 * DECODE_PROGRESS) * done // total
+            store.update(job_id, progress=DECODE_PROGRESS + share)
+
+        store.update(
+            job_id, progress=DECODE_PROGRESS, message="Transcribing audio"
+        )
+        try:
+            # Wait for room on the inference workers instead of failing
+            while True:
+                try:
+                    future = self.service.executor.submit_sync(
+                        self.service.transcribe,
+                        job["audio_path"],
+                        WhisperModel(params["model"]),
+                        TranscriptionAction(params["action"]),
+                        params["language"],
+                        params["file_extension"],
+                        progress=report,
+                        word_timestamps=params.get("word_timestamps", False),
+                        ticket=WorkTicket(client=params.get("client")),
+                    )
+                    break
+                except QueueFullError as e:
+                    if self._stopping.wait(e.retry_after):
+                        store.update(job_id, status=QUEUED, progress=0)
+                        return
+
+            result = future.result()
+            store.update(
+                job_id,
+                status=COMPLETED,
+                progress=100,
+                message="Transcription completed",
+                result={
+                    "text": result["text"],
+                    "language": result["language"],
+                    "segments": result["segments"],
+                    "processing_time": result["processing_time"],
+                    "cache_hit": result["cache_hit"],
+                },
+            )
+            logger.info(f"Job {job_id} completed")
+        except Exception as e:
+            logger.error(f"Error running job {job_id}: {str(e)}")
+            store.update(job_id, status=FAILED, message=str(e))
+
+        # The upload is only needed until the job has finished
+        try:
+            os.unlink(job["audio_path"])
+        except OSError:
+            pass
+
+
+# Global job manager
+job_manager = JobManager(
+    whisper_service,
+    data_dir=os.path.join(settings.UPLOAD_DIR, "jobs"),
+    workers=settings.JOB_WORKERS,
+    retention=settings.JOB_RETENTION,
+)
@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Loaded models kept in least-recently-used order under a memory budget
+
+    Concurrent requests for a model that is still loading wait on the same
+    load instead of each loading their own copy. When the budget is
+    exceeded the least recently used models are dropped; requests already
+    holding a reference keep using it until they finish.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Any],
+        memory_budget: int = 0,
+        expected_size: Optional[Callable[[str], int]] = None,
+        model_size: Optional[Callable[[str, Any], int]] = None,
+    ):
+        self.loader = loader
+        self.memory_budget = memory_budget  # bytes, 0 disables eviction
+        self.expected_size = expected_size or (lambda name: 0)
+        self.model_size = model_size or (lambda name, model: 0)
+
+        self._lock = threading.Lock()
+        self._models: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._loading: Dict[str, Future] = {}
+
+        # Metrics
+        self._hits = 0
+        self._misses = 0
+        self._loads = 0
+        self._load_failures = 0
+        self._evictions = 0
+        self._load_seconds: Dict[str, float] = {}
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._models
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._models)
+
+    @property
+    def memory_used(self) -> int:
+        with self._lock:
+            return sum(size for _, size in self._models.values())
+
+    def _evict(self, needed: int, keep: Optional[str] = None) -> None:
+        """Drop LRU models until ``needed`` more bytes fit the budget"""
+        if not self.memory_budget:
+            return
+        used = sum(size for _, size in self._models.values())
+        for name in list(self._models):
+            if used + needed <= self.memory_budget:
+                break
+            if name == keep:
+                continue
+            _, size = self._models.pop(name)
+            used -= size
+            self._evictions += 1
+            logger.info(f"Evicted model {name} ({size} bytes)")
+
+    def get(self, name: str) -> Any:
+        """Return a loaded model, loading it on first use"""
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                self._hits += 1
+                return self._models[name][0]
+
+            self._misses += 1
+            future = self._loading.get(name)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._loading[name] = future
+                self._evict(self.expected_size(name))
+
+        if not owner:
+            return future.result()
+
+        try:
+            logger.info(f"Loading Whisper model: {name}")
+            start_time = time.time()
+            model = self.loader(name)
+            load_seconds = time.time() - start_time
+            size = self.model_size(name, model)
+            logger.info(
+                f"Model {name} loaded successfully in {load_seconds:.1f}s"
+            )
+        except BaseException as e:
+            with self._lock:
+                self._load_failures += 1
+                del self._loading[name]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._models[name] = (model, size)
+            self._loads += 1
+            self._load_seconds[name] = load_seconds
+            self._evict(0, keep=name)
+            del self._loading[name]
+        future.set_result(model)
+        return model
+
+    def preload(self, names: Iterable[str]) -> None:
+        """Load models ahead of the first request"""
+        for name in names:
+            self.get(name)
+
+    def unload(self, name: str) -> None:
+        with self._lock:
+            self._models.pop(name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of loaded models and load/eviction counters"""
+        with self._lock:
+            return {
+                "loaded": {
+                    name: {
+                        "bytes": size,
+                        "load_seconds": self._load_seconds.get(name),
+                    }
+                    for name, (_, size) in self._models.items()
+                },
+                "loading": list(self._loading),
+                "memory_used": sum(size for _, size in self._models.values()),
+                "memory_budget": self.memory_budget,
+                "hits": self._hits,
+                "misses": self._misses,
+                "loads": self._loads,
+                "load_failures": self._load_failures,
+                "evictions": self._evictions,
+            }
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, BinaryIO, Dict, Optional, Tuple, Union
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_digest(
+    audio: Union[str, bytes, bytearray, BinaryIO, np.ndarray],
+) -> str:
+    """
+    Hash audio content without loading files into memory
+
+    File objects are read in chunks and rewound afterwards so they can
+    still be decoded.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    if isinstance(audio, np.ndarray):
+        digest.update(np.ascontiguousarray(audio, dtype=np.float32).data)
+    elif isinstance(audio, (bytes, bytearray)):
+        digest.update(audio)
+    elif isinstance(audio, str):
+        with open(audio, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    else:
+        position = audio.tell()
+        for chunk in iter(lambda: audio.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+        audio.seek(position)
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """
+    Two-tier cache of transcription results keyed by content hash
+
+    The in-process tier is an LRU bounded by entry count. The optional
+    disk tier stores one JSON file per entry and is bounded by total size,
+    dropping the oldest files first. Both tiers expire entries after
+    ``ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 0,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = (
+            OrderedDict()
+        )
+        self._disk_bytes = 0
+        self._disk_ready = False
+
+        # Metrics
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def make_key(digest: str, *parts: Any) -> str:
+        """Combine a content digest with everything that affects the output"""
+        return hashlib.sha256(
+            json.dumps([digest, *[str(part) for part in parts]]).encode()
+        ).hexdigest()
+
+    def _open_disk(self) -> None:
+        """Create and size the disk tier on first use"""
+        if self._disk_ready:
+            return
+        os.makedirs(self.disk_dir, exist_ok=True)
+        self._disk_bytes = sum(
+            os.path.getsize(path) for path, _ in self._disk_files()
+        )
+        self._disk_ready = True
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _disk_files(self):
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith(".json"):
+                yield entry.path, entry.stat().st_mtime
+
+    def _remove_file(self, path: str) -> None:
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+            self._disk_bytes -= size
+        except OSError:
+            pass
+
+    def _get_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                self._remove_file(path)
+                return None
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _put_disk(self, key: str, value: Dict[str, Any]) -> None:
+        path = self._path(key)
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(value, f)
+            if os.path.exists(path):
+                self._remove_file(path)
+            os.replace(temp_path, path)
+            self._disk_bytes += os.path.getsize(path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry: {str(e)}")
+            return
+
+        if self.disk_max_bytes and self._disk_bytes > self.disk_max_bytes:
+            for old_path, _ in sorted(
+                self._disk_files(), key=lambda item: item[1]
+            ):
+                if self._disk_bytes <= self.disk_max_bytes:
+                    break
+                self._remove_file(old_path)
+                self._evictions += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if time.time() - stored_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self._memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            if self.disk_dir:
+                self._open_disk()
+                value = self._get_disk(key)
+                if value is not None:
+                    self._disk_hits += 1
+                    self._put_memory(key, value)
+                    return value
+
+            self._misses += 1
+            return None
+
+    def _put_memory(self, key: str, value: Dict[str, Any]) -> None:
+        self._memory[key] = (time.time(), value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._evictions += 1
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._put_memory(key, value)
+            if self.disk_dir:
+                self._open_disk()
+                self._put_disk(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk_bytes": self._disk_bytes if self.disk_dir else None,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
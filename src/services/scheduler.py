@@ -0,0 +1,169 @@
+# Priority-aware ordering of model calls
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, List, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Scheduling classes: live captions need each pass soon, uploads only
+# need the whole file eventually
+LATENCY = "latency"
+THROUGHPUT = "throughput"
+PRIORITIES = (LATENCY, THROUGHPUT)
+
+ANONYMOUS = "anonymous"
+
+
+class WorkTicket:
+    """Who a model call is for and how urgently it is needed"""
+
+    def __init__(
+        self,
+        priority: str = THROUGHPUT,
+        client: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority}")
+        self.priority = priority
+        self.client = client or ANONYMOUS
+        self.deadline = deadline  # time.monotonic() the result is due by
+
+    @classmethod
+    def live(cls, client: Optional[str], budget: float) -> "WorkTicket":
+        """Latency-class ticket due ``budget`` seconds from now"""
+        return cls(LATENCY, client, time.monotonic() + budget)
+
+    def __repr__(self) -> str:
+        return f"WorkTicket({self.priority!r}, {self.client!r})"
+
+
+def most_urgent(tickets: Sequence[Optional[WorkTicket]]) -> WorkTicket:
+    """Ticket a call serving several requests (a batch) is scheduled by"""
+    live = [t for t in tickets if t is not None and t.priority == LATENCY]
+    if live:
+        return min(live, key=lambda t: t.deadline or float("inf"))
+    return next((t for t in tickets if t is not None), WorkTicket())
+
+
+class _Waiter:
+    def __init__(self, ticket: WorkTicket):
+        self.ticket = ticket
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+
+
+class FairScheduler:
+    """
+    Hands out ``capacity`` concurrent turns at the model
+
+    Every model call (one window of at most 30 seconds, or one streaming
+    pass) takes a turn, so a long upload gives up its place at each
+    window boundary. Free turns go to latency-class calls first, earliest
+    deadline first. Throughput-class calls are served round-robin across
+    clients, one call per client in turn, so a client with many windows
+    queued cannot starve the others.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+
+        self._condition = threading.Condition()
+        self._active = 0
+        self._live: List[tuple] = []  # heap of (deadline, seq, waiter)
+        self._sequence = itertools.count()
+        # Clients in round-robin order, each with its waiting calls
+        self._clients: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+
+        # Metrics
+        self._turns = {priority: 0 for priority in PRIORITIES}
+        self._waits = {priority: 0 for priority in PRIORITIES}
+        self._wait_max = {priority: 0.0 for priority in PRIORITIES}
+        self._missed_deadlines = 0
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        ticket = waiter.ticket
+        if ticket.priority == LATENCY:
+            deadline = (
+                ticket.deadline
+                if ticket.deadline is not None
+                else float("inf")
+            )
+            heapq.heappush(
+                self._live, (deadline, next(self._sequence), waiter)
+            )
+        else:
+            self._clients.setdefault(ticket.client, deque()).append(waiter)
+
+    def _dispatch(self) -> None:
+        """Grant free turns to the next waiters; called with the lock held"""
+        granted = False
+        while self._active < self.capacity:
+            if self._live:
+                waiter = heapq.heappop(self._live)[2]
+            elif self._clients:
+                client, queue = next(iter(self._clients.items()))
+                waiter = queue.popleft()
+                # The client goes to the back of the rotation
+                del self._clients[client]
+                if queue:
+                    self._clients[client] = queue
+            else:
+                break
+            waiter.granted = True
+            self._active += 1
+            granted = True
+        if granted:
+            self._condition.notify_all()
+
+    def _record(self, waiter: _Waiter) -> None:
+        ticket = waiter.ticket
+        now = time.monotonic()
+        wait = now - waiter.enqueued_at
+        self._turns[ticket.priority] += 1
+        if wait > 0.001:
+            self._waits[ticket.priority] += 1
+        self._wait_max[ticket.priority] = max(
+            self._wait_max[ticket.priority], wait
+        )
+        if ticket.deadline is not None and now > ticket.deadline:
+            self._missed_deadlines += 1
+
+    @contextmanager
+    def turn(self, ticket: Optional[WorkTicket] = None):
+        """Wait for a turn for ``ticket`` and hold it for one model call"""
+        waiter = _Waiter(ticket or WorkTicket())
+        with self._condition:
+            self._enqueue(waiter)
+            self._dispatch()
+            while not waiter.granted:
+                self._condition.wait()
+            self._record(waiter)
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._active -= 1
+                self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "capacity": self.capacity,
+                "active": self._active,
+                "waiting_live": len(self._live),
+                "waiting_batch": sum(
+                    len(queue) for queue in self._clients.values()
+                ),
+                "clients_waiting": len(self._clients),
+                "turns": dict(self._turns),
+                "waits": dict(self._waits),
+                "wait_time_max": dict(self._wait_max),
+                "missed_deadlines": self._missed_deadlines,
+            }
@@ -0,0 +1,317 @@
+import re
+import threading
+from typing import Any, Dict, List, Optional
+import numpy as np
+from src.core.config import settings
+from src.schemas.transcribe_schemas import WhisperModel, TranscriptionAction
+from src.services.audio_decoder import StreamDecoder
+from src.services.scheduler import WorkTicket
+from src.services.vad import EnergyVAD
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AudioRingBuffer:
+    """
+    Fixed-capacity float32 buffer addressed by absolute sample offsets
+
+    Appending beyond capacity silently drops the oldest samples, so memory
+    stays bounded no matter how long a session runs.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self._end = 0  # absolute offset one past the newest sample
+
+    @property
+    def end_offset(self) -> int:
+        return self._end
+
+    @property
+    def start_offset(self) -> int:
+        return max(0, self._end - self.capacity)
+
+    def append(self, samples: np.ndarray) -> None:
+        if len(samples) == 0:
+            return
+        if len(samples) >= self.capacity:
+            self._end += len(samples) - self.capacity
+            samples = samples[-self.capacity :]
+        position = self._end % self.capacity
+        first = min(len(samples), self.capacity - position)
+        self._data[position : position + first] = samples[:first]
+        self._data[: len(samples) - first] = samples[first:]
+        self._end += len(samples)
+
+    def get(self, start: int, end: Optional[int] = None) -> np.ndarray:
+        """Copy samples in [start, end) clamped to what is still buffered"""
+        start = max(start, self.start_offset)
+        end = self._end if end is None else min(end, self._end)
+        if end <= start:
+            return np.zeros(0, dtype=np.float32)
+        first, last = start % self.capacity, end % self.capacity
+        if first < last:
+            return self._data[first:last].copy()
+        return np.concatenate((self._data[first:], self._data[:last]))
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w]", "", word.lower())
+
+
+def _common_prefix(previous: List[str], current: List[str]) -> int:
+    count = 0
+    for a, b in zip(previous, current):
+        if _normalize(a) != _normalize(b):
+            break
+        count += 1
+    return count
+
+
+class StreamingSession:
+    """
+    Per-connection state for real-time transcription
+
+    Chunks go through one continuous decoder into a ring buffer. Each
+    pass transcribes the sliding window from the last commit point to the
+    newest sample; words that two consecutive passes agree on are
+    committed, the rest is reported as a partial hypothesis. Audio can be
+    fed while a pass runs; it is picked up by the next one.
+
+    Up to STREAM_CONTEXT_WORDS committed words from before the window are
+    passed as the decoder prompt, so each window continues the text
+    instead of starting cold. The context starts afresh after a pause of
+    STREAM_CONTEXT_RESET_SECONDS.
+    """
+
+    def __init__(
+        self,
+        service,
+        model: WhisperModel = WhisperModel.TURBO,
+        action: TranscriptionAction = TranscriptionAction.TRANSCRIBE,
+        language: Optional[str] = None,
+        decoder: Optional[StreamDecoder] = None,
+        client: Optional[str] = None,
+    ):
+        self.service = service
+        self.model = model
+        self.action = action
+        self.language = language
+        self.client = client
+        self.sample_rate = settings.SAMPLE_RATE
+
+        self.decoder = decoder or StreamDecoder(self.sample_rate)
+        self.buffer = AudioRingBuffer(
+            int(settings.STREAM_BUFFER_SECONDS * self.sample_rate)
+        )
+        self.window_samples = int(
+            settings.STREAM_WINDOW_SECONDS * self.sample_rate
+        )
+        self.step_samples = int(
+            settings.STREAM_STEP_SECONDS * self.sample_rate
+        )
+        self.context_words = settings.STREAM_CONTEXT_WORDS
+        self.reset_samples = int(
+            settings.STREAM_CONTEXT_RESET_SECONDS * self.sample_rate
+        )
+        self.vad = EnergyVAD(self.sample_rate)
+
+        self.committed: List[str] = []
+        self._window_start = 0
+        self._processed_end = 0
+        self._window_committed = 0  # words of the window already committed
+        self._previous: List[str] = []
+        self._context_start = 0  # first committed word usable as prompt
+        self._last_pass: Optional[tuple] = None  # (start, end, prompt, result)
+        self._lock = threading.Lock()
+
+    def feed(self, data: bytes) -> None:
+        """Decode the next chunk into the ring buffer"""
+        self.decoder.feed(data)
+        # Reading and appending under one lock keeps chunks in order when
+        # a pass on another thread reads the decoder at the same time
+        with self._lock:
+            self.buffer.append(self.decoder.read())
+
+    def ready(self) -> bool:
+        """Whether enough new audio arrived for another pass"""
+        return self.backlog >= self.step_samples
+
+    @property
+    def backlog(self) -> int:
+        """Samples received but not yet covered by a pass"""
+        with self._lock:
+            self.buffer.append(self.decoder.read())
+            return self.buffer.end_offset - self._processed_end
+
+    def drop_backlog(self, max_samples: int) -> Optional[Dict[str, Any]]:
+        """
+        Skip unprocessed audio beyond the newest ``max_samples``
+
+        Used when passes fall behind the incoming audio: the current
+        hypothesis is committed as is and the next window starts
+        ``max_samples`` before the newest sample. Returns the committed
+        text and the seconds dropped, or None when within budget.
+        """
+        with self._lock:
+            end = self.buffer.end_offset
+            dropped = end - self._processed_end - max_samples
+            if dropped <= 0:
+                return None
+            forced = self._previous[self._window_committed :]
+            self.committed.extend(forced)
+            self._window_start = self._processed_end = end - max_samples
+            self._window_committed = 0
+            self._previous = []
+            return {
+                "committed": " ".join(forced),
+                "partial": "",
+                "dropped": dropped / self.sample_rate,
+            }
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.committed)
+
+    def prompt(self) -> Optional[str]:
+        """Committed text preceding the window, bounded to the context"""
+        if self.context_words <= 0:
+            return None
+        # Words committed from the current window are in its audio
+        end = len(self.committed) - self._window_committed
+        words = self.committed[self._context_start : end]
+        return " ".join(words[-self.context_words :]) or None
+
+    def _paused(self, samples: np.ndarray, new_from: int) -> bool:
+        """Whether a long pause ends in the audio new to this pass"""
+        regions = self.vad.detect(samples)
+        edges = [0] + [edge for region in regions for edge in region]
+        edges.append(len(samples))
+        # Pairs of edges delimit the silences around the speech regions
+        for start, end in zip(edges[::2], edges[1::2]):
+            if end > new_from and end - start >= self.reset_samples:
+                return True
+        return False
+
+    def _segment_words(self, segments: List[Dict[str, Any]]) -> List[int]:
+        return [len(segment["text"].split()) for segment in segments]
+
+    def _slide_window(
+        self, segments: List[Dict[str, Any]], window_end: int
+    ) -> List[str]:
+        """
+        Move the window start past fully committed segments
+
+        Returns words that had to be force-committed because the window
+        outgrew its limit without a stable cut point.
+        """
+        if window_end - self._window_start <= self.window_samples:
+            return []
+
+        consumed_words = 0
+        cut = None
+        for segment, words in zip(segments, self._segment_words(segments)):
+            if consumed_words + words > self._window_committed:
+                break
+            consumed_words += words
+            cut = segment["end"]
+
+        if cut is None:
+            # Nothing stable to cut at: commit the whole window and restart
+            remaining = self._previous[self._window_committed :]
+            self.committed.extend(remaining)
+            self._window_start = window_end
+            self._window_committed = 0
+            self._previous = []
+            return remaining
+
+        self._window_start += int(cut * self.sample_rate)
+        self._window_committed -= consumed_words
+        self._previous = self._previous[consumed_words:]
+        return []
+
+    def process(self, final: bool = False) -> Dict[str, Any]:
+        """
+        Transcribe the current window
+
+        Returns a dict with the newly ``committed`` text and the current
+        ``partial`` hypothesis. With ``final`` everything is committed.
+        """
+        with self._lock:
+            self.buffer.append(
+                self.decoder.close() if final else self.decoder.read()
+            )
+            window_end = self.buffer.end_offset
+            self._window_start = max(
+                self._window_start, self.buffer.start_offset
+            )
+            window_start = self._window_start
+            samples = self.buffer.get(window_start, window_end)
+            new_from = self._processed_end - window_start
+            self._processed_end = window_end
+
+        # The lock is not held during inference so audio keeps arriving
+        segments: List[Dict[str, Any]] = []
+        words: List[str] = []
+        if len(samples) > 0:
+            if self.context_words > 0 and self._paused(samples, new_from):
+                # A long pause usually starts a new thought or speaker
+                with self._lock:
+                    self._context_start = (
+                        len(self.committed) - self._window_committed
+                    )
+            prompt = self.prompt()
+
+            key = (window_start, window_end, prompt)
+            if self._last_pass is not None and self._last_pass[:3] == key:
+                # Nothing changed since the last pass (e.g. a stop right
+                # after it): its result stands, no need to run the model
+                result = self._last_pass[3]
+            else:
+                # Passes are latency class: they go ahead of upload windows
+                result = self.service.transcribe_samples(
+                    samples,
+                    self.model,
+                    self.action,
+                    self.language,
+                    ticket=WorkTicket.live(
+                        self.client, settings.STREAM_PASS_DEADLINE
+                    ),
+                    initial_prompt=prompt,
+                )
+                self._last_pass = key + (result,)
+            segments = result.get("segments", [])
+            words = result["text"].split()
+            if self.language is None and result.get("language"):
+                # Keep the language stable across windows
+                self.language = result["language"]
+
+        with self._lock:
+            if final:
+                stable = len(words)
+            else:
+                stable = _common_prefix(self._previous, words)
+            stable = max(stable, self._window_committed)
+
+            newly_committed = words[self._window_committed : stable]
+            self.committed.extend(newly_committed)
+            self._window_committed = stable
+            self._previous = words
+            partial = words[stable:]
+
+            if not final:
+                forced = self._slide_window(segments, window_end)
+                if forced:
+                    newly_committed += forced
+                    partial = []
+
+            return {
+                "committed": " ".join(newly_committed),
+                "partial": " ".join(partial),
+            }
+
+    def close(self) -> None:
+        """Stop the decoder without a final pass"""
+        self.decoder.close()
@@ -0,0 +1,166 @@
+# Voice activity detection
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Tuple
+import numpy as np
+from src.core.config import settings
+
+# (start, end) sample offsets of a speech region, end exclusive
+Region = Tuple[int, int]
+
+
+class EnergyVAD:
+    """
+    Frame-energy voice activity detector
+
+    A frame counts as speech when its RMS level is above both the absolute
+    ``threshold_db`` and the clip's noise floor plus ``noise_margin_db``
+    (capped at the same margin below the loudest frame).
+    Short gaps are bridged, short bursts dropped and the surviving regions
+    padded so word onsets are not clipped.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = settings.SAMPLE_RATE,
+        threshold_db: float = settings.VAD_THRESHOLD_DB,
+        noise_margin_db: float = settings.VAD_NOISE_MARGIN_DB,
+        frame_ms: int = settings.VAD_FRAME_MS,
+        min_speech_ms: int = settings.VAD_MIN_SPEECH_MS,
+        min_silence_ms: int = settings.VAD_MIN_SILENCE_MS,
+        speech_pad_ms: int = settings.VAD_SPEECH_PAD_MS,
+    ):
+        self.sample_rate = sample_rate
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.frame_size = max(1, sample_rate * frame_ms // 1000)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.min_silence_frames = max(1, min_silence_ms // frame_ms)
+        self.pad = sample_rate * speech_pad_ms // 1000
+
+    def frame_levels(self, samples: np.ndarray) -> np.ndarray:
+        """RMS level of each frame in dBFS"""
+        n_frames = len(samples) // self.frame_size
+        if n_frames == 0:
+            return np.zeros(0, dtype=np.float32)
+        frames = samples[: n_frames * self.frame_size].reshape(
+            n_frames, self.frame_size
+        )
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+        return 20.0 * np.log10(rms + 1e-10)
+
+    def detect(self, samples: np.ndarray) -> List[Region]:
+        """Return speech regions as (start, end) sample offsets"""
+        levels = self.frame_levels(samples)
+        if len(levels) == 0:
+            return []
+
+        # Adapt to the background level, but never above the loudest frames
+        # so a clip with no pauses at all is still treated as speech
+        noise_floor = float(np.percentile(levels, 10))
+        adaptive = min(
+            noise_floor + self.noise_margin_db,
+            float(levels.max()) - self.noise_margin_db,
+        )
+        threshold = max(self.threshold_db, adaptive)
+        speech = levels > threshold
+
+        # Runs of speech frames as [start, end) frame indices
+        edges = np.diff(np.concatenate(([0], speech.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+
+        runs: List[List[int]] = []
+        for start, end in zip(starts, ends):
+            if runs and start - runs[-1][1] < self.min_silence_frames:
+                runs[-1][1] = end
+            else:
+                runs.append([start, end])
+
+        regions: List[Region] = []
+        for start, end in runs:
+            if end - start < self.min_speech_frames:
+                continue
+            region_start = max(0, start * self.frame_size - self.pad)
+            region_end = min(len(samples), end * self.frame_size + self.pad)
+            if regions and region_start <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], region_end)
+            else:
+                regions.append((region_start, region_end))
+        return regions
+
+
+def group_regions(
+    regions: List[Region], max_samples: int
+) -> List[List[Region]]:
+    """Pack consecutive speech regions into batches of at most max_samples"""
+    batches: List[List[Region]] = []
+    batch_length = 0
+    for start, end in regions:
+        # Regions longer than a batch are split
+        while end - start > max_samples:
+            batches.append([(start, start + max_samples)])
+            start += max_samples
+        length = end - start
+        if batches and batch_length + length <= max_samples:
+            batches[-1].append((start, end))
+            batch_length += length
+        else:
+            batches.append([(start, end)])
+            batch_length = length
+    return batches
+
+
+class SpeechTimeline:
+    """Maps times on concatenated speech audio back to the original clip"""
+
+    def __init__(self, regions: List[Region], sample_rate: int):
+        self.regions = regions
+        self.sample_rate = sample_rate
+        self._offsets = []  # start of each region on the collapsed timeline
+        position = 0
+        for start, end in regions:
+            self._offsets.append(position)
+            position += end - start
+        self.length = position
+
+    def collapse(self, samples: np.ndarray) -> np.ndarray:
+        """Concatenate the speech regions of ``samples``"""
+        return np.concatenate(
+            [samples[start:end] for start, end in self.regions]
+        )
+
+    def to_original(self, seconds: float, is_end: bool = False) -> float:
+        """
+        Convert a collapsed-timeline time to the original timeline
+
+        A time exactly on a region boundary maps to the end of the earlier
+        region when ``is_end`` is set, and to the start of the later one
+        otherwise, so segments never stretch across removed silence.
+        """
+        position = int(round(seconds * self.sample_rate))
+        search = bisect_left if is_end else bisect_right
+        index = max(0, search(self._offsets, position) - 1)
+        start, end = self.regions[index]
+        original = min(start + position - self._offsets[index], end)
+        return original / self.sample_rate
+
+    def remap_segments(
+        self, segments: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Return copies of Whisper segments on the original timeline"""
+        remapped = []
+        for segment in segments:
+            segment = dict(segment)
+            segment["start"] = self.to_original(segment["start"])
+            segment["end"] = self.to_original(segment["end"], is_end=True)
+            if segment.get("words"):
+                segment["words"] = [
+                    dict(
+                        word,
+                        start=self.to_original(word["start"]),
+                        end=self.to_original(word["end"], is_end=True),
+                    )
+                    for word in segment["words"]
+                ]
+            remapped.append(segment)
+        return remapped
@@ -1,147 +1,789 @@
-import whisper
-import torch
-import tempfile
+import itertools
 import os
+import threading
 import time
-from typing import Optional, Tuple
-from pydub import AudioSegment
+import numpy as np
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, List, Optional, Sequence, Tuple, Union
 from src.core.config import settings
+from src.core import metrics
+from src.services.audio_decoder import (
+    AudioSource,
+    decode_audio,
+    decoder_pool,
+)
+from src.services.audio_frontend import downmix
+from src.services.backends import get_backend
+from src.services.batching import BatchScheduler
+from src.services.chunking import (
+    split_long_regions,
+    stitch_results,
+    window_bounds,
+    window_segments,
+)
+from src.services.cpu_slots import InferenceSlots
+from src.services.inference_executor import InferenceExecutor
+from src.services.model_registry import ModelRegistry
+from src.services.result_cache import TranscriptionCache, content_digest
+from src.services.scheduler import FairScheduler, WorkTicket, most_urgent
+from src.services.vad import EnergyVAD, SpeechTimeline, group_regions
 from src.schemas.transcribe_schemas import WhisperModel, TranscriptionAction
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Whisper's fixed 30-second input window
+WINDOW_SAMPLES = 30 * settings.SAMPLE_RATE
+
+# Called with (windows_done, windows_total) as a transcription advances
+ProgressCallback = Callable[[int, int], None]
+
+# Called with each window's final segments, in timeline order
+SegmentCallback = Callable[[List[dict]], None]
+
+# Marks a lazily created attribute that has not been created yet
+_UNSET = object()
+
+
+def _top_languages(result: dict, top_k: int) -> dict:
+    """Detection result keeping only the ``top_k`` likeliest languages"""
+    return dict(
+        result,
+        probabilities=dict(list(result["probabilities"].items())[:top_k]),
+    )
+
 
 class WhisperService:
+    """
+    Transcription pipeline shared by every route
+
+    Construction is cheap: torch, the inference engine and CUDA are only
+    touched when the backend is first needed, so importing the app (for
+    tests or a health check) does not pay for them.
+    """
+
     def __init__(self):
-        self.models = {}
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        logger.info(f"Using device: {self.device}")
+        self._device: Optional[str] = None
+        self._backend = None
+        self._batcher = _UNSET
+        self._slots = _UNSET
+        self._scheduler: Optional[FairScheduler] = None
+        self._lazy_lock = threading.Lock()
+        self.ready = False
+        self.models = ModelRegistry(
+            self._load_model,
+            memory_budget=settings.MODEL_MEMORY_BUDGET,
+            expected_size=lambda name: self.backend.expected_size(name),
+            model_size=lambda name, model: self.backend.model_size(
+                name, model
+            ),
+        )
+        self.executor = InferenceExecutor(
+            max_workers=settings.INFERENCE_WORKERS,
+            max_queue_size=settings.INFERENCE_QUEUE_SIZE,
+            timeout=settings.INFERENCE_TIMEOUT,
+            retry_after=settings.INFERENCE_RETRY_AFTER,
+            live_workers=settings.INFERENCE_LIVE_WORKERS,
+        )
+        self.vad = EnergyVAD()
+        self._chunk_pool = None
+        self.cache = None
+        if settings.CACHE_ENABLED:
+            self.cache = TranscriptionCache(
+                max_entries=settings.CACHE_MAX_ENTRIES,
+                ttl=settings.CACHE_TTL,
+                disk_dir=(
+                    os.path.join(settings.UPLOAD_DIR, "cache")
+                    if settings.CACHE_DISK_ENABLED
+                    else None
+                ),
+                disk_max_bytes=settings.CACHE_DISK_MAX_BYTES,
+            )
+
+        # Sampled whenever /metrics is scraped
+        metrics.track(metrics.QUEUE_DEPTH, lambda: self.executor.queue_depth)
+        metrics.track(
+            metrics.INFERENCE_RUNNING, lambda: self.executor.stats()["running"]
+        )
+        metrics.track(metrics.MODEL_MEMORY, lambda: self.models.memory_used)
+        metrics.track(metrics.MODELS_LOADED, lambda: len(self.models))
+
+    @property
+    def device(self) -> str:
+        if self._device is None:
+            # Deferred: importing torch takes seconds
+            import torch
+
+            self._device = "cuda" if torch.cuda.is_available() else "cpu"
+        return self._device
+
+    @property
+    def backend(self):
+        """Inference backend, created on first use"""
+        if self._backend is None:
+            with self._lazy_lock:
+                if self._backend is None:
+                    self._backend = get_backend(
+                        settings.INFERENCE_BACKEND,
+                        self.device,
+                        settings.COMPUTE_TYPE,
+                    )
+                    logger.info(
+                        f"Using device: {self.device}, "
+                        f"backend: {self._backend.name}"
+                    )
+        return self._backend
+
+    @property
+    def batcher(self) -> Optional[BatchScheduler]:
+        """Micro-batcher, or None when the backend cannot batch"""
+        if self._batcher is _UNSET:
+            batcher = None
+            if settings.BATCH_ENABLED and self.backend.supports_batching:
+                batcher = BatchScheduler(
+                    self._run_batch,
+                    max_batch_size=settings.BATCH_MAX_SIZE,
+                    max_wait=settings.BATCH_MAX_WAIT_MS / 1000,
+                )
+            with self._lazy_lock:
+                if self._batcher is _UNSET:
+                    self._batcher = batcher
+        return self._batcher
+
+    @batcher.setter
+    def batcher(self, batcher: Optional[BatchScheduler]) -> None:
+        self._batcher = batcher
+
+    @property
+    def slots(self) -> Optional[InferenceSlots]:
+        """CPU inference slots, or None when inference runs on a GPU"""
+        if self._slots is _UNSET:
+            slots = None
+            if self.device == "cpu":
+                slots = InferenceSlots.from_settings(self.backend.set_threads)
+            with self._lazy_lock:
+                if self._slots is _UNSET:
+                    self._slots = slots
+        return self._slots
 
-    def load_model(self, model_name: str) -> whisper.Whisper:
+    @slots.setter
+    def slots(self, slots: Optional[InferenceSlots]) -> None:
+        self._slots = slots
+
+    @property
+    def scheduler(self) -> FairScheduler:
+        """Orders model calls by priority class and client"""
+        if self._scheduler is None:
+            capacity = settings.SCHEDULER_CAPACITY
+            if capacity <= 0:
+                capacity = (
+                    self.slots.slots
+                    if self.slots is not None
+                    else settings.INFERENCE_WORKERS
+                )
+            with self._lazy_lock:
+                if self._scheduler is None:
+                    self._scheduler = FairScheduler(capacity)
+        return self._scheduler
+
+    @scheduler.setter
+    def scheduler(self, scheduler: FairScheduler) -> None:
+        self._scheduler = scheduler
+
+    @contextmanager
+    def _slot(self, ticket: Optional[WorkTicket] = None):
+        """Context holding a scheduler turn and CPU slot for one model call"""
+        with self.scheduler.turn(ticket):
+            if self.slots is None:
+                yield
+            else:
+                with self.slots.acquire():
+                    yield
+
+    def _load_model(self, model_name: str):
+        with metrics.STAGE_SECONDS.labels("model_load").time():
+            return self.backend.load_model(model_name)
+
+    def load_model(self, model_name: str):
         """Load and cache Whisper model"""
-        if model_name not in self.models:
-            logger.info(f"Loading Whisper model: {model_name}")
-            self.models[model_name] = whisper.load_model(
-                model_name, device=self.device
+        return self.models.get(model_name)
+
+    def _run_batch(self, key: tuple, batch: list) -> list:
+        model_name, task, language = key
+        model = self.load_model(model_name)
+        clips = [samples for samples, _ in batch]
+        # A batch is as urgent as its most urgent request
+        with self._slot(most_urgent([ticket for _, ticket in batch])):
+            return self.backend.transcribe_batch(
+                model, clips, task=task, language=language
             )
-            logger.info(f"Model {model_name} loaded successfully")
-        return self.models[model_name]
 
-    def preprocess_audio(self, audio_path: str) -> str:
-        """Convert audio to format compatible with Whisper"""
+    def _infer(
+        self,
+        model_name: str,
+        samples: np.ndarray,
+        options: dict,
+        ticket: Optional[WorkTicket] = None,
+    ) -> dict:
+        """
+        Run one inference call
+
+        Clips that fit in Whisper's 30-second window and need no extra
+        decoding options are micro-batched with concurrent requests for
+        the same model, task and language. The call waits for its turn at
+        the scheduler according to ``ticket``.
+        """
+        batchable = (
+            self.batcher is not None
+            and len(samples) <= WINDOW_SAMPLES
+            and set(options) <= {"task", "language"}
+        )
+        if batchable:
+            key = (model_name, options["task"], options.get("language"))
+            with metrics.STAGE_SECONDS.labels("inference").time():
+                return self.batcher.submit(key, (samples, ticket))
+
+        model = self.load_model(model_name)
+        stage = metrics.STAGE_SECONDS.labels("inference")
+        with self._slot(ticket), stage.time():
+            return self.backend.transcribe(model, samples, **options)
+
+    def _map_chunks(self, fn, items: Sequence) -> list:
+        """
+        Apply ``fn`` to long-form chunks concurrently, preserving order
+
+        The pool is separate from the request executor, so a request
+        occupying an inference worker never waits on its own slot. Each
+        request keeps at most LONG_FORM_WORKERS chunks in flight and the
+        pool has room for every running request's share, so chunks reach
+        the scheduler as soon as they are submitted and it alone decides
+        which client goes next. Concurrent chunks of the same request are
+        micro-batched into one forward pass when batching is enabled.
+        """
+        if settings.LONG_FORM_WORKERS <= 1 or len(items) <= 1:
+            return [fn(item) for item in items]
+        if self._chunk_pool is None:
+            with self._lazy_lock:
+                if self._chunk_pool is None:
+                    self._chunk_pool = ThreadPoolExecutor(
+                        max_workers=settings.LONG_FORM_WORKERS
+                        * settings.INFERENCE_WORKERS,
+                        thread_name_prefix="chunk",
+                    )
+
+        results = [None] * len(items)
+        queued = iter(enumerate(items))
+        in_flight = {}
+
+        def submit(count: int) -> None:
+            for index, item in itertools.islice(queued, count):
+                in_flight[self._chunk_pool.submit(fn, item)] = index
+
+        submit(settings.LONG_FORM_WORKERS)
         try:
-            # Load audio file
-            audio = AudioSegment.from_file(audio_path)
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    results[in_flight.pop(future)] = future.result()
+                submit(len(finished))
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+            raise
+        return results
+
+    def preload_models(self) -> None:
+        """Load the configured models before serving traffic"""
+        self.models.preload(settings.PRELOAD_MODELS)
+
+    def preload_shared(self) -> bool:
+        """
+        Load the configured models in a parent about to fork workers
 
-            # Convert to WAV format with correct sample rate
-            audio = audio.set_frame_rate(settings.SAMPLE_RATE)
-            audio = audio.set_channels(1)  # Convert to mono
+        Workers forked afterwards share the weights copy-on-write instead
+        of each loading a copy. Returns False, loading nothing, when the
+        backend cannot be used across fork.
+        """
+        if not self.backend.fork_safe:
+            logger.warning(
+                f"The {self.backend.name} backend on {self.device} cannot "
+                f"share models with worker processes; each worker will "
+                f"load its own copy"
+            )
+            return False
+        with self.backend.prefork_loading():
+            self.preload_models()
+        return True
+
+    def warm_up(self) -> None:
+        """
+        Run each preloaded model once on a short silent buffer
+
+        The first inference pays for kernel selection, allocator growth
+        and lazy initialisation inside the engine; doing it here keeps
+        that cost off the first real request.
+        """
+        samples = np.zeros(
+            int(settings.WARMUP_SECONDS * settings.SAMPLE_RATE),
+            dtype=np.float32,
+        )
+        for model_name in settings.PRELOAD_MODELS:
+            start_time = time.time()
+            # Straight to the model: VAD would skip the silence
+            self._infer(
+                model_name, samples, {"task": "transcribe", "language": "en"}
+            )
+            logger.info(
+                f"Warmed up {model_name} in {time.time() - start_time:.1f}s"
+            )
 
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(
-                suffix=".wav", delete=False
-            ) as temp_file:
-                temp_path = temp_file.name
-                audio.export(temp_path, format="wav")
+    def start(self) -> None:
+        """Load and warm up the configured models, then mark ready"""
+        self.preload_models()
+        if settings.WARMUP_ENABLED:
+            self.warm_up()
+        self.ready = True
 
-            return temp_path
+    def preprocess_audio(
+        self,
+        audio: Union[AudioSource, np.ndarray],
+        file_extension: Optional[str] = None,
+    ) -> np.ndarray:
+        """Decode audio to float32 mono PCM at the Whisper sample rate"""
+        if isinstance(audio, np.ndarray):
+            # Arrays are already at the model rate; channels are averaged
+            return downmix(audio)
 
+        try:
+            with metrics.STAGE_SECONDS.labels("decode").time():
+                return decode_audio(
+                    audio,
+                    sample_rate=settings.SAMPLE_RATE,
+                    file_extension=file_extension,
+                )
         except Exception as e:
             logger.error(f"Error preprocessing audio: {str(e)}")
             raise
 
-    def transcribe_audio(
+    def digest(self, audio: Union[AudioSource, np.ndarray]) -> Optional[str]:
+        """Hash of the audio content, or None when caching is disabled"""
+        if self.cache is None:
+            return None
+        return content_digest(audio)
+
+    def cache_key(
         self,
-        audio_path: str,
+        digest: Optional[str],
+        model: WhisperModel,
+        action: TranscriptionAction,
+        language: Optional[str] = None,
+        word_timestamps: bool = False,
+    ) -> Optional[str]:
+        """Cache key of a transcription of the content with ``digest``"""
+        if digest is None:
+            return None
+        return self.cache.make_key(
+            digest,
+            model.value,
+            action.value,
+            language or "auto",
+            word_timestamps,
+            self.backend.name,
+            self.backend.compute_type,
+        )
+
+    def language_key(
+        self, digest: Optional[str], model: WhisperModel
+    ) -> Optional[str]:
+        """Cache key of the language ``model`` detected in the content"""
+        if digest is None:
+            return None
+        return self.cache.make_key(
+            digest,
+            "language",
+            model.value,
+            self.backend.name,
+            self.backend.compute_type,
+        )
+
+    def cached_language(
+        self, digest: Optional[str], model: WhisperModel, top_k: int = 5
+    ) -> Optional[dict]:
+        """Detection ``model`` already ran on the content, if cached"""
+        result = self.get_cached(self.language_key(digest, model))
+        if result is None:
+            return None
+        return _top_languages(result, top_k)
+
+    def get_cached(self, key: Optional[str]) -> Optional[dict]:
+        """Cached result for ``key`` marked as a cache hit, if present"""
+        if key is None:
+            return None
+        start_time = time.time()
+        result = self.cache.get(key)
+        if result is None:
+            return None
+        return dict(
+            result,
+            processing_time=time.time() - start_time,
+            cache_hit=True,
+        )
+
+    def transcribe(
+        self,
+        audio: Union[AudioSource, np.ndarray],
         model: WhisperModel = WhisperModel.TURBO,
         action: TranscriptionAction = TranscriptionAction.TRANSCRIBE,
         language: Optional[str] = None,
-    ) -> Tuple[str, str, float]:
+        file_extension: Optional[str] = None,
+        digest: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+        on_segments: Optional[SegmentCallback] = None,
+        word_timestamps: bool = False,
+        ticket: Optional[WorkTicket] = None,
+    ) -> dict:
         """
-        Transcribe audio file using Whisper
+        Transcribe audio using Whisper
+
+        ``audio`` may be a path, raw bytes, a binary file object or an
+        already decoded PCM array. Identical content is served from the
+        result cache, and a language the same model detected earlier for
+        the same content is reused instead of being detected again.
+        ``progress`` is called as each window finishes and
+        ``on_segments`` receives finished segments as soon as all earlier
+        ones have been delivered. ``ticket`` sets the priority class and
+        client each window is scheduled under.
 
         Returns:
-            Tuple of (transcribed_text, detected_language, processing_time)
+            Dict with text, language, segments, processing_time, cache_hit
         """
         start_time = time.time()
-        temp_path = None
 
         try:
-            # Load the specified model
-            whisper_model = self.load_model(model.value)
-
-            # Preprocess audio
-            temp_path = self.preprocess_audio(audio_path)
+            if digest is None:
+                digest = self.digest(audio)
+            cache_key = self.cache_key(
+                digest, model, action, language, word_timestamps
+            )
+            cached = self.get_cached(cache_key)
+            if cached is not None:
+                logger.info(f"Cache hit for {action.value} with {model.value}")
+                return cached
 
-            # Prepare options
-            options = {}
-            if action == TranscriptionAction.TRANSLATE:
-                options["task"] = "translate"
-            else:
-                options["task"] = "transcribe"
+            if language is None and digest is not None:
+                detected = self.cache.get(self.language_key(digest, model))
+                if detected is not None:
+                    language = detected["language"]
 
-            if language:
-                options["language"] = language
+            # Decode audio straight to PCM
+            samples = self.preprocess_audio(audio, file_extension)
 
             # Perform transcription
             logger.info(f"Starting {action.value} with model {model.value}")
-            result = whisper_model.transcribe(temp_path, **options)
+            result = self.transcribe_samples(
+                samples,
+                model,
+                action,
+                language,
+                progress=progress,
+                on_segments=on_segments,
+                word_timestamps=word_timestamps,
+                ticket=ticket,
+            )
 
-            processing_time = time.time() - start_time
+            output = {
+                "text": result["text"].strip(),
+                "language": result.get("language") or "unknown",
+                "segments": result.get("segments", []),
+            }
+            if cache_key is not None:
+                self.cache.put(cache_key, output)
 
-            return (
-                result["text"].strip(),
-                result.get("language", "unknown"),
-                processing_time,
+            return dict(
+                output,
+                processing_time=time.time() - start_time,
+                cache_hit=False,
             )
 
         except Exception as e:
             logger.error(f"Error during transcription: {str(e)}")
             raise
-        finally:
-            # Clean up temporary file
-            if temp_path and os.path.exists(temp_path):
-                os.unlink(temp_path)
+
+    def detect_language(
+        self,
+        audio: Union[AudioSource, np.ndarray],
+        model: WhisperModel = WhisperModel.TURBO,
+        top_k: int = 5,
+        file_extension: Optional[str] = None,
+        digest: Optional[str] = None,
+        ticket: Optional[WorkTicket] = None,
+    ) -> dict:
+        """
+        Identify the spoken language from the start of the audio
+
+        Only the first LANGUAGE_DETECT_SECONDS are decoded. Their speech is
+        packed into a single mel window and the model runs language
+        detection alone, without transcribing. Results are cached by
+        content and model so a later transcription of the same audio
+        with the same model skips detection.
+
+        Returns:
+            Dict with language, probabilities (top ``top_k``, most likely
+            first), processing_time, cache_hit
+        """
+        start_time = time.time()
+
+        try:
+            if digest is None:
+                digest = self.digest(audio)
+            key = self.language_key(digest, model)
+            result = self.get_cached(key)
+
+            if result is None:
+                if isinstance(audio, np.ndarray):
+                    samples = audio[
+                        : int(
+                            settings.LANGUAGE_DETECT_SECONDS
+                            * settings.SAMPLE_RATE
+                        )
+                    ].astype(np.float32, copy=False)
+                else:
+                    samples = decode_audio(
+                        audio,
+                        sample_rate=settings.SAMPLE_RATE,
+                        file_extension=file_extension,
+                        duration=settings.LANGUAGE_DETECT_SECONDS,
+                    )
+
+                # Leading silence says nothing about the language
+                if settings.VAD_ENABLED:
+                    regions = self.vad.detect(samples)
+                    if regions:
+                        timeline = SpeechTimeline(
+                            regions, settings.SAMPLE_RATE
+                        )
+                        samples = timeline.collapse(samples)
+
+                whisper_model = self.load_model(model.value)
+                stage = metrics.STAGE_SECONDS.labels("language_detection")
+                with self._slot(ticket), stage.time():
+                    probabilities = self.backend.detect_language(
+                        whisper_model, samples[:WINDOW_SAMPLES]
+                    )
+                ranked = sorted(
+                    probabilities.items(),
+                    key=lambda item: item[1],
+                    reverse=True,
+                )
+                result = {
+                    "language": ranked[0][0],
+                    "probabilities": dict(ranked),
+                }
+                if key is not None:
+                    self.cache.put(key, result)
+                result = dict(result, cache_hit=False)
+
+            return dict(
+                _top_languages(result, top_k),
+                processing_time=time.time() - start_time,
+            )
+
+        except Exception as e:
+            logger.error(f"Error detecting language: {str(e)}")
+            raise
+
+    def transcribe_audio(
+        self,
+        audio: Union[AudioSource, np.ndarray],
+        model: WhisperModel = WhisperModel.TURBO,
+        action: TranscriptionAction = TranscriptionAction.TRANSCRIBE,
+        language: Optional[str] = None,
+        file_extension: Optional[str] = None,
+    ) -> Tuple[str, str, float]:
+        """
+        Transcribe audio using Whisper
+
+        Returns:
+            Tuple of (transcribed_text, detected_language, processing_time)
+        """
+        result = self.transcribe(
+            audio, model, action, language, file_extension
+        )
+        return result["text"], result["language"], result["processing_time"]
+
+    def transcribe_samples(
+        self,
+        samples: np.ndarray,
+        model: WhisperModel = WhisperModel.TURBO,
+        action: TranscriptionAction = TranscriptionAction.TRANSCRIBE,
+        language: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+        on_segments: Optional[SegmentCallback] = None,
+        word_timestamps: bool = False,
+        ticket: Optional[WorkTicket] = None,
+        initial_prompt: Optional[str] = None,
+    ) -> dict:
+        """
+        Run Whisper on decoded PCM and return the full result dict
+
+        With VAD enabled only speech regions reach the model. Speech is
+        packed into windows of at most VAD_MAX_BATCH_SECONDS, cutting at
+        pauses where possible and with a short overlap where continuous
+        speech has to be split. Windows run concurrently and their
+        segments are stitched back onto the original timeline.
+        ``initial_prompt`` conditions the decoder on preceding text.
+        """
+        # Prepare options
+        options = {"task": action.value}
+        if language:
+            options["language"] = language
+        if initial_prompt:
+            options["initial_prompt"] = initial_prompt
+        if word_timestamps:
+            # Word timings come from the same pass, so these windows are
+            # run unbatched through the backend's full transcribe
+            options["word_timestamps"] = True
+
+        start_time = time.time()
+        if settings.VAD_ENABLED:
+            with metrics.STAGE_SECONDS.labels("vad").time():
+                regions = self.vad.detect(samples)
+            speech_samples = sum(end - start for start, end in regions)
+            logger.info(
+                f"VAD kept {speech_samples / settings.SAMPLE_RATE:.1f}s of "
+                f"{len(samples) / settings.SAMPLE_RATE:.1f}s audio"
+            )
+            if not regions:
+                return {"text": "", "segments": [], "language": language}
+        elif len(samples) > 0:
+            regions = [(0, len(samples))]
+        else:
+            return self._infer(model.value, samples, options, ticket)
+
+        max_batch = int(settings.VAD_MAX_BATCH_SECONDS * settings.SAMPLE_RATE)
+        if any(end - start > max_batch for start, end in regions):
+            regions = split_long_regions(
+                regions,
+                self.vad.frame_levels(samples),
+                self.vad.frame_size,
+                max_batch,
+                overlap=int(
+                    settings.CHUNK_OVERLAP_SECONDS * settings.SAMPLE_RATE
+                ),
+                search=int(
+                    settings.CHUNK_SEARCH_SECONDS * settings.SAMPLE_RATE
+                ),
+            )
+        batches = group_regions(regions, max_batch)
+        bounds = window_bounds(batches, settings.SAMPLE_RATE)
+        lock = threading.Lock()
+        finished = {}
+        done = 0
+        next_window = 0
+        next_id = 0
+
+        def run(index):
+            nonlocal done, next_window, next_id
+            timeline = SpeechTimeline(batches[index], settings.SAMPLE_RATE)
+            result = self._infer(
+                model.value,
+                timeline.collapse(samples),
+                dict(options),
+                ticket,
+            )
+            with lock:
+                done += 1
+                if progress is not None:
+                    progress(done, len(batches))
+                if on_segments is None:
+                    return result
+
+                # Hand segments over in timeline order as windows finish
+                finished[index] = result
+                while next_window in finished:
+                    segments = window_segments(
+                        batches[next_window],
+                        finished.pop(next_window),
+                        bounds[next_window],
+                        settings.SAMPLE_RATE,
+                    )
+                    for segment in segments:
+                        segment["id"] = next_id
+                        next_id += 1
+                    if segments:
+                        on_segments(segments)
+                    next_window += 1
+            return result
+
+        results = []
+        if "language" not in options:
+            # Detect the language once and reuse it for every other window
+            results.append(run(0))
+            if results[0].get("language"):
+                options["language"] = results[0]["language"]
+        results.extend(
+            self._map_chunks(run, range(len(results), len(batches)))
+        )
+
+        if len(batches) > 1:
+            logger.info(f"Stitched {len(batches)} windows")
+
+        duration = len(samples) / settings.SAMPLE_RATE
+        metrics.AUDIO_SECONDS.labels(model.value, action.value).inc(duration)
+        metrics.REALTIME_FACTOR.labels(model.value).observe(
+            (time.time() - start_time) / duration
+        )
+        return dict(
+            stitch_results(batches, results, settings.SAMPLE_RATE),
+            language=options.get("language"),
+        )
 
     def transcribe_audio_chunk(
         self,
         audio_data: bytes,
         model: WhisperModel = WhisperModel.TURBO,
         action: TranscriptionAction = TranscriptionAction.TRANSCRIBE,
+        initial_prompt: Optional[str] = None,
     ) -> str:
         """
         Transcribe audio chunk for real-time processing
-        """
-        temp_path = None
 
+        Pass the text of earlier chunks as ``initial_prompt`` to keep the
+        decoder's context across chunk boundaries.
+        """
         try:
-            # Save audio chunk to temporary file
-            with tempfile.NamedTemporaryFile(
-                suffix=".wav", delete=False
-            ) as temp_file:
-                temp_path = temp_file.name
-                temp_file.write(audio_data)
-
-            # Load model
-            whisper_model = self.load_model(model.value)
-
-            # Prepare options
-            options = {"task": action.value}
+            # Decode chunk in memory
+            samples = decode_audio(audio_data, settings.SAMPLE_RATE)
 
             # Transcribe chunk
-            result = whisper_model.transcribe(temp_path, **options)
+            result = self.transcribe_samples(
+                samples, model, action, initial_prompt=initial_prompt
+            )
 
             return result["text"].strip()
 
         except Exception as e:
             logger.error(f"Error transcribing audio chunk: {str(e)}")
             return ""
-        finally:
-            # Clean up
-            if temp_path and os.path.exists(temp_path):
-                os.unlink(temp_path)
+
+    def get_stats(self) -> dict:
+        """Runtime metrics for the service"""
+        stats = {
+            "inference": self.executor.stats(),
+            "models": self.models.stats(),
+            "decoder_pool": decoder_pool.stats(),
+        }
+        if self._batcher not in (_UNSET, None):
+            stats["batching"] = self._batcher.stats()
+        if self._slots not in (_UNSET, None):
+            stats["slots"] = self._slots.stats()
+        if self._scheduler is not None:
+            stats["scheduler"] = self._scheduler.stats()
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
 
 
 # Global service instance
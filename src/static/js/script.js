@@ -7,6 +7,10 @@ class SafeSound {
         this.audioContext = null;
         this.analyser = null;
         this.websocket = null;
+        this.streamCredit = 0;
+        this.pendingChunks = [];
+        this.chunkReads = Promise.resolve();
+        this.stopRequested = false;
         this.selectedFile = null;
         
         this.initializeApp();
@@ -215,6 +219,7 @@ class SafeSound {
             this.mediaRecorder.ondataavailable = (event) => {
                 if (event.data.size > 0) {
                     this.audioChunks.push(event.data);
+                    this.sendAudioChunk(event.data);
                 }
             };
             
@@ -249,11 +254,8 @@ class SafeSound {
                 this.mediaRecorder.stream.getTracks().forEach(track => track.stop());
             }
             
-            // Close WebSocket
-            if (this.websocket) {
-                this.websocket.close();
-                this.websocket = null;
-            }
+            // The WebSocket is closed by the server once it has flushed
+            // the session (see processRecordedAudio)
             
             // Stop visualization
             if (this.audioContext) {
@@ -272,9 +274,14 @@ class SafeSound {
         this.websocket.onopen = () => {
             console.log('WebSocket connected');
             // Send configuration
+            this.streamCredit = 0;
+            this.pendingChunks = [];
+            this.chunkReads = Promise.resolve();
+            this.stopRequested = false;
             const config = {
                 model: document.getElementById('modelSelect').value,
-                action: document.getElementById('actionSelect').value
+                action: document.getElementById('actionSelect').value,
+                format: 'webm'
             };
             this.websocket.send(JSON.stringify(config));
         };
@@ -284,6 +291,10 @@ class SafeSound {
             this.handleWebSocketMessage(data);
         };
         
+        this.websocket.onclose = () => {
+            this.websocket = null;
+        };
+        
         this.websocket.onerror = (error) => {
             console.error('WebSocket error:', error);
             this.showError('Erro na conexão de tempo real');
@@ -292,11 +303,20 @@ class SafeSound {
     
     handleWebSocketMessage(data) {
         switch (data.type) {
+            case 'ready':
+                this.streamCredit = data.credit;
+                this.flushAudioChunks();
+                break;
+            case 'credit':
+                this.streamCredit += data.n;
+                this.flushAudioChunks();
+                break;
             case 'transcription':
                 this.appendRealtimeTranscription(data.text);
+                this.showPartialTranscription(data.partial || '');
                 break;
-            case 'progress':
-                // Handle progress updates if needed
+            case 'overload':
+                console.warn(`Transcription fell behind; ${data.dropped}s of audio skipped`);
                 break;
             case 'error':
                 this.showError(data.message);
@@ -304,17 +324,38 @@ class SafeSound {
         }
     }
     
+    sendAudioChunk(blob) {
+        // Reads are chained so chunks are queued in recording order
+        this.chunkReads = this.chunkReads
+            .then(() => blob.arrayBuffer())
+            .then(buffer => {
+                // WebM chunks cannot be skipped, so wait for credit instead
+                this.pendingChunks.push(buffer);
+                this.flushAudioChunks();
+            });
+    }
+    
+    flushAudioChunks() {
+        if (!this.websocket || this.websocket.readyState !== WebSocket.OPEN) {
+            return;
+        }
+        while (this.streamCredit > 0 && this.pendingChunks.length > 0) {
+            this.websocket.send(this.pendingChunks.shift());
+            this.streamCredit -= 1;
+        }
+        // Stop only follows the last chunk, once credit allowed sending it
+        if (this.stopRequested && this.pendingChunks.length === 0) {
+            this.stopRequested = false;
+            this.websocket.send(JSON.stringify({ type: 'stop' }));
+        }
+    }
+    
     processRecordedAudio() {
-        if (this.audioChunks.length === 0) return;
-        
-        // Send the last chunk via WebSocket for final processing
-        const audioBlob = new Blob(this.audioChunks, { type: 'audio/webm' });
-        
-        // Convert to ArrayBuffer and send
-        audioBlob.arrayBuffer().then(buffer => {
-            if (this.websocket && this.websocket.readyState === WebSocket.OPEN) {
-                this.websocket.send(buffer);
-            }
+        // Wait for the final chunk to be queued, then ask the server to
+        // commit the remaining text and close the session
+        this.chunkReads.then(() => {
+            this.stopRequested = true;
+            this.flushAudioChunks();
         });
     }
     
@@ -397,9 +438,7 @@ class SafeSound {
         this.enableResultActions();
     }
     
-    appendRealtimeTranscription(text) {
-        if (!text.trim()) return;
-        
+    getRealtimeElements() {
         const transcriptionText = document.getElementById('transcriptionText');
         
         // Remove placeholder if exists
@@ -408,14 +447,36 @@ class SafeSound {
             placeholder.remove();
         }
         
-        // Append new text
-        const existingText = transcriptionText.textContent || '';
-        transcriptionText.innerHTML = `<p>${existingText} ${text}</p>`;
+        let committed = transcriptionText.querySelector('.committed-text');
+        let partial = transcriptionText.querySelector('.partial-text');
+        if (!committed || !partial) {
+            const existingText = transcriptionText.textContent.trim();
+            transcriptionText.innerHTML =
+                '<p><span class="committed-text"></span> <span class="partial-text"></span></p>';
+            committed = transcriptionText.querySelector('.committed-text');
+            partial = transcriptionText.querySelector('.partial-text');
+            committed.textContent = existingText;
+        }
+        return { committed, partial };
+    }
+    
+    appendRealtimeTranscription(text) {
+        if (!text.trim()) return;
+        
+        // Append stable text and drop the superseded hypothesis
+        const { committed, partial } = this.getRealtimeElements();
+        committed.textContent = `${committed.textContent} ${text}`.trim();
+        partial.textContent = '';
         
         this.updateTranscriptionInfo('Transcrição em tempo real ativa');
         this.enableResultActions();
     }
     
+    showPartialTranscription(text) {
+        const { partial } = this.getRealtimeElements();
+        partial.textContent = text;
+    }
+    
     updateTranscriptionInfo(info) {
         document.getElementById('transcriptionInfo').textContent = info;
     }
@@ -4,6 +4,17 @@ from main import app
 
 client = TestClient(app)
 
+@pytest.fixture(autouse=True)
+def job_manager(tmp_path, monkeypatch):
+    """Keep each test's job store and job workers out of the working tree"""
+    from src.routes import transcribe
+    from src.services.job_manager import JobManager
+    manager = JobManager(transcribe.whisper_service, str(tmp_path / "jobs"))
+    monkeypatch.setattr(transcribe, "job_manager", manager)
+    yield manager
+    manager.stop(5.0)
+    manager.close()
+
 def test_read_main():
     """Test main page loads correctly"""
     response = client.get("/")
@@ -38,3 +49,313 @@ def test_upload_audio_invalid_file():
     files = {"file": ("test.txt", b"fake content", "text/plain")}
     response = client.post("/api/upload_audio", files=files)
     assert response.status_code == 400
+
+def test_stats():
+    """Test inference stats endpoint"""
+    response = client.get("/api/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert "queue_depth" in data["inference"]
+    assert "wait_time_avg" in data["inference"]
+
+def test_upload_audio_queue_full():
+    """Test upload is rejected with Retry-After when the queue is full"""
+    from unittest.mock import patch, AsyncMock
+    from src.services.inference_executor import QueueFullError
+    files = {"file": ("test.wav", b"fake content", "audio/wav")}
+    with patch(
+        "src.routes.transcribe.whisper_service.executor.submit",
+        new=AsyncMock(side_effect=QueueFullError(5)),
+    ):
+        response = client.post("/api/upload_audio", files=files)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+def test_submit_job():
+    """Test a job is queued and its id returned immediately"""
+    from unittest.mock import patch
+    files = {"file": ("test.wav", b"fake content", "audio/wav")}
+    with patch(
+        "src.routes.transcribe.job_manager.submit", return_value="abc"
+    ) as mock_submit:
+        response = client.post("/api/jobs", files=files)
+    assert response.status_code == 202
+    assert response.json() == {"job_id": "abc", "status": "queued"}
+    mock_submit.assert_called_once()
+
+def test_job_status_and_result():
+    """Test job progress and result retrieval"""
+    from unittest.mock import patch
+    job = {
+        "status": "running",
+        "progress": 40,
+        "message": "Transcribing audio",
+        "params": {"model": "small", "action": "transcribe"},
+        "result": None,
+    }
+    with patch("src.routes.transcribe.job_manager.get", return_value=job):
+        status = client.get("/api/jobs/abc")
+        early = client.get("/api/jobs/abc/result")
+    assert status.json() == {"progress": 40, "status": "running", "message": "Transcribing audio"}
+    assert early.status_code == 409
+    
+    job.update(status="completed", progress=100, result={
+        "text": "hello", "language": "en", "segments": [],
+        "processing_time": 1.0, "cache_hit": False,
+    })
+    with patch("src.routes.transcribe.job_manager.get", return_value=job):
+        result = client.get("/api/jobs/abc/result")
+    assert result.status_code == 200
+    assert result.json()["text"] == "hello"
+    assert result.json()["model_used"] == "small"
+
+def test_unknown_job():
+    """Test unknown job ids return 404"""
+    response = client.get("/api/jobs/missing")
+    assert response.status_code == 404
+
+def test_upload_audio_stream():
+    """Test segments are streamed before the summary event"""
+    import json
+    from unittest.mock import patch
+    
+    def fake_transcribe(*args, on_segments=None, **kwargs):
+        segments = [
+            {"id": 0, "start": 0.0, "end": 1.0, "text": " Hello", "avg_logprob": -0.2},
+            {"id": 1, "start": 1.0, "end": 2.0, "text": " world", "avg_logprob": -0.3},
+        ]
+        on_segments(segments[:1])
+        on_segments(segments[1:])
+        return {
+            "text": "Hello world", "language": "en", "segments": segments,
+            "processing_time": 0.5, "cache_hit": False,
+        }
+    
+    files = {"file": ("stream.wav", b"streamed content", "audio/wav")}
+    with patch(
+        "src.routes.transcribe.whisper_service.transcribe", new=fake_transcribe
+    ):
+        response = client.post(
+            "/api/upload_audio/stream", files=files, data={"format": "ndjson"}
+        )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["event"] for e in events] == ["segment", "segment", "summary"]
+    assert events[0]["data"]["avg_logprob"] == -0.2
+    assert events[-1]["data"]["text"] == "Hello world"
+
+def test_upload_audio_stream_timeout():
+    """Test a stream past the inference timeout ends with an error and stops"""
+    import json
+    import time
+    from unittest.mock import patch
+    from src.routes.transcribe import whisper_service
+    windows = []
+    
+    def slow_transcribe(*args, progress=None, on_segments=None, **kwargs):
+        on_segments([{"id": 0, "start": 0.0, "end": 1.0, "text": " Hello"}])
+        for window in range(50):
+            time.sleep(0.02)
+            windows.append(window)
+            progress(window + 1, 50)
+        return {"text": "Hello", "language": "en", "segments": []}
+    
+    executor = whisper_service.executor
+    timed_out = executor.stats()["timed_out"]
+    files = {"file": ("slow.wav", b"slow content", "audio/wav")}
+    with patch(
+        "src.routes.transcribe.whisper_service.transcribe", new=slow_transcribe
+    ), patch("src.routes.transcribe.settings.INFERENCE_TIMEOUT", 0.1):
+        response = client.post(
+            "/api/upload_audio/stream", files=files, data={"format": "ndjson"}
+        )
+        events = [json.loads(line) for line in response.text.splitlines()]
+        time.sleep(0.1)
+    
+    assert [e["event"] for e in events] == ["segment", "error"]
+    assert "0.1 seconds" in events[-1]["data"]["detail"]
+    assert executor.stats()["timed_out"] == timed_out + 1
+    # The transcription gave up at its next window
+    assert len(windows) < 50
+
+def test_upload_audio_segments_and_exports():
+    """Test segments, word timings and subtitle exports from one pass"""
+    from unittest.mock import patch, AsyncMock
+    result = {
+        "text": "Hello", "language": "en", "processing_time": 0.5, "cache_hit": False,
+        "segments": [{
+            "id": 0, "start": 0.0, "end": 1.0, "text": " Hello",
+            "words": [{"word": " Hello", "start": 0.1, "end": 0.9, "probability": 0.9}],
+        }],
+    }
+    files = {"file": ("segments.wav", b"segment content", "audio/wav")}
+    with patch(
+        "src.routes.transcribe.whisper_service.executor.submit",
+        new=AsyncMock(return_value=result),
+    ) as mock_submit:
+        plain = client.post("/api/upload_audio", files=files)
+        detailed = client.post(
+            "/api/upload_audio", files=files,
+            data={"include_segments": "true", "word_timestamps": "true"},
+        )
+        srt = client.post("/api/upload_audio", files=files, data={"response_format": "srt"})
+    
+    assert plain.json()["segments"] is None
+    segment = detailed.json()["segments"][0]
+    assert segment["words"][0]["start"] == 0.1
+    assert mock_submit.call_args_list[1][1]["word_timestamps"] is True
+    assert srt.text == "1\n00:00:00,000 --> 00:00:01,000\nHello\n"
+    
+    bad = client.post("/api/upload_audio", files=files, data={"response_format": "doc"})
+    assert bad.status_code == 400
+
+def test_cpu_only_model_on_gpu():
+    """Test an int8 model requested on a GPU deployment is a client error"""
+    from unittest.mock import patch, AsyncMock
+    from src.services.backends import UnsupportedModelError
+    files = {"file": ("int8.wav", b"int8 content", "audio/wav")}
+    error = UnsupportedModelError("Model small-int8 runs on CPU only")
+    with patch(
+        "src.routes.transcribe.whisper_service.executor.submit",
+        new=AsyncMock(side_effect=error),
+    ):
+        upload = client.post("/api/upload_audio", files=files, data={"model": "small-int8"})
+        detect = client.post("/api/detect_language", files=files, data={"model": "small-int8"})
+    
+    for response in (upload, detect):
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Model small-int8 runs on CPU only"
+
+def test_detect_language():
+    """Test the language detection endpoint"""
+    from unittest.mock import patch, AsyncMock
+    result = {
+        "language": "pt",
+        "probabilities": {"pt": 0.9, "es": 0.08},
+        "processing_time": 0.1,
+        "cache_hit": False,
+    }
+    files = {"file": ("lang.wav", b"language content", "audio/wav")}
+    with patch(
+        "src.routes.transcribe.whisper_service.executor.submit",
+        new=AsyncMock(return_value=result),
+    ):
+        response = client.post("/api/detect_language", files=files, data={"top_k": "2"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["language"] == "pt"
+    assert data["probabilities"] == {"pt": 0.9, "es": 0.08}
+
+def test_detect_language_cached_skips_queue():
+    """Test a cached detection is answered even while the queue is full"""
+    from unittest.mock import patch, AsyncMock
+    from src.services.inference_executor import QueueFullError
+    cached = {
+        "language": "pt",
+        "probabilities": {"pt": 0.9},
+        "processing_time": 0.0,
+        "cache_hit": True,
+    }
+    files = {"file": ("lang.wav", b"language content", "audio/wav")}
+    with patch(
+        "src.routes.transcribe.whisper_service.cached_language",
+        return_value=cached,
+    ) as mock_cached, patch(
+        "src.routes.transcribe.whisper_service.executor.submit",
+        new=AsyncMock(side_effect=QueueFullError(5)),
+    ) as mock_submit:
+        response = client.post("/api/detect_language", files=files, data={"model": "small"})
+    
+    assert response.status_code == 200
+    assert response.json()["cached"] is True
+    assert mock_cached.call_args[0][1].value == "small"
+    mock_submit.assert_not_called()
+
+def test_metrics():
+    """Test Prometheus metrics are exposed with per-endpoint latency"""
+    client.get("/api/health")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'safesound_http_request_seconds_count{endpoint="health_check",method="GET",status="200"}' in response.text
+    assert "safesound_inference_queue_depth" in response.text
+    assert "safesound_websocket_sessions" in response.text
+
+def test_readiness():
+    """Test readiness waits for the lifespan startup while liveness does not"""
+    from src.routes.transcribe import whisper_service
+    whisper_service.ready = False
+    assert client.get("/api/health/live").status_code == 200
+    assert client.get("/api/health/ready").status_code == 503
+    
+    with TestClient(app) as started:
+        response = started.get("/api/health/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+def test_import_does_not_load_torch():
+    """Test importing the app leaves the model stack for first use"""
+    import subprocess
+    import sys
+    code = (
+        "import sys, main; "
+        "print(any(m in sys.modules for m in ('torch', 'whisper', 'faster_whisper')))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "False"
+
+def test_transcribe_stream_pcm():
+    """Test PCM streaming with credits and compact transcription messages"""
+    import json
+    from unittest.mock import patch, AsyncMock
+    result = {"text": "hello", "language": "en", "segments": [
+        {"start": 0.0, "end": 1.0, "text": "hello"}
+    ]}
+    frame = b"\x00\x00" * 16000
+    with patch(
+        "src.routes.transcribe.whisper_service.executor.submit",
+        new=AsyncMock(side_effect=lambda fn, *args, priority=None, **kwargs: fn(*args, **kwargs)),
+    ), patch(
+        "src.routes.transcribe.whisper_service.transcribe_samples",
+        return_value=result,
+    ):
+        with client.websocket_connect("/api/transcribe_stream") as websocket:
+            websocket.send_text(json.dumps(
+                {"model": "small", "format": "pcm_s16le", "sample_rate": 16000}
+            ))
+            ready = websocket.receive_json()
+            assert ready["type"] == "ready" and ready["credit"] > 0
+            
+            websocket.send_bytes(frame)
+            messages = [websocket.receive_json(), websocket.receive_json()]
+            assert {"type": "credit", "n": 1} in messages
+            assert {"type": "transcription", "text": "", "partial": "hello", "final": False} in messages
+            
+            websocket.send_text(json.dumps({"type": "stop"}))
+            final = websocket.receive_json()
+    assert final["type"] == "transcription"
+    assert final["final"] is True
+    assert final["text"] == "hello"
+
+def test_transcribe_stream_unknown_format():
+    """Test an unknown stream format is refused during setup"""
+    import json
+    with client.websocket_connect("/api/transcribe_stream") as websocket:
+        websocket.send_text(json.dumps({"model": "small", "format": "mp3"}))
+        message = websocket.receive_json()
+    assert message["type"] == "error"
+
+def test_transcribe_stream_invalid_sample_rate():
+    """Test a PCM stream without a positive sample rate is refused"""
+    import json
+    for rate in (0, -16000):
+        with client.websocket_connect("/api/transcribe_stream") as websocket:
+            websocket.send_text(json.dumps(
+                {"model": "small", "format": "pcm_s16le", "sample_rate": rate}
+            ))
+            message = websocket.receive_json()
+        assert message == {"type": "error", "message": f"Invalid sample rate {rate}"}
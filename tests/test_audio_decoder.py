@@ -0,0 +1,172 @@
+import io
+import sys
+import time
+import wave
+import numpy as np
+import pytest
+from unittest.mock import patch
+from src.services.audio_decoder import (
+    AudioDecodeError, DecoderPool, PCMStreamDecoder, _run_ffmpeg, decode_audio,
+    open_stream_decoder,
+)
+
+def make_wav(samples, sample_rate=16000, channels=1, width=2):
+    """Integer PCM WAV bytes from float samples shaped (frames[, channels])"""
+    scale = float(1 << (8 * width - 1))
+    pcm = np.clip(np.round(samples * scale), -scale, scale - 1).astype(f"<i{width}")
+    if width == 1:
+        # 8-bit WAV is unsigned
+        pcm = (pcm.astype(np.int16) + 128).astype(np.uint8)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(width)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+class TestAudioDecoder:
+    @patch('src.services.audio_decoder._run_ffmpeg')
+    def test_decode_bytes_over_pipe(self, mock_run_ffmpeg):
+        """Test bytes are piped to ffmpeg and returned as float32 PCM"""
+        pcm = np.array([0, 16384, -32768], dtype=np.int16).tobytes()
+        mock_run_ffmpeg.return_value = pcm
+        
+        samples = decode_audio(b"fake audio", sample_rate=16000)
+        
+        assert samples.dtype == np.float32
+        np.testing.assert_allclose(samples, [0.0, 0.5, -1.0])
+        cmd, source = mock_run_ffmpeg.call_args[0]
+        assert "pipe:0" in cmd
+        assert cmd[cmd.index("-ar") + 1] == "16000"
+        assert source.read() == b"fake audio"
+    
+    @patch('src.services.audio_decoder._run_ffmpeg')
+    def test_decode_file_object(self, mock_run_ffmpeg):
+        """Test file objects are streamed without reading them first"""
+        mock_run_ffmpeg.return_value = b""
+        stream = io.BytesIO(b"fake audio")
+        
+        decode_audio(stream)
+        
+        assert mock_run_ffmpeg.call_args[0][1] is stream
+    
+    def test_decode_missing_path(self):
+        """Test decoding a missing file raises AudioDecodeError"""
+        with pytest.raises(AudioDecodeError):
+            decode_audio("nonexistent_file.wav")
+    
+    @patch('src.services.audio_decoder._run_ffmpeg')
+    def test_wav_is_decoded_in_process(self, mock_run_ffmpeg):
+        """Test PCM WAV is downmixed and resampled without ffmpeg"""
+        t = np.arange(48000) / 48000
+        tone = 0.5 * np.sin(2 * np.pi * 440 * t)
+        stereo = np.stack([tone, tone], axis=1)
+        
+        samples = decode_audio(make_wav(stereo, 48000, channels=2))
+        
+        mock_run_ffmpeg.assert_not_called()
+        assert samples.dtype == np.float32
+        assert len(samples) == 16000
+        expected = 0.5 * np.sin(2 * np.pi * 440 * np.arange(16000) / 16000)
+        np.testing.assert_allclose(samples[100:-100], expected[100:-100], atol=1e-3)
+    
+    @patch('src.services.audio_decoder._run_ffmpeg')
+    def test_wav_sample_widths_and_duration(self, mock_run_ffmpeg):
+        """Test 8, 16 and 32-bit WAV scale alike and duration trims"""
+        ramp = np.linspace(-0.5, 0.5, 32000)
+        
+        for width in (1, 2, 4):
+            samples = decode_audio(
+                io.BytesIO(make_wav(ramp, width=width)), duration=1.0
+            )
+            assert len(samples) == 16000
+            np.testing.assert_allclose(samples, ramp[:16000], atol=1 / 128)
+        mock_run_ffmpeg.assert_not_called()
+    
+    @patch('src.services.audio_decoder.DECODE_BLOCK_FRAMES', 1000)
+    def test_wav_is_resampled_while_reading(self):
+        """Test WAV read in blocks matches resampling the whole file"""
+        from src.services.audio_frontend import downmix, resample
+        stereo = np.random.default_rng(0).uniform(-0.5, 0.5, (44100 * 3, 2))
+        data = make_wav(stereo, 44100, channels=2)
+        whole = resample(
+            downmix(np.frombuffer(data[44:], "<i2").reshape(-1, 2) / 32768.0),
+            44100,
+            16000,
+        )
+        
+        np.testing.assert_array_equal(decode_audio(data), whole)
+        # A file cut off part way through a frame keeps its whole frames
+        assert len(decode_audio(data[:-1])) == len(whole)
+    
+    @patch('src.services.audio_decoder._run_ffmpeg')
+    def test_flac_without_soundfile_uses_ffmpeg(self, mock_run_ffmpeg):
+        """Test FLAC falls back to ffmpeg when soundfile is not installed"""
+        mock_run_ffmpeg.return_value = b""
+        stream = io.BytesIO(b"fLaC" + bytes(64))
+        
+        with patch.dict(sys.modules, {"soundfile": None}):
+            decode_audio(stream)
+        
+        assert mock_run_ffmpeg.call_args[0][1] is stream
+        assert stream.tell() == 0
+
+class TestDecoderPool:
+    def test_spare_processes_are_reused(self):
+        """Test a piped decode takes a process started ahead of time"""
+        pool = DecoderPool(1)
+        
+        with patch('src.services.audio_decoder.decoder_pool', pool):
+            assert _run_ffmpeg(["cat"], io.BytesIO(b"first")) == b"first"
+            deadline = time.monotonic() + 5
+            while pool.stats()["idle"] == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert _run_ffmpeg(["cat"], io.BytesIO(b"second")) == b"second"
+        
+        stats = pool.stats()
+        pool.close()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+    
+    def test_missing_ffmpeg(self):
+        """Test a missing decoder binary raises AudioDecodeError"""
+        with pytest.raises(AudioDecodeError):
+            DecoderPool(0).take(["safesound-no-such-decoder"])
+
+class TestStreamDecoders:
+    def test_pcm_samples_split_across_messages(self):
+        """Test int16 samples split between messages are reassembled"""
+        decoder = PCMStreamDecoder("pcm_s16le", 16000)
+        data = np.array([16384, -16384, 8192], dtype="<i2").tobytes()
+        
+        decoder.feed(data[:3])
+        decoder.feed(data[3:])
+        
+        np.testing.assert_allclose(decoder.read(), [0.5, -0.5, 0.25])
+        assert len(decoder.read()) == 0
+    
+    def test_pcm_float32(self):
+        """Test float32 PCM is passed through unscaled"""
+        decoder = PCMStreamDecoder("pcm_f32le", 16000)
+        decoder.feed(np.array([0.1, -0.2], dtype="<f4").tobytes())
+        
+        np.testing.assert_allclose(decoder.read(), [0.1, -0.2], rtol=1e-6)
+    
+    def test_resampling_is_continuous_across_chunks(self):
+        """Test 48 kHz PCM fed in chunks comes out as the same 16 kHz tone"""
+        tone = np.sin(2 * np.pi * 440 * np.arange(48000) / 48000).astype(np.float32)
+        decoder = PCMStreamDecoder("pcm_f32le", 48000)
+        
+        for chunk in np.array_split(tone, 7):
+            decoder.feed(chunk.astype("<f4").tobytes())
+        output = np.concatenate([decoder.read(), decoder.close()])
+        
+        expected = np.sin(2 * np.pi * 440 * np.arange(16000) / 16000)
+        assert len(output) == 16000
+        np.testing.assert_allclose(output[100:-100], expected[100:-100], atol=1e-4)
+    
+    def test_open_stream_decoder(self):
+        """Test stream formats are negotiated by name"""
+        assert isinstance(open_stream_decoder("pcm_s16le", 8000), PCMStreamDecoder)
+        with pytest.raises(AudioDecodeError):
+            open_stream_decoder("mp3")
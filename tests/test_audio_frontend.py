@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from src.services.audio_frontend import (
+    PolyphaseResampler,
+    downmix,
+    log_mel_spectrogram,
+    resample,
+)
+
+def tone(frequency, sample_rate, seconds=1.0):
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    return np.sin(2 * np.pi * frequency * t).astype(np.float32)
+
+class TestResampling:
+    @pytest.mark.parametrize("input_rate", [8000, 22050, 44100, 48000])
+    def test_tone_is_preserved(self, input_rate):
+        """Test a tone in the passband keeps its frequency and level"""
+        output = resample(tone(440, input_rate), input_rate, 16000)
+        
+        assert len(output) == 16000
+        np.testing.assert_allclose(output[100:-100], tone(440, 16000)[100:-100], atol=1e-4)
+    
+    def test_aliasing_is_filtered(self):
+        """Test content above the new Nyquist rate is removed, not folded"""
+        output = resample(tone(9000, 48000), 48000, 16000)
+        
+        assert np.sqrt(np.mean(output[100:-100] ** 2)) < 1e-3
+    
+    def test_chunked_stream_matches_whole_signal(self):
+        """Test chunk boundaries do not change the output"""
+        signal = np.random.default_rng(0).standard_normal(44100).astype(np.float32)
+        resampler = PolyphaseResampler(44100, 16000)
+        
+        chunks = [resampler.process(c) for c in np.array_split(signal, 13)]
+        streamed = np.concatenate(chunks + [resampler.flush()])
+        
+        np.testing.assert_array_equal(streamed, resample(signal, 44100, 16000))
+    
+    def test_rates_must_be_positive(self):
+        """Test a zero or negative rate is refused up front"""
+        for rates in ((0, 16000), (-44100, 16000), (44100, 0)):
+            with pytest.raises(ValueError):
+                PolyphaseResampler(*rates)
+    
+    def test_downmix(self):
+        """Test interleaved channels are averaged to mono"""
+        stereo = np.array([[1.0, 0.0], [0.5, 0.5]], dtype=np.float32)
+        
+        np.testing.assert_array_equal(downmix(stereo), [0.5, 0.5])
+
+class TestLogMel:
+    def test_matches_whisper_per_clip(self):
+        """Test batched features equal whisper's one clip at a time"""
+        import whisper
+        rng = np.random.default_rng(1)
+        clips = [
+            0.1 * rng.standard_normal(5 * 16000).astype(np.float32),
+            0.3 * rng.standard_normal(40 * 16000).astype(np.float32),
+        ]
+        
+        mel = log_mel_spectrogram(clips, 80)
+        
+        assert tuple(mel.shape) == (2, 80, 3000)
+        for features, clip in zip(mel, clips):
+            expected = whisper.log_mel_spectrogram(whisper.pad_or_trim(clip), 80)
+            assert (features - expected).abs().max().item() < 1e-5
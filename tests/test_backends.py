@@ -0,0 +1,136 @@
+import sys
+import types
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+from src.services.backends import get_backend
+from src.services.backends.openai_backend import OpenAIWhisperBackend
+from src.services.backends.faster_whisper_backend import FasterWhisperBackend
+from src.services.backends.stub_backend import StubBackend
+
+class TestBackends:
+    def test_get_backend(self):
+        """Test backends are selected by name"""
+        assert isinstance(get_backend("openai-whisper", "cpu"), OpenAIWhisperBackend)
+        assert isinstance(get_backend("faster-whisper", "cpu", "int8"), FasterWhisperBackend)
+    
+    def test_get_backend_unknown(self):
+        """Test unknown backends are rejected"""
+        with pytest.raises(ValueError):
+            get_backend("nonexistent", "cpu")
+    
+    def test_unsupported_compute_type(self):
+        """Test compute types are validated per backend"""
+        with pytest.raises(ValueError):
+            OpenAIWhisperBackend("cpu", "int8")
+    
+    def test_openai_backend_fp16_follows_device(self):
+        """Test fp16 is only used on CUDA by default"""
+        model = Mock()
+        model.transcribe.return_value = {"text": "hi"}
+        samples = np.zeros(16000, dtype=np.float32)
+        
+        OpenAIWhisperBackend("cpu").transcribe(model, samples, task="transcribe")
+        
+        model.transcribe.assert_called_once_with(samples, fp16=False, task="transcribe")
+        assert OpenAIWhisperBackend("cuda").fp16 is True
+    
+    def test_openai_int8_variant_is_quantized_and_cached(self, tmp_path):
+        """Test int8 variants quantize linear layers once and reload from disk"""
+        import torch
+        import whisper
+        from whisper.model import ModelDimensions
+        dims = ModelDimensions(
+            n_mels=80, n_audio_ctx=1500, n_audio_state=64, n_audio_head=2, n_audio_layer=1,
+            n_vocab=51865, n_text_ctx=448, n_text_state=64, n_text_head=2, n_text_layer=1,
+        )
+        
+        def random_model(*args, **kwargs):
+            # The decoder's positional embedding is allocated uninitialized
+            torch.manual_seed(0)
+            model = whisper.Whisper(dims).eval()
+            torch.nn.init.normal_(model.decoder.positional_embedding, std=0.02)
+            return model
+        
+        backend = OpenAIWhisperBackend("cpu")
+        full = random_model()
+        full_size = backend.model_size("small", full)
+        
+        with patch("src.services.backends.openai_backend.whisper.load_model",
+                   side_effect=random_model) as mock_load, \
+             patch("src.services.backends.openai_backend.settings") as mock_settings:
+            mock_settings.QUANTIZED_MODEL_DIR = str(tmp_path)
+            converted = backend.load_model("small-int8")
+            cached = backend.load_model("small-int8")
+        
+        mock_load.assert_called_once_with("small", device="cpu")
+        assert len(list(tmp_path.glob("small-int8-*.pt"))) == 1
+        assert isinstance(
+            cached.decoder.blocks[0].mlp[0], torch.ao.nn.quantized.dynamic.Linear
+        )
+        assert backend.model_size("small-int8", converted) < full_size
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(np.zeros(16000, dtype=np.float32)))
+        options = whisper.DecodingOptions(language="en", fp16=False, sample_len=3)
+        assert whisper.decode(converted, mel, options).tokens == whisper.decode(cached, mel, options).tokens
+    
+    def test_int8_variant_on_gpu_rejected(self):
+        """Test int8 variants are refused on CUDA"""
+        with pytest.raises(ValueError):
+            OpenAIWhisperBackend("cuda").load_model("turbo-int8")
+    
+    def test_int8_variant_expected_size(self):
+        """Test int8 variants are budgeted at one byte per parameter"""
+        backend = OpenAIWhisperBackend("cpu")
+        assert backend.expected_size("small-int8") * 4 == backend.expected_size("small")
+    
+    def test_faster_whisper_load_model(self):
+        """Test CTranslate2 models load with the configured compute type"""
+        fake_module = types.ModuleType("faster_whisper")
+        fake_module.WhisperModel = Mock()
+        backend = FasterWhisperBackend("cpu", "int8", num_workers=2)
+        
+        with patch.dict(sys.modules, {"faster_whisper": fake_module}), patch(
+            "src.services.backends.faster_whisper_backend.inference_plan",
+            return_value=(3, 4),
+        ):
+            backend.load_model("turbo")
+        
+        # Threads per model worker come from the CPU slot plan
+        fake_module.WhisperModel.assert_called_once_with(
+            "large-v3-turbo", device="cpu", compute_type="int8",
+            cpu_threads=4, num_workers=2,
+        )
+    
+    def test_faster_whisper_result_layout(self):
+        """Test faster-whisper output is normalized to openai-whisper's layout"""
+        segment = types.SimpleNamespace(
+            id=1, seek=0, start=0.0, end=1.5, text=" Olá mundo",
+            tokens=[1, 2], temperature=0.0, avg_logprob=-0.2,
+            compression_ratio=1.1, no_speech_prob=0.01, words=None,
+        )
+        model = Mock()
+        model.transcribe.return_value = (
+            iter([segment]), types.SimpleNamespace(language="pt")
+        )
+        
+        result = FasterWhisperBackend("cpu", "int8").transcribe(
+            model, np.zeros(16000, dtype=np.float32), task="transcribe"
+        )
+        
+        assert result["text"] == " Olá mundo"
+        assert result["language"] == "pt"
+        assert result["segments"][0]["end"] == 1.5
+        assert result["segments"][0]["avg_logprob"] == -0.2
+    
+    def test_stub_backend(self):
+        """Test the stub backend returns openai-whisper's layout without a model"""
+        backend = get_backend("stub", "cpu")
+        samples = np.zeros(12 * 16000, dtype=np.float32)
+        
+        result = backend.transcribe(backend.load_model("small"), samples, language="pt")
+        batch = backend.transcribe_batch(None, [samples[:16000], samples], language="pt")
+        
+        assert isinstance(backend, StubBackend)
+        assert [s["end"] for s in result["segments"]] == [5.0, 10.0, 12.0]
+        assert result["language"] == "pt"
+        assert batch[1] == result
@@ -0,0 +1,69 @@
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from src.services.batching import BatchScheduler
+
+class TestBatchScheduler:
+    def test_single_request_runs_after_max_wait(self):
+        """Test a lone request is not held back beyond max_wait"""
+        scheduler = BatchScheduler(
+            lambda key, items: [item * 2 for item in items],
+            max_batch_size=4,
+            max_wait=0.01,
+        )
+        
+        assert scheduler.submit("small", 21) == 42
+        assert scheduler.stats()["batches"] == 1
+    
+    def test_concurrent_requests_share_a_batch(self):
+        """Test concurrent requests with one key are run together"""
+        calls = []
+        
+        def run_batch(key, items):
+            calls.append(list(items))
+            return [item * 2 for item in items]
+        
+        scheduler = BatchScheduler(run_batch, max_batch_size=4, max_wait=5.0)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda x: scheduler.submit("small", x), range(4)))
+        
+        assert results == [0, 2, 4, 6]
+        assert len(calls) == 1
+        assert sorted(calls[0]) == [0, 1, 2, 3]
+        assert scheduler.stats()["largest_batch"] == 4
+    
+    def test_keys_are_batched_separately(self):
+        """Test requests for different keys never share a batch"""
+        keys = []
+        
+        def run_batch(key, items):
+            keys.append((key, len(items)))
+            return items
+        
+        scheduler = BatchScheduler(run_batch, max_batch_size=2, max_wait=5.0)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(
+                lambda args: scheduler.submit(*args),
+                [("small", 1), ("medium", 2), ("small", 3), ("medium", 4)],
+            ))
+        
+        assert sorted(keys) == [("medium", 2), ("small", 2)]
+    
+    def test_errors_reach_every_caller(self):
+        """Test a failing batch raises in all of its callers"""
+        def run_batch(key, items):
+            raise RuntimeError("boom")
+        
+        scheduler = BatchScheduler(run_batch, max_batch_size=2, max_wait=5.0)
+        errors = []
+        
+        def submit(x):
+            try:
+                scheduler.submit("small", x)
+            except RuntimeError as e:
+                errors.append(e)
+        
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(submit, range(2)))
+        
+        assert len(errors) == 2
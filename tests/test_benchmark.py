@@ -0,0 +1,72 @@
+import io
+import wave
+import numpy as np
+import pytest
+from benchmark import (
+    measure_accuracy, percentiles, run_scenario, synthetic_clip, to_wav, word_errors,
+)
+
+class TestBenchmark:
+    def test_synthetic_clip(self):
+        """Test synthetic clips have the requested length and pauses"""
+        samples = synthetic_clip(10)
+        
+        assert len(samples) == 160000
+        assert samples.dtype == np.float32
+        assert (np.abs(samples) < 1e-6).mean() > 0.1
+    
+    def test_to_wav(self):
+        """Test clips are encoded as 16 kHz mono WAV"""
+        with wave.open(io.BytesIO(to_wav(synthetic_clip(1)))) as f:
+            assert f.getframerate() == 16000
+            assert f.getnchannels() == 1
+            assert f.getnframes() == 16000
+    
+    def test_percentiles(self):
+        """Test latency percentiles"""
+        result = percentiles(list(range(1, 101)))
+        
+        assert result["p50"] == pytest.approx(50.5)
+        assert result["p99"] == pytest.approx(99.01)
+        assert result["max"] == 100
+        assert percentiles([]) is None
+    
+    def test_run_scenario(self):
+        """Test latency, real-time factor and throughput are reported"""
+        clip = {"name": "clip", "seconds": 2.0}
+        
+        result = run_scenario(lambda clip: None, [clip], concurrency=2, requests=4)
+        
+        assert result["requests"] == 4
+        assert result["errors"] == 0
+        assert result["latency"]["p50"] >= 0
+        assert result["throughput"] > 0
+    
+    def test_word_errors(self):
+        """Test word errors ignore case and punctuation"""
+        assert word_errors("Hello, world!", "hello world") == (0, 2)
+        assert word_errors("the cat sat", "the bat sat down") == (2, 3)
+        assert word_errors("one two", "") == (2, 2)
+    
+    def test_measure_accuracy(self):
+        """Test WER is measured against transcripts or a reference model"""
+        from unittest.mock import Mock
+        from src.schemas.transcribe_schemas import WhisperModel
+        service = Mock()
+        service.transcribe.side_effect = lambda samples, model, action: {
+            "text": "a b c" if model == WhisperModel.SMALL else "a b x"
+        }
+        clips = [
+            {"name": "labelled", "samples": None, "reference": "a b x y"},
+            {"name": "unlabelled", "samples": None, "reference": None},
+        ]
+        
+        labelled_only = measure_accuracy(service, clips, WhisperModel.SMALL_INT8, "transcribe")
+        with_model = measure_accuracy(
+            service, clips, WhisperModel.SMALL_INT8, "transcribe", WhisperModel.SMALL
+        )
+        
+        assert labelled_only["wer"] == pytest.approx(1 / 4)
+        assert labelled_only["clips"] == ["labelled"]
+        assert with_model["wer"] == pytest.approx(2 / 7)
+        assert with_model["reference"] == "small"
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from src.services.chunking import cut_points, split_long_regions, stitch_results
+
+SR = 16000
+
+def segment(start, end, text):
+    return {"start": start, "end": end, "text": text}
+
+class TestSplitLongRegions:
+    def test_short_regions_untouched(self):
+        """Test regions that fit the window are kept as they are"""
+        regions = [(0, 10 * SR), (12 * SR, 20 * SR)]
+        levels = np.zeros(20 * SR // 480)
+        
+        assert split_long_regions(regions, levels, 480, 30 * SR, 2 * SR, 5 * SR) == regions
+    
+    def test_cuts_at_quietest_frame_with_overlap(self):
+        """Test long speech is cut at its softest point with an overlap"""
+        frame = 480
+        levels = np.full(70 * SR // frame, -10.0)
+        quiet_frame = 27 * SR // frame
+        levels[quiet_frame] = -30.0
+        
+        pieces = split_long_regions(
+            [(0, 70 * SR)], levels, frame, 30 * SR, 2 * SR, 5 * SR
+        )
+        
+        assert pieces[0] == (0, quiet_frame * frame + SR)
+        assert pieces[1][0] == quiet_frame * frame - SR
+        assert pieces[-1][1] == 70 * SR
+        assert all(end - start <= 30 * SR for start, end in pieces)
+        # Neighbours share exactly the overlap
+        for previous, following in zip(pieces, pieces[1:]):
+            assert previous[1] - following[0] == 2 * SR
+
+class TestStitchResults:
+    def test_overlap_kept_once(self):
+        """Test text in an overlap is taken from exactly one window"""
+        batches = [[(0, 30 * SR)], [(28 * SR, 50 * SR)]]
+        results = [
+            {"text": "", "segments": [
+                segment(0.0, 27.0, " one"),
+                segment(27.5, 29.5, " two"),
+            ]},
+            {"text": "", "segments": [
+                segment(0.0, 1.5, " two"),
+                segment(1.5, 22.0, " three"),
+            ]},
+        ]
+        
+        merged = stitch_results(batches, results, SR)
+        
+        assert cut_points(batches) == [29 * SR]
+        assert merged["text"] == "one two three"
+        assert [s["id"] for s in merged["segments"]] == [0, 1, 2]
+        # Timestamps are absolute
+        assert merged["segments"][2]["start"] == pytest.approx(29.5)
+    
+    def test_text_only_results(self):
+        """Test results without segments fall back to their text"""
+        batches = [[(0, SR)], [(5 * SR, 6 * SR)]]
+        results = [{"text": " a"}, {"text": " b"}]
+        
+        assert stitch_results(batches, results, SR)["text"] == "a b"
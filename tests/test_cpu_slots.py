@@ -0,0 +1,67 @@
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+from src.services.cpu_slots import InferenceSlots, inference_plan, split_cores
+
+class TestInferencePlan:
+    @patch('src.services.cpu_slots.settings')
+    def test_derived_from_cores(self, mock_settings):
+        """Test slots and threads default to a share of the cores"""
+        mock_settings.INFERENCE_SLOTS = 0
+        mock_settings.INFERENCE_THREADS = 0
+        
+        assert inference_plan(16) == (4, 4)
+        assert inference_plan(6) == (1, 6)
+        assert inference_plan(1) == (1, 1)
+        
+        mock_settings.INFERENCE_SLOTS = 3
+        assert inference_plan(12) == (3, 4)
+        mock_settings.INFERENCE_THREADS = 2
+        assert inference_plan(12) == (3, 2)
+    
+    def test_split_cores(self):
+        """Test cores are divided into contiguous groups"""
+        assert split_cores([0, 1, 2, 3, 4, 5, 6], 3) == [[0, 1], [2, 3], [4, 5, 6]]
+
+class TestInferenceSlots:
+    def test_bounds_concurrent_calls(self):
+        """Test no more calls run at once than there are slots"""
+        slots = InferenceSlots(2, 1, set_threads=Mock())
+        running = []
+        peak = []
+        lock = threading.Lock()
+        
+        def call():
+            with slots.acquire():
+                with lock:
+                    running.append(1)
+                    peak.append(len(running))
+                time.sleep(0.02)
+                with lock:
+                    running.pop()
+        
+        threads = [threading.Thread(target=call) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert max(peak) == 2
+        assert slots.stats()["calls"] == 6
+        assert slots.stats()["in_use"] == 0
+    
+    @patch('src.services.cpu_slots.os.sched_setaffinity', create=True)
+    def test_threads_configured_and_pinned(self, mock_setaffinity):
+        """Test a thread is configured once and pinned to its slot's cores"""
+        set_threads = Mock()
+        slots = InferenceSlots(2, 4, set_threads, core_sets=[[0, 1], [2, 3]])
+        
+        with slots.acquire() as slot:
+            pass
+        with slots.acquire() as again:
+            pass
+        
+        assert again == slot
+        set_threads.assert_called_once_with(4)
+        mock_setaffinity.assert_called_once_with(0, [0, 1])
@@ -0,0 +1,30 @@
+from src.services.formatters import format_timestamp, to_srt, to_vtt
+
+SEGMENTS = [
+    {"start": 0.0, "end": 2.5, "text": " Hello there."},
+    {"start": 3661.25, "end": 3663.0, "text": " Goodbye."},
+]
+
+class TestFormatters:
+    def test_format_timestamp(self):
+        """Test timestamps are zero padded with milliseconds"""
+        assert format_timestamp(0) == "00:00:00.000"
+        assert format_timestamp(3661.25, ",") == "01:01:01,250"
+    
+    def test_srt(self):
+        """Test SubRip numbering and comma decimal markers"""
+        assert to_srt(SEGMENTS) == (
+            "1\n00:00:00,000 --> 00:00:02,500\nHello there.\n"
+            "\n"
+            "2\n01:01:01,250 --> 01:01:03,000\nGoodbye.\n"
+        )
+    
+    def test_vtt(self):
+        """Test WebVTT header and dot decimal markers"""
+        assert to_vtt(SEGMENTS) == (
+            "WEBVTT\n"
+            "\n"
+            "00:00:00.000 --> 00:00:02.500\nHello there.\n"
+            "\n"
+            "01:01:01.250 --> 01:01:03.000\nGoodbye.\n"
+        )
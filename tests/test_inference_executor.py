@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+import pytest
+from src.services.inference_executor import (
+    InferenceExecutor,
+    QueueFullError,
+    InferenceTimeoutError,
+)
+
+class TestInferenceExecutor:
+    def test_submit_returns_result(self):
+        """Test jobs run on a worker and return their result"""
+        executor = InferenceExecutor(max_workers=1, max_queue_size=1)
+        try:
+            result = asyncio.run(executor.submit(lambda x: x * 2, 21))
+            assert result == 42
+            stats = executor.stats()
+            assert stats["completed"] == 1
+            assert stats["queue_depth"] == 0
+        finally:
+            executor.shutdown()
+
+    def test_queue_full_rejects(self):
+        """Test submissions beyond workers + queue are rejected"""
+        executor = InferenceExecutor(
+            max_workers=1, max_queue_size=1, retry_after=7
+        )
+        release = threading.Event()
+        try:
+            executor.submit_sync(release.wait)
+            executor.submit_sync(release.wait)
+            with pytest.raises(QueueFullError) as exc_info:
+                executor.submit_sync(release.wait)
+            assert exc_info.value.retry_after == 7
+            assert executor.stats()["rejected"] == 1
+        finally:
+            release.set()
+            executor.shutdown()
+
+    def test_timeout(self):
+        """Test per-request timeout is enforced"""
+        executor = InferenceExecutor(max_workers=1, max_queue_size=1)
+        try:
+            with pytest.raises(InferenceTimeoutError):
+                asyncio.run(
+                    executor.submit(time.sleep, 0.5, timeout=0.05)
+                )
+            assert executor.stats()["timed_out"] == 1
+        finally:
+            executor.shutdown()
+
+    def test_cancelled_job_frees_slot(self):
+        """Test a queued job that times out releases its queue slot"""
+        executor = InferenceExecutor(max_workers=1, max_queue_size=1)
+        release = threading.Event()
+        try:
+            executor.submit_sync(release.wait)
+            with pytest.raises(InferenceTimeoutError):
+                asyncio.run(executor.submit(lambda: None, timeout=0.05))
+            assert executor.stats()["queue_depth"] == 0
+            # The freed slot can be used again
+            executor.submit_sync(lambda: None)
+        finally:
+            release.set()
+            executor.shutdown()
@@ -0,0 +1,115 @@
+import io
+import time
+import pytest
+from unittest.mock import Mock
+from src.services.inference_executor import InferenceExecutor
+from src.services.job_manager import JobManager
+from src.services.job_store import JobStore, COMPLETED, FAILED, QUEUED, RUNNING
+from src.schemas.transcribe_schemas import WhisperModel, TranscriptionAction
+
+def make_service(transcribe=None):
+    service = Mock()
+    service.executor = InferenceExecutor(max_workers=1, max_queue_size=1)
+    service.transcribe.side_effect = transcribe or (
+        lambda path, model, action, language, ext, progress=None, **kwargs: (
+            progress(1, 2),
+            progress(2, 2),
+            {
+                "text": "hello",
+                "language": "en",
+                "segments": [],
+                "processing_time": 0.1,
+                "cache_hit": False,
+            },
+        )[-1]
+    )
+    return service
+
+def wait_for(manager, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job["status"] in (COMPLETED, FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+class TestJobManager:
+    def test_job_runs_to_completion(self, tmp_path):
+        """Test a submitted job is transcribed and its result stored"""
+        service = make_service()
+        manager = JobManager(service, str(tmp_path), poll_interval=0.01)
+        
+        job_id = manager.submit(
+            io.BytesIO(b"audio"), ".wav", WhisperModel.SMALL, TranscriptionAction.TRANSCRIBE
+        )
+        job = wait_for(manager, job_id)
+        manager.stop()
+        
+        assert job["status"] == COMPLETED
+        assert job["progress"] == 100
+        assert job["result"]["text"] == "hello"
+        # The stored upload is removed once the job is done
+        assert not (tmp_path / "audio").joinpath(
+            service.transcribe.call_args[0][0].split("/")[-1]
+        ).exists()
+    
+    def test_failed_job(self, tmp_path):
+        """Test errors are recorded on the job"""
+        def fail(*args, **kwargs):
+            raise RuntimeError("bad audio")
+        manager = JobManager(make_service(fail), str(tmp_path), poll_interval=0.01)
+        
+        job_id = manager.submit(
+            io.BytesIO(b"audio"), ".wav", WhisperModel.SMALL, TranscriptionAction.TRANSCRIBE
+        )
+        job = wait_for(manager, job_id)
+        manager.stop()
+        
+        assert job["status"] == FAILED
+        assert job["message"] == "bad audio"
+    
+    def test_interrupted_jobs_resume(self, tmp_path):
+        """Test jobs running when the process stopped are run again"""
+        (tmp_path / "audio").mkdir()
+        store = JobStore(str(tmp_path / "jobs.db"))
+        params = {"model": "small", "action": "transcribe", "language": None, "file_extension": ".wav"}
+        running = store.create(params, str(tmp_path / "audio" / "a.wav"))
+        queued = store.create(params, str(tmp_path / "audio" / "b.wav"))
+        store.claim()
+        assert store.get(running)["status"] == RUNNING
+        assert store.get(queued)["status"] == QUEUED
+        store.close()
+        
+        manager = JobManager(make_service(), str(tmp_path), poll_interval=0.01)
+        manager.start()
+        
+        assert wait_for(manager, running)["status"] == COMPLETED
+        assert wait_for(manager, queued)["status"] == COMPLETED
+        manager.stop()
+
+    def test_recovery_runs_once(self, tmp_path):
+        """Test a forked worker does not requeue jobs a sibling is running"""
+        manager = JobManager(make_service(), str(tmp_path), poll_interval=0.01)
+        manager.recover()
+        manager.close()
+        # What a sibling worker would see: a job it did not claim is running
+        job_id = manager.store.create({}, str(tmp_path / "audio" / "a.wav"))
+        manager.store.claim()
+        
+        manager.recover()
+        
+        assert manager.get(job_id)["status"] == RUNNING
+        manager.close()
+
+class TestJobStore:
+    def test_claims_in_submission_order(self, tmp_path):
+        """Test the oldest queued job is claimed first"""
+        store = JobStore(str(tmp_path / "jobs.db"))
+        first = store.create({}, "a")
+        second = store.create({}, "b")
+        
+        assert store.claim()["id"] == first
+        assert store.claim()["id"] == second
+        assert store.claim() is None
+        assert store.counts() == {RUNNING: 2}
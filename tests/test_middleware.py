@@ -0,0 +1,51 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from src.core.middleware import MaxBodySizeMiddleware, MULTIPART_OVERHEAD
+
+LIMIT = 1024
+
+app = FastAPI()
+app.add_middleware(MaxBodySizeMiddleware, max_size=LIMIT, paths=["/upload"])
+
+@app.post("/upload")
+async def upload(request: Request):
+    body = await request.body()
+    return {"size": len(body)}
+
+@app.post("/other")
+async def other(request: Request):
+    body = await request.body()
+    return {"size": len(body)}
+
+client = TestClient(app)
+
+class TestMaxBodySizeMiddleware:
+    def test_body_within_limit(self):
+        """Test bodies under the limit pass through"""
+        response = client.post("/upload", content=b"x" * LIMIT)
+        assert response.status_code == 200
+        assert response.json()["size"] == LIMIT
+    
+    def test_declared_length_rejected(self):
+        """Test an oversized Content-Length is rejected up front"""
+        response = client.post(
+            "/upload", content=b"x" * (LIMIT + MULTIPART_OVERHEAD + 1)
+        )
+        assert response.status_code == 413
+    
+    def test_streamed_body_rejected(self):
+        """Test bodies without Content-Length are cut off at the limit"""
+        def body():
+            for _ in range(100):
+                yield b"x" * 1024
+        
+        response = client.post("/upload", content=body())
+        assert response.status_code == 413
+    
+    def test_other_paths_unlimited(self):
+        """Test paths outside the limit list are not affected"""
+        response = client.post(
+            "/other", content=b"x" * (LIMIT + MULTIPART_OVERHEAD + 1)
+        )
+        assert response.status_code == 200
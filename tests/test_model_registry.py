@@ -0,0 +1,84 @@
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from src.services.model_registry import ModelRegistry
+
+class TestModelRegistry:
+    def test_caches_loaded_models(self):
+        """Test models load once and are reused"""
+        loader = Mock(side_effect=lambda name: f"model-{name}")
+        registry = ModelRegistry(loader)
+        
+        assert registry.get("small") == "model-small"
+        assert registry.get("small") == "model-small"
+        
+        loader.assert_called_once_with("small")
+        stats = registry.stats()
+        assert stats["loads"] == 1
+        assert stats["hits"] == 1
+    
+    def test_concurrent_loads_share_one_load(self):
+        """Test concurrent requests wait on a single load"""
+        calls = []
+        
+        def loader(name):
+            calls.append(name)
+            time.sleep(0.1)
+            return object()
+        
+        registry = ModelRegistry(loader)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(registry.get("medium")))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert calls == ["medium"]
+        assert len(set(map(id, results))) == 1
+    
+    def test_evicts_least_recently_used(self):
+        """Test the LRU model is evicted when the budget is exceeded"""
+        registry = ModelRegistry(
+            lambda name: name,
+            memory_budget=250,
+            model_size=lambda name, model: 100,
+        )
+        registry.get("small")
+        registry.get("medium")
+        registry.get("small")  # medium is now least recently used
+        registry.get("turbo")
+        
+        assert "small" in registry
+        assert "turbo" in registry
+        assert "medium" not in registry
+        assert registry.stats()["evictions"] == 1
+        assert registry.memory_used == 200
+    
+    def test_evicts_before_loading(self):
+        """Test room is made using the expected size before a load"""
+        loaded_during_load = []
+        registry = ModelRegistry(
+            lambda name: loaded_during_load.append(len(registry)) or name,
+            memory_budget=150,
+            expected_size=lambda name: 100,
+            model_size=lambda name, model: 100,
+        )
+        registry.get("small")
+        registry.get("medium")
+        
+        assert loaded_during_load == [0, 0]
+    
+    def test_failed_load_is_retried(self):
+        """Test a failed load is reported and retried on the next request"""
+        loader = Mock(side_effect=[RuntimeError("boom"), "model"])
+        registry = ModelRegistry(loader)
+        
+        with pytest.raises(RuntimeError):
+            registry.get("small")
+        assert registry.get("small") == "model"
+        assert registry.stats()["load_failures"] == 1
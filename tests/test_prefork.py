@@ -0,0 +1,49 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import httpx
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class TestPreforkServer:
+    def test_workers_serve_and_stop(self, tmp_path):
+        """Test forked workers share preloaded models and exit on SIGTERM"""
+        port = free_port()
+        env = dict(
+            os.environ,
+            INFERENCE_BACKEND="stub",
+            PRELOAD_MODELS='["small"]',
+            UPLOAD_DIR=str(tmp_path),
+        )
+        server = subprocess.Popen(
+            [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port), "--workers", "2"],
+            env=env,
+        )
+        try:
+            deadline = time.time() + 30
+            while True:
+                try:
+                    response = httpx.get(f"http://127.0.0.1:{port}/api/health/ready")
+                    if response.status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                assert time.time() < deadline, "workers did not become ready"
+                time.sleep(0.1)
+            
+            stats = httpx.get(f"http://127.0.0.1:{port}/api/stats").json()
+            metrics = httpx.get(f"http://127.0.0.1:{port}/metrics").text
+        finally:
+            server.send_signal(signal.SIGTERM)
+            code = server.wait(timeout=30)
+        
+        # Workers start with the model the parent preloaded
+        assert "small" in stats["models"]["loaded"]
+        assert 'safesound_http_request_seconds_count{endpoint="readiness_check"' in metrics
+        assert code == 0
@@ -0,0 +1,68 @@
+import io
+import os
+import time
+import numpy as np
+import pytest
+from src.services.result_cache import TranscriptionCache, content_digest
+
+class TestContentDigest:
+    def test_same_content_same_digest(self):
+        """Test bytes, file objects and paths hash by content"""
+        data = b"fake audio" * 1000
+        stream = io.BytesIO(data)
+        
+        assert content_digest(data) == content_digest(stream)
+        # The stream is rewound for decoding
+        assert stream.tell() == 0
+        assert content_digest(data) != content_digest(data + b"x")
+    
+    def test_pcm_digest(self):
+        """Test decoded PCM hashes by sample values"""
+        samples = np.ones(100, dtype=np.float32)
+        assert content_digest(samples) == content_digest(samples.copy())
+
+class TestTranscriptionCache:
+    def test_memory_lru(self):
+        """Test the in-process tier evicts least recently used entries"""
+        cache = TranscriptionCache(max_entries=2, ttl=60)
+        cache.put("a", {"text": "a"})
+        cache.put("b", {"text": "b"})
+        cache.get("a")
+        cache.put("c", {"text": "c"})
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == {"text": "a"}
+        stats = cache.stats()
+        assert stats["memory_hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["evictions"] == 1
+    
+    def test_ttl(self):
+        """Test expired entries are not returned"""
+        cache = TranscriptionCache(max_entries=2, ttl=0.01)
+        cache.put("a", {"text": "a"})
+        time.sleep(0.02)
+        
+        assert cache.get("a") is None
+    
+    def test_disk_tier(self, tmp_path):
+        """Test entries survive in the disk tier across instances"""
+        cache = TranscriptionCache(max_entries=1, ttl=60, disk_dir=str(tmp_path))
+        cache.put("a", {"text": "a"})
+        
+        restarted = TranscriptionCache(max_entries=1, ttl=60, disk_dir=str(tmp_path))
+        
+        assert restarted.get("a") == {"text": "a"}
+        assert restarted.stats()["disk_hits"] == 1
+    
+    def test_disk_size_limit(self, tmp_path):
+        """Test the disk tier drops the oldest files past its size limit"""
+        cache = TranscriptionCache(
+            max_entries=10, ttl=60, disk_dir=str(tmp_path), disk_max_bytes=60
+        )
+        cache.put("a", {"text": "a" * 20})
+        os.utime(tmp_path / "a.json", (0, time.time() - 10))
+        cache.put("b", {"text": "b" * 20})
+        
+        assert not (tmp_path / "a.json").exists()
+        assert (tmp_path / "b.json").exists()
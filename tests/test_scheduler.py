@@ -0,0 +1,144 @@
+import threading
+import time
+import pytest
+from src.services.scheduler import (
+    LATENCY,
+    THROUGHPUT,
+    FairScheduler,
+    WorkTicket,
+    most_urgent,
+)
+from src.services.inference_executor import InferenceExecutor, QueueFullError
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+def queue_calls(scheduler, tickets, order):
+    """Start one thread per ticket, in order, each waiting for a turn"""
+    threads = []
+    for name, ticket in tickets:
+        def call(name=name, ticket=ticket):
+            with scheduler.turn(ticket):
+                order.append(name)
+
+        waiting = sum(
+            scheduler.stats()[key] for key in ("waiting_live", "waiting_batch")
+        )
+        thread = threading.Thread(target=call)
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: sum(
+            scheduler.stats()[key] for key in ("waiting_live", "waiting_batch")
+        ) == waiting + 1)
+    return threads
+
+class TestWorkTicket:
+    def test_unknown_priority(self):
+        """Test tickets only take the known priority classes"""
+        with pytest.raises(ValueError):
+            WorkTicket("urgent")
+
+    def test_most_urgent(self):
+        """Test a batch is scheduled by its earliest live deadline"""
+        upload = WorkTicket(THROUGHPUT, "a")
+        soon = WorkTicket(LATENCY, "b", deadline=1.0)
+        later = WorkTicket(LATENCY, "c", deadline=2.0)
+
+        assert most_urgent([upload, later, soon]) is soon
+        assert most_urgent([None, upload]) is upload
+        assert most_urgent([None]).priority == THROUGHPUT
+
+class TestFairScheduler:
+    def test_live_calls_go_first_by_deadline(self):
+        """Test live calls overtake queued upload windows, earliest deadline first"""
+        scheduler = FairScheduler(1)
+        order = []
+
+        with scheduler.turn():
+            threads = queue_calls(scheduler, [
+                ("upload", WorkTicket(THROUGHPUT, "a")),
+                ("live-late", WorkTicket(LATENCY, "b", deadline=time.monotonic() + 60)),
+                ("live-soon", WorkTicket(LATENCY, "c", deadline=time.monotonic() + 30)),
+            ], order)
+        for thread in threads:
+            thread.join()
+
+        assert order == ["live-soon", "live-late", "upload"]
+        assert scheduler.stats()["turns"] == {LATENCY: 2, THROUGHPUT: 2}
+
+    def test_uploads_take_turns_per_client(self):
+        """Test one client's queued windows do not starve another client"""
+        scheduler = FairScheduler(1)
+        order = []
+
+        with scheduler.turn():
+            threads = queue_calls(scheduler, [
+                ("a1", WorkTicket(client="a")),
+                ("a2", WorkTicket(client="a")),
+                ("a3", WorkTicket(client="a")),
+                ("b1", WorkTicket(client="b")),
+                ("c1", WorkTicket(client="c")),
+                ("b2", WorkTicket(client="b")),
+            ], order)
+        for thread in threads:
+            thread.join()
+
+        assert order == ["a1", "b1", "c1", "a2", "b2", "a3"]
+
+    def test_capacity(self):
+        """Test turns are granted immediately up to the capacity"""
+        scheduler = FairScheduler(2)
+
+        with scheduler.turn(), scheduler.turn():
+            assert scheduler.stats()["active"] == 2
+
+        assert scheduler.stats()["active"] == 0
+        assert scheduler.stats()["waits"][THROUGHPUT] == 0
+
+class TestLiveWorkers:
+    def test_live_jobs_skip_busy_upload_workers(self):
+        """Test latency-class jobs run while every upload worker is busy"""
+        executor = InferenceExecutor(max_workers=1, max_queue_size=4, live_workers=1)
+        release = threading.Event()
+
+        upload = executor.submit_sync(release.wait)
+        live = executor.submit_sync(lambda: "caption", priority=LATENCY)
+
+        assert live.result(timeout=5) == "caption"
+        assert not upload.done()
+        release.set()
+        upload.result(timeout=5)
+        executor.shutdown()
+
+    def test_uploads_cannot_fill_the_live_share(self):
+        """Test a full upload queue neither rejects live jobs nor overflows"""
+        executor = InferenceExecutor(max_workers=2, max_queue_size=8, live_workers=1)
+        release = threading.Event()
+
+        for _ in range(10):
+            executor.submit_sync(release.wait)
+        with pytest.raises(QueueFullError):
+            executor.submit_sync(release.wait)
+        live = executor.submit_sync(lambda: "caption", priority=LATENCY)
+
+        assert live.result(timeout=5) == "caption"
+        wait_until(lambda: executor.stats()["running"] == 2)
+        assert executor.stats()["queue_depth"] == 8
+        release.set()
+        executor.shutdown()
+
+    def test_live_jobs_overflow_onto_idle_workers(self):
+        """Test concurrent live jobs do not queue behind one live worker"""
+        executor = InferenceExecutor(max_workers=2, max_queue_size=4, live_workers=1)
+        both_running = threading.Barrier(2, timeout=5)
+
+        first = executor.submit_sync(both_running.wait, priority=LATENCY)
+        second = executor.submit_sync(both_running.wait, priority=LATENCY)
+
+        # Each job only returns once the other is running alongside it
+        first.result(timeout=5)
+        second.result(timeout=5)
+        executor.shutdown()
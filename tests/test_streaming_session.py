@@ -0,0 +1,225 @@
+import threading
+import time
+import numpy as np
+import pytest
+from unittest.mock import Mock
+from src.services.streaming_session import AudioRingBuffer, StreamingSession
+from src.schemas.transcribe_schemas import WhisperModel, TranscriptionAction
+
+class FakeDecoder:
+    """Decoder stand-in that turns each fed chunk into one second of PCM"""
+
+    def __init__(self):
+        self.pending = []
+
+    def feed(self, data):
+        level = 0.0 if data == b"silence" else 0.1
+        self.pending.append(np.full(16000, level, dtype=np.float32))
+
+    def read(self):
+        if not self.pending:
+            return np.zeros(0, dtype=np.float32)
+        samples = np.concatenate(self.pending)
+        self.pending = []
+        return samples
+
+    def close(self):
+        return self.read()
+
+class GatedDecoder:
+    """Decoder whose first read returns only after a second read started"""
+
+    def __init__(self):
+        self.next = 0
+        self.reads = 0
+        self.lock = threading.Lock()
+        self.second_read = threading.Event()
+
+    def feed(self, data):
+        pass
+
+    def read(self):
+        with self.lock:
+            start = self.next
+            self.next += 1600
+            self.reads += 1
+            first = self.reads == 1
+        if first:
+            # Give the second read time to reach its append
+            self.second_read.wait(0.5)
+            time.sleep(0.05)
+        else:
+            self.second_read.set()
+        return np.arange(start, start + 1600, dtype=np.float32)
+
+    close = read
+
+def make_session(hypotheses):
+    service = Mock()
+    service.transcribe_samples.side_effect = [
+        {"text": text, "language": "en", "segments": [
+            {"start": 0.0, "end": 1.0, "text": text}
+        ]}
+        for text in hypotheses
+    ]
+    session = StreamingSession(
+        service,
+        WhisperModel.SMALL,
+        TranscriptionAction.TRANSCRIBE,
+        decoder=FakeDecoder(),
+    )
+    return session, service
+
+class TestAudioRingBuffer:
+    def test_append_and_get(self):
+        """Test samples are addressed by absolute offset"""
+        buffer = AudioRingBuffer(10)
+        buffer.append(np.arange(6, dtype=np.float32))
+        buffer.append(np.arange(6, 12, dtype=np.float32))
+
+        assert buffer.end_offset == 12
+        assert buffer.start_offset == 2
+        np.testing.assert_array_equal(buffer.get(8, 12), [8, 9, 10, 11])
+        # Overwritten samples are clamped away
+        np.testing.assert_array_equal(buffer.get(0, 4), [2, 3])
+
+    def test_append_larger_than_capacity(self):
+        """Test oversized appends keep only the newest samples"""
+        buffer = AudioRingBuffer(4)
+        buffer.append(np.arange(10, dtype=np.float32))
+
+        assert buffer.end_offset == 10
+        np.testing.assert_array_equal(buffer.get(0), [6, 7, 8, 9])
+
+class TestStreamingSession:
+    def test_ready_after_step(self):
+        """Test a pass is only due after enough new audio"""
+        session, _ = make_session([])
+        assert not session.ready()
+        session.feed(b"chunk")
+        assert session.ready()
+
+    def test_commits_agreed_prefix(self):
+        """Test words are committed once two passes agree on them"""
+        session, service = make_session([
+            "hello there",
+            "hello there general",
+            "hello there general kenobi",
+        ])
+
+        session.feed(b"chunk")
+        first = session.process()
+        assert first == {"committed": "", "partial": "hello there"}
+
+        session.feed(b"chunk")
+        second = session.process()
+        assert second == {"committed": "hello there", "partial": "general"}
+
+        session.feed(b"chunk")
+        final = session.process(final=True)
+        assert final["committed"] == "general kenobi"
+        assert session.text == "hello there general kenobi"
+
+        # The window keeps growing from the same start
+        windows = [len(c[0][0]) for c in service.transcribe_samples.call_args_list]
+        assert windows == [16000, 32000, 48000]
+
+    def test_detected_language_is_reused(self):
+        """Test the first detected language is pinned for later passes"""
+        session, service = make_session(["hola", "hola amigo"])
+        session.feed(b"chunk")
+        session.process()
+        session.feed(b"chunk")
+        session.process()
+
+        assert service.transcribe_samples.call_args_list[1][0][3] == "en"
+
+    def test_drop_backlog(self):
+        """Test audio beyond the lag budget is skipped and the hypothesis committed"""
+        session, service = make_session(["hello there"])
+        session.feed(b"chunk")
+        session.process()
+        for _ in range(5):
+            session.feed(b"chunk")
+
+        assert session.drop_backlog(5 * 16000) is None
+        skipped = session.drop_backlog(2 * 16000)
+
+        assert skipped == {"committed": "hello there", "partial": "", "dropped": 3.0}
+        assert session.text == "hello there"
+        assert session.backlog == 2 * 16000
+
+    def test_passes_are_latency_class(self):
+        """Test each pass is scheduled as live work for the session's client"""
+        session, service = make_session(["hello"])
+        session.client = "10.0.0.7"
+        session.feed(b"chunk")
+        session.process()
+
+        ticket = service.transcribe_samples.call_args[1]["ticket"]
+        assert ticket.priority == "latency"
+        assert ticket.client == "10.0.0.7"
+        assert ticket.deadline is not None
+
+    def test_committed_text_is_carried_as_prompt(self):
+        """Test text committed before the window conditions the next pass"""
+        session, service = make_session(["hello there", "hello there", "general"])
+        session.window_samples = 16000
+        for _ in range(2):
+            session.feed(b"chunk")
+            session.process()
+        session.feed(b"chunk")
+        session.process()
+
+        prompts = [c[1]["initial_prompt"] for c in service.transcribe_samples.call_args_list]
+        assert prompts == [None, None, "hello there"]
+
+    def test_prompt_is_bounded(self):
+        """Test only the newest committed words are used as context"""
+        session, _ = make_session([])
+        session.context_words = 2
+        session.committed = ["one", "two", "three"]
+
+        assert session.prompt() == "two three"
+
+    def test_long_pause_resets_context(self):
+        """Test a long silence starts the next window without a prompt"""
+        session, service = make_session(["hello there", "hello there", "general"])
+        session.window_samples = 16000
+        for _ in range(2):
+            session.feed(b"chunk")
+            session.process()
+        for _ in range(3):
+            session.feed(b"silence")
+        session.process()
+
+        assert service.transcribe_samples.call_args[1]["initial_prompt"] is None
+
+    def test_unchanged_window_is_not_rerun(self):
+        """Test a stop right after a pass reuses that pass instead of rerunning"""
+        session, service = make_session(["hello there"])
+        session.feed(b"chunk")
+        session.process()
+
+        final = session.process(final=True)
+
+        assert final["committed"] == "hello there"
+        assert service.transcribe_samples.call_count == 1
+
+    def test_concurrent_feed_and_pass_keep_audio_in_order(self):
+        """Test audio read by a pass and a feed at once lands in order"""
+        session, _ = make_session(["hello"])
+        session.decoder = decoder = GatedDecoder()
+
+        feeding = threading.Thread(target=session.feed, args=(b"chunk",))
+        feeding.start()
+        while decoder.reads < 1:
+            time.sleep(0.001)
+        passing = threading.Thread(target=session.process)
+        passing.start()
+        feeding.join()
+        passing.join()
+
+        samples = session.buffer.get(0)
+        assert len(samples) == 3200
+        assert np.all(np.diff(samples) > 0)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from src.services.vad import EnergyVAD, SpeechTimeline, group_regions
+
+SR = 16000
+
+def tone(seconds):
+    t = np.arange(int(seconds * SR)) / SR
+    return (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+def silence(seconds):
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+class TestEnergyVAD:
+    def test_detects_speech_regions(self):
+        """Test speech regions are found between silences"""
+        vad = EnergyVAD(sample_rate=SR, speech_pad_ms=0)
+        samples = np.concatenate([silence(1), tone(1), silence(2), tone(1)])
+        
+        regions = vad.detect(samples)
+        
+        assert len(regions) == 2
+        assert regions[0][0] == pytest.approx(SR, abs=SR * 0.05)
+        assert regions[1][1] == pytest.approx(5 * SR, abs=SR * 0.05)
+    
+    def test_bridges_short_pauses(self):
+        """Test pauses shorter than min_silence_ms are kept"""
+        vad = EnergyVAD(sample_rate=SR, min_silence_ms=500)
+        samples = np.concatenate([tone(1), silence(0.2), tone(1)])
+        
+        assert len(vad.detect(samples)) == 1
+    
+    def test_drops_short_bursts(self):
+        """Test bursts shorter than min_speech_ms are ignored"""
+        vad = EnergyVAD(sample_rate=SR, min_speech_ms=250)
+        samples = np.concatenate([silence(1), tone(0.1), silence(1)])
+        
+        assert vad.detect(samples) == []
+    
+    def test_silence(self):
+        """Test pure silence yields no regions"""
+        assert EnergyVAD(sample_rate=SR).detect(silence(2)) == []
+
+class TestSpeechTimeline:
+    def test_group_regions(self):
+        """Test regions are packed into bounded batches"""
+        regions = [(0, 10), (20, 30), (40, 75)]
+        
+        batches = group_regions(regions, max_samples=20)
+        
+        assert batches == [[(0, 10), (20, 30)], [(40, 60)], [(60, 75)]]
+    
+    def test_remap_segments(self):
+        """Test collapsed timestamps map back onto the original timeline"""
+        timeline = SpeechTimeline([(SR, 2 * SR), (4 * SR, 5 * SR)], SR)
+        samples = np.arange(6 * SR, dtype=np.float32)
+        
+        assert len(timeline.collapse(samples)) == 2 * SR
+        segments = timeline.remap_segments([
+            {"start": 0.0, "end": 1.0, "text": "a"},
+            {"start": 1.0, "end": 1.5, "text": "b"},
+        ])
+        
+        assert (segments[0]["start"], segments[0]["end"]) == (1.0, 2.0)
+        assert (segments[1]["start"], segments[1]["end"]) == (4.0, 4.5)
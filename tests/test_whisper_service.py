@@ -1,19 +1,30 @@
 import pytest
-import tempfile
-import os
-from unittest.mock import Mock, patch
+import numpy as np
+from unittest.mock import MagicMock, Mock, patch
 from src.services.whisper_service import WhisperService
 from src.schemas.transcribe_schemas import WhisperModel, TranscriptionAction
 
+def make_tone(seconds=1.0, sample_rate=16000):
+    """A loud tone the VAD treats as speech"""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (0.5 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
 class TestWhisperService:
     @pytest.fixture
     def whisper_service(self):
-        return WhisperService()
+        service = WhisperService()
+        # Exercise the uncached per-request path; batching and caching are
+        # covered separately
+        service.batcher = None
+        service.cache = None
+        return service
     
-    @patch('src.services.whisper_service.whisper.load_model')
+    @patch('src.services.backends.openai_backend.whisper.load_model')
     def test_load_model(self, mock_load_model, whisper_service):
         """Test model loading"""
         mock_model = Mock()
+        mock_model.parameters.return_value = []
+        mock_model.buffers.return_value = []
         mock_load_model.return_value = mock_model
         
         model = whisper_service.load_model("small")
@@ -32,28 +43,23 @@ class TestWhisperService:
         with pytest.raises(Exception):
             whisper_service.preprocess_audio("nonexistent_file.wav")
     
-    @patch('src.services.whisper_service.AudioSegment.from_file')
-    def test_preprocess_audio_success(self, mock_audio_segment, whisper_service):
+    @patch('src.services.whisper_service.decode_audio')
+    def test_preprocess_audio_success(self, mock_decode_audio, whisper_service):
         """Test successful audio preprocessing"""
-        # Mock audio segment
-        mock_audio = Mock()
-        mock_audio.set_frame_rate.return_value = mock_audio
-        mock_audio.set_channels.return_value = mock_audio
-        mock_audio_segment.from_file.return_value = mock_audio
-        
-        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_file:
-            temp_file.write(b"fake audio content")
-            temp_path = temp_file.name
-        
-        try:
-            result_path = whisper_service.preprocess_audio(temp_path)
-            assert result_path.endswith(".wav")
-            assert os.path.exists(result_path)
-            
-            # Cleanup
-            os.unlink(result_path)
-        finally:
-            os.unlink(temp_path)
+        samples = np.zeros(16000, dtype=np.float32)
+        mock_decode_audio.return_value = samples
+        
+        result = whisper_service.preprocess_audio(b"fake audio content", ".mp3")
+        
+        assert result is samples
+        mock_decode_audio.assert_called_once_with(
+            b"fake audio content", sample_rate=16000, file_extension=".mp3"
+        )
+    
+    def test_preprocess_audio_array_passthrough(self, whisper_service):
+        """Test decoded PCM arrays skip decoding"""
+        samples = np.zeros(16000, dtype=np.float32)
+        assert whisper_service.preprocess_audio(samples) is samples
     
     @patch('src.services.whisper_service.WhisperService.load_model')
     @patch('src.services.whisper_service.WhisperService.preprocess_audio')
@@ -66,25 +72,24 @@ class TestWhisperService:
             "language": "en"
         }
         mock_load_model.return_value = mock_model
-        mock_preprocess.return_value = "processed_audio.wav"
+        samples = make_tone()
+        mock_preprocess.return_value = samples
         
-        with patch('os.path.exists', return_value=True), \
-             patch('os.unlink'):
-            
-            text, language, time_taken = whisper_service.transcribe_audio(
-                "test.mp3",
-                WhisperModel.SMALL,
-                TranscriptionAction.TRANSCRIBE
-            )
-            
-            assert text == "Hello world"
-            assert language == "en"
-            assert isinstance(time_taken, float)
-            assert time_taken >= 0
-            
-            mock_load_model.assert_called_once_with("small")
-            mock_preprocess.assert_called_once_with("test.mp3")
-            mock_model.transcribe.assert_called_once()
+        text, language, time_taken = whisper_service.transcribe_audio(
+            "test.mp3",
+            WhisperModel.SMALL,
+            TranscriptionAction.TRANSCRIBE
+        )
+        
+        assert text == "Hello world"
+        assert language == "en"
+        assert isinstance(time_taken, float)
+        assert time_taken >= 0
+        
+        mock_load_model.assert_called_once_with("small")
+        mock_preprocess.assert_called_once_with("test.mp3", None)
+        mock_model.transcribe.assert_called_once()
+        assert len(mock_model.transcribe.call_args[0][0]) == len(samples)
     
     @patch('src.services.whisper_service.WhisperService.load_model')
     def test_transcribe_audio_chunk(self, mock_load_model, whisper_service):
@@ -94,14 +99,8 @@ class TestWhisperService:
         mock_model.transcribe.return_value = {"text": "Chunk text"}
         mock_load_model.return_value = mock_model
         
-        with patch('tempfile.NamedTemporaryFile') as mock_temp, \
-             patch('os.path.exists', return_value=True), \
-             patch('os.unlink'):
-            
-            # Mock temporary file
-            mock_file = Mock()
-            mock_file.name = "temp_chunk.wav"
-            mock_temp.return_value.__enter__.return_value = mock_file
+        with patch('src.services.whisper_service.decode_audio') as mock_decode:
+            mock_decode.return_value = make_tone()
             
             result = whisper_service.transcribe_audio_chunk(
                 b"fake audio data",
@@ -112,3 +111,252 @@ class TestWhisperService:
             assert result == "Chunk text"
             mock_load_model.assert_called_once_with("turbo")
             mock_model.transcribe.assert_called_once()
+    
+    @patch('src.services.whisper_service.WhisperService.load_model')
+    def test_transcribe_samples_skips_silence(self, mock_load_model, whisper_service):
+        """Test silence is dropped and timestamps map back to the original"""
+        mock_model = Mock()
+        mock_model.transcribe.return_value = {
+            "text": " Hello",
+            "language": "en",
+            "segments": [{"id": 0, "start": 0.0, "end": 1.0, "text": " Hello"}],
+        }
+        mock_load_model.return_value = mock_model
+        silence = np.zeros(3 * 16000, dtype=np.float32)
+        samples = np.concatenate([silence, make_tone(1.0), silence])
+        
+        result = whisper_service.transcribe_samples(samples, WhisperModel.SMALL)
+        
+        sent = mock_model.transcribe.call_args[0][0]
+        assert len(sent) < len(samples) / 2
+        assert result["text"] == "Hello"
+        assert result["segments"][0]["start"] >= 2.5
+    
+    @patch('src.services.whisper_service.WhisperService.load_model')
+    def test_transcribe_samples_records_metrics(self, mock_load_model, whisper_service):
+        """Test audio duration and stage timings are recorded"""
+        from src.core import metrics
+        mock_model = Mock()
+        mock_model.transcribe.return_value = {"text": " Hi", "language": "en"}
+        mock_load_model.return_value = mock_model
+        audio = metrics.AUDIO_SECONDS.labels("small", "transcribe")
+        before = audio._value.get()
+        
+        whisper_service.transcribe_samples(make_tone(2.0), WhisperModel.SMALL)
+        
+        assert audio._value.get() - before == pytest.approx(2.0)
+        samples = {
+            s.labels["stage"]: s.value
+            for s in metrics.STAGE_SECONDS.collect()[0].samples
+            if s.name.endswith("_count")
+        }
+        assert samples["vad"] >= 1
+        assert samples["inference"] >= 1
+    
+    @patch('src.services.whisper_service.WhisperService.load_model')
+    def test_transcribe_samples_all_silence(self, mock_load_model, whisper_service):
+        """Test pure silence never reaches the model"""
+        mock_model = Mock()
+        mock_load_model.return_value = mock_model
+        
+        result = whisper_service.transcribe_samples(
+            np.zeros(16000, dtype=np.float32), WhisperModel.SMALL
+        )
+        
+        assert result["text"] == ""
+        mock_model.transcribe.assert_not_called()
+    
+    @patch('src.services.whisper_service.WhisperService.load_model')
+    def test_long_audio_is_chunked(self, mock_load_model, whisper_service):
+        """Test long recordings run as windows with absolute timestamps"""
+        mock_model = Mock()
+        mock_model.transcribe.side_effect = lambda samples, **options: {
+            "text": " part",
+            "language": "en",
+            "segments": [{"start": 0.0, "end": len(samples) / 16000, "text": " part"}],
+        }
+        mock_load_model.return_value = mock_model
+        samples = make_tone(70.0)
+        streamed = []
+        
+        result = whisper_service.transcribe_samples(
+            samples, WhisperModel.SMALL, on_segments=streamed.extend
+        )
+        
+        assert mock_model.transcribe.call_count == 3
+        assert all(len(c[0][0]) <= 30 * 16000 for c in mock_model.transcribe.call_args_list)
+        # Later windows reuse the language detected on the first
+        assert mock_model.transcribe.call_args_list[2][1]["language"] == "en"
+        assert result["text"] == "part part part"
+        assert result["segments"][-1]["end"] == pytest.approx(70.0)
+        # Segments are handed over in order while windows finish
+        assert streamed == result["segments"]
+    
+    def test_long_uploads_take_turns_per_client(self, whisper_service):
+        """Test a later client's short upload is not queued behind a long one"""
+        import threading
+        import time
+        from src.services.scheduler import FairScheduler, WorkTicket
+        whisper_service.scheduler = FairScheduler(1)
+        whisper_service.slots = None
+        whisper_service.load_model = Mock(return_value="model")
+
+        def transcribe(model, samples, **options):
+            time.sleep(0.02)
+            return {"text": " part", "language": "en", "segments": []}
+
+        whisper_service.backend.transcribe = Mock(side_effect=transcribe)
+        finished = []
+
+        def upload(client, seconds):
+            whisper_service.transcribe_samples(
+                make_tone(seconds),
+                WhisperModel.SMALL,
+                language="en",
+                ticket=WorkTicket(client=client),
+            )
+            finished.append(client)
+
+        first = threading.Thread(target=upload, args=("a", 600.0))
+        first.start()
+        while whisper_service.scheduler.stats()["turns"]["throughput"] < 2:
+            time.sleep(0.001)
+        second = threading.Thread(target=upload, args=("b", 90.0))
+        second.start()
+        first.join()
+        second.join()
+
+        assert finished == ["b", "a"]
+
+    @patch('src.services.whisper_service.WhisperService.load_model')
+    def test_word_timestamps(self, mock_load_model, whisper_service):
+        """Test word timings are requested from the same pass and remapped"""
+        mock_model = Mock()
+        mock_model.transcribe.return_value = {
+            "text": " Hi",
+            "language": "en",
+            "segments": [{
+                "start": 0.0, "end": 1.0, "text": " Hi",
+                "words": [{"word": " Hi", "start": 0.2, "end": 0.8}],
+            }],
+        }
+        mock_load_model.return_value = mock_model
+        samples = np.concatenate([np.zeros(3 * 16000, dtype=np.float32), make_tone(1.0)])
+        
+        result = whisper_service.transcribe_samples(
+            samples, WhisperModel.SMALL, word_timestamps=True
+        )
+        
+        assert mock_model.transcribe.call_args[1]["word_timestamps"] is True
+        assert result["segments"][0]["words"][0]["start"] > 2.5
+    
+    def test_detect_language_is_cached_and_reused(self, whisper_service):
+        """Test detection runs once per content and pins later transcriptions"""
+        from src.services.result_cache import TranscriptionCache
+        whisper_service.cache = TranscriptionCache(max_entries=8, ttl=60)
+        whisper_service.load_model = Mock(return_value="model")
+        whisper_service.backend.detect_language = Mock(
+            return_value={"en": 0.1, "de": 0.7, "fr": 0.2}
+        )
+        whisper_service.backend.transcribe = Mock(
+            return_value={"text": " Hallo", "language": "de", "segments": []}
+        )
+        samples = make_tone(40.0)
+        
+        first = whisper_service.detect_language(samples, WhisperModel.SMALL, top_k=2)
+        second = whisper_service.detect_language(samples, WhisperModel.SMALL, top_k=2)
+        other_model = whisper_service.detect_language(samples, WhisperModel.MEDIUM)
+        whisper_service.transcribe(samples, WhisperModel.SMALL)
+        
+        assert first["language"] == "de"
+        assert list(first["probabilities"]) == ["de", "fr"]
+        assert first["cache_hit"] is False
+        assert second["cache_hit"] is True
+        # Each model's own probabilities are cached separately
+        assert other_model["cache_hit"] is False
+        cached = whisper_service.cached_language(
+            whisper_service.digest(samples), WhisperModel.SMALL, top_k=1
+        )
+        assert cached["probabilities"] == {"de": 0.7}
+        assert cached["cache_hit"] is True
+        assert whisper_service.cached_language(None, WhisperModel.SMALL) is None
+        assert whisper_service.backend.detect_language.call_count == 2
+        # Only one mel window of audio is examined
+        assert len(whisper_service.backend.detect_language.call_args[0][1]) <= 30 * 16000
+        assert whisper_service.backend.transcribe.call_args[1]["language"] == "de"
+    
+    @patch('src.services.whisper_service.settings')
+    def test_start_warms_up_preloaded_models(self, mock_settings, whisper_service):
+        """Test startup runs each preloaded model once before marking ready"""
+        mock_settings.PRELOAD_MODELS = ["tiny", "small"]
+        mock_settings.WARMUP_ENABLED = True
+        mock_settings.WARMUP_SECONDS = 0.5
+        mock_settings.SAMPLE_RATE = 16000
+        whisper_service.preload_models = Mock()
+        whisper_service._infer = Mock(return_value={"text": ""})
+        
+        assert whisper_service.ready is False
+        whisper_service.start()
+        
+        assert whisper_service.ready is True
+        assert [c[0][0] for c in whisper_service._infer.call_args_list] == ["tiny", "small"]
+        assert len(whisper_service._infer.call_args[0][1]) == 8000
+    
+    def test_preload_shared(self, whisper_service):
+        """Test models are preloaded for forking only on fork-safe backends"""
+        whisper_service.preload_models = Mock()
+        whisper_service._backend = MagicMock(fork_safe=False)
+        whisper_service._device = "cuda"
+        
+        assert whisper_service.preload_shared() is False
+        whisper_service.preload_models.assert_not_called()
+        
+        whisper_service._backend.fork_safe = True
+        assert whisper_service.preload_shared() is True
+        whisper_service.preload_models.assert_called_once()
+    
+    def test_short_clips_are_batched(self):
+        """Test concurrent short clips share one batched backend call"""
+        from concurrent.futures import ThreadPoolExecutor
+        from src.services.batching import BatchScheduler
+        
+        service = WhisperService()
+        service.load_model = Mock(return_value="model")
+        service.backend.transcribe_batch = Mock(
+            side_effect=lambda model, batch, task, language: [
+                {"text": f"clip {len(b)}", "segments": [], "language": "en"}
+                for b in batch
+            ]
+        )
+        service.batcher = BatchScheduler(
+            service._run_batch, max_batch_size=3, max_wait=1.0
+        )
+        
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            results = list(pool.map(
+                lambda seconds: service.transcribe_samples(
+                    make_tone(seconds), WhisperModel.SMALL, language="en"
+                ),
+                [1, 2, 3],
+            ))
+        
+        service.backend.transcribe_batch.assert_called_once()
+        assert [r["text"] for r in results] == ["clip 16000", "clip 32000", "clip 48000"]
+    
+    @patch('src.services.whisper_service.WhisperService.transcribe_samples')
+    def test_repeated_upload_is_cached(self, mock_transcribe_samples, whisper_service):
+        """Test identical content is served from the cache"""
+        from src.services.result_cache import TranscriptionCache
+        whisper_service.cache = TranscriptionCache(max_entries=4, ttl=60)
+        mock_transcribe_samples.return_value = {"text": " Hi", "language": "en"}
+        samples = make_tone()
+        
+        first = whisper_service.transcribe(samples, WhisperModel.SMALL)
+        second = whisper_service.transcribe(samples.copy(), WhisperModel.SMALL)
+        other_model = whisper_service.transcribe(samples, WhisperModel.MEDIUM)
+        
+        assert first["cache_hit"] is False
+        assert second["cache_hit"] is True
+        assert second["text"] == "Hi"
+        assert other_model["cache_hit"] is False
+        assert mock_transcribe_samples.call_count == 2